@@ -0,0 +1,135 @@
+import math
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class QueryCounter:
+    """Counts the statements executed on an engine, from any thread."""
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        self._lock = threading.Lock()
+        event.listen(engine, "before_cursor_execute", self._count)
+
+    def _count(self, *args):
+        with self._lock:
+            self.count += 1
+
+
+def percentile(values: List[float], percent: float) -> Optional[float]:
+    if not values:
+        return None
+
+    ordered = sorted(values)
+    index = max(0, math.ceil(len(ordered) * percent / 100) - 1)
+
+    return ordered[index]
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+
+    # ru_maxrss is in kilobytes on linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+@contextmanager
+def traced_memory(enabled: bool):
+    """Yields a dict holding the traced peak in MB once the block is done."""
+    result = {"peak_mb": None}
+
+    if not enabled:
+        yield result
+        return
+
+    tracemalloc.start()
+    try:
+        yield result
+    finally:
+        result["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / (1 << 20), 1)
+        tracemalloc.stop()
+
+
+def measure(
+    name: str,
+    operation: Callable[[int], object],
+    iterations: int,
+    queries: QueryCounter,
+    memory: bool = False,
+) -> dict:
+    """
+    Run operation iterations times, one after the other so the statements of
+    every run can be told apart, and summarize latency and queries per run.
+    """
+    latencies = []
+    query_counts = []
+    errors = 0
+
+    with traced_memory(memory) as traced:
+        start = time.perf_counter()
+
+        for iteration in range(iterations):
+            queries_before = queries.count
+            started = time.perf_counter()
+
+            try:
+                operation(iteration)
+            except Exception:
+                errors += 1
+
+            latencies.append(time.perf_counter() - started)
+            query_counts.append(queries.count - queries_before)
+
+        elapsed = time.perf_counter() - start
+
+    def milliseconds(value):
+        return None if value is None else round(value * 1000, 2)
+
+    return {
+        "name": name,
+        "iterations": iterations,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "throughput": round(iterations / elapsed, 1) if elapsed else None,
+        "p50_ms": milliseconds(percentile(latencies, 50)),
+        "p99_ms": milliseconds(percentile(latencies, 99)),
+        "queries": (
+            round(sum(query_counts) / len(query_counts), 1) if query_counts else 0
+        ),
+        "traced_peak_mb": traced["peak_mb"],
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def compare(results: List[dict], baseline: List[dict], tolerance: float) -> List[str]:
+    """Regressions of results against a baseline run, as readable lines."""
+    previous = {result["name"]: result for result in baseline}
+    regressions = []
+
+    for result in results:
+        before = previous.get(result["name"])
+        if before is None:
+            continue
+
+        for key in ("p50_ms", "p99_ms", "queries"):
+            if not before.get(key) or result.get(key) is None:
+                continue
+
+            if result[key] > before[key] * (1 + tolerance):
+                regressions.append(
+                    f"{result['name']} {key}: {before[key]} -> {result[key]}"
+                )
+
+    return regressions
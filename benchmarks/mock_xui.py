@@ -0,0 +1,348 @@
+"""
+In-process mock of the MHSanaei x-ui panel api.
+
+The panel keeps its inbounds and clients in memory and answers the endpoints
+used by src.middleware, with optional latency and failure rate, so sync jobs
+and drivers can be load tested without real panels:
+
+    with MockXUIServer(latency=0.01) as server:
+        server.panel.add_inbound(1, clients=5000)
+        host = server.host()
+"""
+
+import json
+import random
+import re
+import threading
+import time
+import uuid as uuid_lib
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+SESSION_COOKIE = "session=mock-xui"
+
+
+class MockPanel:
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.requests = Counter()
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        # inbound id -> email -> client settings / traffic
+        self._clients: Dict[int, Dict[str, dict]] = {}
+        self._stats: Dict[int, Dict[str, dict]] = {}
+
+        self._routes = [
+            ("POST", re.compile(r"/login$"), self._login),
+            ("GET", re.compile(r"/inbounds/list$"), self._list),
+            ("GET", re.compile(r"/inbounds/get/(\d+)$"), self._get),
+            (
+                "GET",
+                re.compile(r"/inbounds/getClientTraffics/([^/]+)$"),
+                self._client_traffic,
+            ),
+            ("POST", re.compile(r"/inbounds/addClient$"), self._add_client),
+            (
+                "POST",
+                re.compile(r"/inbounds/updateClient/([^/]+)$"),
+                self._update_client,
+            ),
+            (
+                "POST",
+                re.compile(r"/inbounds/(\d+)/delClient/([^/]+)$"),
+                self._del_client,
+            ),
+            (
+                "POST",
+                re.compile(r"/inbounds/(\d+)/resetClientTraffic/([^/]+)$"),
+                self._reset_client,
+            ),
+            (
+                "POST",
+                re.compile(r"/inbounds/resetAllClientTraffics/(\d+)$"),
+                self._reset_all,
+            ),
+        ]
+
+    def add_inbound(self, inbound_id: int, clients: int = 0, prefix: str = "client"):
+        """Create an inbound holding clients random clients with random traffic."""
+        with self._lock:
+            self._clients.setdefault(inbound_id, {})
+            self._stats.setdefault(inbound_id, {})
+
+            for index in range(clients):
+                self._put_client(
+                    inbound_id,
+                    {
+                        "id": str(uuid_lib.UUID(int=self._random.getrandbits(128))),
+                        "email": f"{prefix}_{inbound_id}_{index}",
+                        "enable": True,
+                        "limitIp": 0,
+                        "totalGB": 0,
+                        "expiryTime": 0,
+                        "flow": "",
+                    },
+                    up=self._random.randint(0, 1 << 30),
+                    down=self._random.randint(0, 1 << 32),
+                )
+
+    def add_clients(self, inbound_id: int, clients: List[dict], traffic: int = 0):
+        """Put clients, given as panel settings, with up to traffic bytes used."""
+        with self._lock:
+            self._clients.setdefault(inbound_id, {})
+            self._stats.setdefault(inbound_id, {})
+
+            for client in clients:
+                self._put_client(
+                    inbound_id,
+                    client,
+                    up=self._random.randint(0, traffic // 8),
+                    down=self._random.randint(0, traffic),
+                )
+
+    def add_traffic(self, max_bytes: int = 1 << 24):
+        """Grow the traffic of every client, like a panel in use would."""
+        with self._lock:
+            for stats in self._stats.values():
+                for stat in stats.values():
+                    stat["up"] += self._random.randint(0, max_bytes // 8)
+                    stat["down"] += self._random.randint(0, max_bytes)
+
+    def clients(self, inbound_id: int) -> Dict[str, dict]:
+        with self._lock:
+            return dict(self._clients.get(inbound_id, {}))
+
+    def _put_client(self, inbound_id: int, client: dict, up: int = 0, down: int = 0):
+        self._clients[inbound_id][client["email"]] = client
+        self._stats[inbound_id].setdefault(
+            client["email"],
+            {
+                "id": len(self._stats[inbound_id]) + 1,
+                "inboundId": inbound_id,
+                "email": client["email"],
+                "up": up,
+                "down": down,
+                "total": client.get("totalGB", 0),
+                "expiryTime": client.get("expiryTime", 0),
+            },
+        )["enable"] = client.get("enable", True)
+
+    def _inbound(self, inbound_id: int) -> dict:
+        return {
+            "id": inbound_id,
+            "remark": f"mock-{inbound_id}",
+            "enable": True,
+            "protocol": "vless",
+            "settings": json.dumps(
+                {"clients": list(self._clients[inbound_id].values())}
+            ),
+            "clientStats": list(self._stats[inbound_id].values()),
+        }
+
+    def handle(
+        self, method: str, path: str, body: bytes, cookie: Optional[str]
+    ) -> Tuple[int, dict]:
+        self.requests[method + " " + re.sub(r"/[^/]*\d[^/]*", "/{}", path)] += 1
+
+        delay = self.latency + self._random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+        if self.failure_rate and self._random.random() < self.failure_rate:
+            return 500, {"success": False, "msg": "Simulated failure"}
+
+        for route_method, pattern, handler in self._routes:
+            match = pattern.search(path)
+            if route_method != method or match is None:
+                continue
+
+            if handler != self._login and SESSION_COOKIE not in (cookie or ""):
+                return 404, {"success": False, "msg": "Not logged in"}
+
+            payload = json.loads(body) if body and body[:1] in b"{[" else {}
+            with self._lock:
+                return 200, handler(payload, *map(unquote, match.groups()))
+
+        return 404, {"success": False, "msg": "Not found"}
+
+    def _login(self, payload):
+        return {"success": True, "msg": "Login Successfully", "obj": None}
+
+    def _list(self, payload):
+        return {
+            "success": True,
+            "obj": [self._inbound(inbound_id) for inbound_id in self._clients],
+        }
+
+    def _get(self, payload, inbound_id):
+        inbound_id = int(inbound_id)
+        if inbound_id not in self._clients:
+            return {"success": False, "msg": "Inbound not found", "obj": None}
+
+        return {"success": True, "obj": self._inbound(inbound_id)}
+
+    def _client_traffic(self, payload, email):
+        for stats in self._stats.values():
+            if email in stats:
+                return {"success": True, "obj": stats[email]}
+
+        return {"success": True, "obj": None}
+
+    def _add_client(self, payload):
+        inbound_id = int(payload.get("id", 0))
+        clients = json.loads(payload.get("settings") or "{}").get("clients") or []
+
+        if inbound_id not in self._clients:
+            return {"success": False, "msg": "Inbound not found"}
+        if any(client["email"] in self._clients[inbound_id] for client in clients):
+            return {"success": False, "msg": "Duplicate email"}
+
+        for client in clients:
+            self._put_client(inbound_id, client)
+
+        return {"success": True, "msg": f"{len(clients)} clients added"}
+
+    def _update_client(self, payload, client_uuid):
+        inbound_id = int(payload.get("id", 0))
+        clients = json.loads(payload.get("settings") or "{}").get("clients") or []
+
+        current = self._clients.get(inbound_id, {})
+        for email, client in list(current.items()):
+            if client["id"] == client_uuid and clients:
+                del current[email]
+                self._put_client(inbound_id, clients[0])
+                return {"success": True, "msg": "Client updated"}
+
+        return {"success": False, "msg": "Client not found"}
+
+    def _del_client(self, payload, inbound_id, client_uuid):
+        current = self._clients.get(int(inbound_id), {})
+        for email, client in list(current.items()):
+            if client["id"] == client_uuid:
+                del current[email]
+                self._stats[int(inbound_id)].pop(email, None)
+                return {"success": True, "msg": "Client deleted"}
+
+        return {"success": False, "msg": "Client not found"}
+
+    def _reset_client(self, payload, inbound_id, email):
+        stat = self._stats.get(int(inbound_id), {}).get(email)
+        if stat is None:
+            return {"success": False, "msg": "Client not found"}
+
+        stat["up"] = stat["down"] = 0
+        return {"success": True, "msg": "Traffic reset"}
+
+    def _reset_all(self, payload, inbound_id):
+        for stat in self._stats.get(int(inbound_id), {}).values():
+            stat["up"] = stat["down"] = 0
+
+        return {"success": True, "msg": "Traffic reset"}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def _respond(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+
+        status, data = self.server.panel.handle(
+            method, self.path.split("?")[0], body, self.headers.get("Cookie")
+        )
+        content = json.dumps(data).encode()
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        if self.path.endswith("/login"):
+            self.send_header("Set-Cookie", SESSION_COOKIE + "; Path=/")
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockXUIServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+    def __init__(self, address: str = "127.0.0.1", port: int = 0, **panel_options):
+        super().__init__((address, port), _Handler)
+        self.panel = MockPanel(**panel_options)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def address(self) -> str:
+        return self.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def host(self, host_id: int = 1, host_zone_id: int = 1, name: str = "mock"):
+        """HostResponse pointing at this server, for XUI and the drivers."""
+        from src.hosts.schemas import HostResponse, HostType, HostZoneResponse
+
+        now = datetime.utcnow()
+
+        return HostResponse(
+            id=host_id,
+            host_zone_id=host_zone_id,
+            host_zone=HostZoneResponse(
+                id=host_zone_id,
+                name="mock",
+                description="",
+                max_account=0,
+                enable=True,
+                created_at=now,
+                modified_at=now,
+            ),
+            name=name,
+            domain=self.address,
+            ip=self.address,
+            port=self.port,
+            username="admin",
+            password="admin",
+            api_path="/panel/api",
+            enable=True,
+            master=False,
+            type=HostType.x_ui_sanaei,
+            created_at=now,
+            modified_at=now,
+        )
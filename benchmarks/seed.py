@@ -0,0 +1,256 @@
+import random
+import uuid as uuid_lib
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from pydantic import BaseModel
+from sqlalchemy import insert, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Session
+
+from benchmarks.mock_xui import MockXUIServer
+from src.accounts.models import Account
+from src.accounts.panel import get_client_email
+from src.database import Base
+from src.hosts.models import Host, HostZone
+from src.hosts.schemas import HostType
+from src.inbound_configs.models import InboundConfig
+from src.inbounds.models import Inbound
+from src.inbounds.schemas import (
+    InboundFingerPrint,
+    InboundNetwork,
+    InboundSecurity,
+    InboundType,
+)
+from src.users.models import User
+
+GIGABYTE = 1 << 30
+
+
+@compiles(JSONB, "sqlite")
+def _compile_jsonb_sqlite(type_, compiler, **kwargs):
+    # Notification.keyboard is JSONB, sqlite stores it as JSON
+    return "JSON"
+
+
+class Dataset(BaseModel):
+    host_zone_id: int
+    host_ids: List[int]
+    inbound_ids: List[int]
+    account_ids: List[int]
+    account_uuids: List[str]
+
+
+def create_schema(engine: Engine):
+    """Create every table on an empty database, like the migrations would."""
+    if engine.dialect.name == "postgresql":
+        with engine.begin() as connection:
+            connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
+    Base.metadata.create_all(engine)
+
+
+def _insert(db: Session, model, rows: List[dict]) -> List[int]:
+    if not rows:
+        return []
+
+    return db.scalars(
+        insert(model).returning(model.id, sort_by_parameter_order=True), rows
+    ).all()
+
+
+def seed(
+    db: Session,
+    servers: List[MockXUIServer],
+    users: int = 1000,
+    accounts_per_user: int = 2,
+    inbounds_per_host: int = 2,
+    configs_per_inbound: int = 2,
+    exhausted_ratio: float = 0.05,
+    seed: int = 1,
+) -> Dataset:
+    """
+    Insert one host zone with a host per mock server, the inbounds and inbound
+    configs of every host and users with their accounts. exhausted_ratio of
+    the accounts are expired or over their data limit.
+    """
+    rand = random.Random(seed)
+    now = datetime.utcnow()
+
+    (host_zone_id,) = _insert(
+        db,
+        HostZone,
+        [
+            {
+                "name": "benchmark",
+                "description": "Benchmark zone",
+                "max_account": 0,
+                "enable": True,
+            }
+        ],
+    )
+
+    host_ids = _insert(
+        db,
+        Host,
+        [
+            {
+                "host_zone_id": host_zone_id,
+                "name": f"benchmark-{index}",
+                "domain": server.address,
+                "ip": server.address,
+                "port": server.port,
+                "username": "admin",
+                "password": "admin",
+                "api_path": "/panel/api",
+                "enable": True,
+                "master": False,
+                "type": HostType.x_ui_sanaei,
+            }
+            for index, server in enumerate(servers)
+        ],
+    )
+
+    inbound_rows = []
+    for host_id in host_ids:
+        for key in range(1, inbounds_per_host + 1):
+            inbound_rows.append(
+                {
+                    "host_id": host_id,
+                    "key": key,
+                    "remark": f"benchmark-{host_id}-{key}",
+                    "port": 443,
+                    "domain": f"h{host_id}.example.com",
+                    "request_host": f"h{host_id}.example.com",
+                    "sni": f"h{host_id}.example.com",
+                    "address": f"h{host_id}.example.com",
+                    "path": "/",
+                    "enable": True,
+                    "develop": False,
+                    "security": InboundSecurity.tls,
+                    "type": InboundType.default,
+                }
+            )
+    inbound_ids = _insert(db, Inbound, inbound_rows)
+
+    _insert(
+        db,
+        InboundConfig,
+        [
+            {
+                "inbound_id": inbound_id,
+                "remark": f"benchmark-{inbound_id}-{index}",
+                "port": 443,
+                "domain": f"cdn{index}.example.com",
+                "host": f"cdn{index}.example.com",
+                "sni": f"cdn{index}.example.com",
+                "address": f"cdn{index}.example.com",
+                "path": f"/ws{index}",
+                "enable": True,
+                "develop": False,
+                "finger_print": InboundFingerPrint.chrome,
+                "security": InboundSecurity.tls,
+                "network": InboundNetwork.ws,
+                "type": InboundType.default,
+                "config_mode": "auto",
+                "alpns": ["h2", "http/1.1"],
+            }
+            for inbound_id in inbound_ids
+            for index in range(configs_per_inbound)
+        ],
+    )
+
+    user_ids = _insert(
+        db,
+        User,
+        [
+            {
+                "username": f"benchmark_{index}",
+                "first_name": f"Benchmark {index}",
+                "telegram_chat_id": 10**9 + index,
+                "telegram_username": f"benchmark_{index}",
+                "balance": 0,
+                "enable": True,
+                "banned": False,
+                "force_join_channel": False,
+            }
+            for index in range(users)
+        ],
+    )
+
+    account_rows = []
+    for user_id in user_ids:
+        for index in range(accounts_per_user):
+            exhausted = rand.random() < exhausted_ratio
+            expired = exhausted and rand.random() < 0.5
+
+            account_rows.append(
+                {
+                    "user_id": user_id,
+                    "host_zone_id": host_zone_id,
+                    "uuid": str(uuid_lib.UUID(int=rand.getrandbits(128))),
+                    # Panels know accounts as host_inbound_email, no underscores
+                    "email": f"benchmark-{user_id}-{index}",
+                    "service_title": "Benchmark",
+                    "user_title": f"Benchmark {user_id}",
+                    "enable": True,
+                    "ip_limit": 2,
+                    "data_limit": 50 * GIGABYTE,
+                    "used_traffic": (
+                        60 * GIGABYTE
+                        if exhausted and not expired
+                        else rand.randint(0, 40 * GIGABYTE)
+                    ),
+                    "started_at": now - timedelta(days=rand.randint(1, 25)),
+                    "expired_at": now
+                    + timedelta(days=-1 if expired else rand.randint(1, 30)),
+                    "created_at": now - timedelta(seconds=rand.randint(0, 10**7)),
+                    "modified_at": now,
+                }
+            )
+    account_ids = _insert(db, Account, account_rows)
+
+    db.commit()
+
+    return Dataset(
+        host_zone_id=host_zone_id,
+        host_ids=host_ids,
+        inbound_ids=inbound_ids,
+        account_ids=account_ids,
+        account_uuids=[row["uuid"] for row in account_rows],
+    )
+
+
+def fill_panels(
+    db: Session,
+    servers: Dict[int, MockXUIServer],
+    synced_ratio: float = 0.5,
+    traffic: int = 64 << 20,
+):
+    """
+    Put synced_ratio of the accounts on every inbound of their host's mock
+    panel with some traffic, the rest are left for the sync jobs to add.
+    """
+    accounts = db.query(Account.email, Account.uuid).order_by(Account.id).all()
+    synced = accounts[: int(len(accounts) * synced_ratio)]
+
+    for inbound in db.query(Inbound).all():
+        panel = servers[inbound.host_id].panel
+        panel.add_clients(
+            inbound.key,
+            [
+                {
+                    "id": uuid,
+                    "email": get_client_email(inbound.host_id, inbound.key, email),
+                    "enable": True,
+                    "limitIp": 2,
+                    "totalGB": 0,
+                    "expiryTime": 0,
+                    "flow": "",
+                }
+                for email, uuid in synced
+            ],
+            traffic=traffic,
+        )
@@ -0,0 +1,175 @@
+"""
+End-to-end sync throughput against the mock panel.
+
+Every inbound of the mock panel starts with --clients clients, the desired
+state deletes, disables and adds --churn of them. The sync reads the inbound,
+diffs it with the desired state and applies the changes, once through the
+async driver and, with --legacy, once through the blocking XUI calls the jobs
+use today:
+
+    python -m benchmarks.sync_benchmark --inbounds 4 --clients 5000 --latency 0.005
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid as uuid_lib
+from typing import Dict, List
+
+from benchmarks.mock_xui import MockXUIServer
+from src.middleware.x_ui import XUI
+from src.middleware.xui_driver import BulkResult, XUIClient, get_driver
+
+
+def desired_clients(panel_clients: Dict[str, dict], churn: float) -> List[XUIClient]:
+    clients = [XUIClient.from_settings(client) for client in panel_clients.values()]
+    changed = int(len(clients) * churn)
+
+    # The first changed clients are deleted, the next ones disabled
+    kept = clients[changed:]
+    for client in kept[:changed]:
+        client.enable = False
+
+    added = [
+        XUIClient(uuid=str(uuid_lib.uuid4()), email=f"new_{index}_{client.email}")
+        for index, client in enumerate(clients[:changed])
+    ]
+
+    return kept + added
+
+
+def diff(remote: List[XUIClient], desired: List[XUIClient]):
+    remote_clients = {client.email: client for client in remote}
+    desired_emails = {client.email for client in desired}
+
+    added = [client for client in desired if client.email not in remote_clients]
+    updated = [
+        client
+        for client in desired
+        if client.email in remote_clients
+        and remote_clients[client.email].enable != client.enable
+    ]
+    deleted = [client for client in remote if client.email not in desired_emails]
+
+    return added, updated, deleted
+
+
+async def driver_sync(host, desired: Dict[int, List[XUIClient]]) -> BulkResult:
+    async def sync_inbound(driver, inbound_id: int) -> BulkResult:
+        snapshot = await driver.snapshot(inbound_id)
+        added, updated, deleted = diff(snapshot.clients, desired[inbound_id])
+
+        result = BulkResult()
+        for part in await asyncio.gather(
+            driver.add_clients(inbound_id, added),
+            driver.update_clients(inbound_id, updated),
+            driver.delete_clients(inbound_id, deleted),
+        ):
+            result.merge(part)
+
+        return result
+
+    async with get_driver(host=host) as driver:
+        result = BulkResult()
+        for part in await asyncio.gather(
+            *(sync_inbound(driver, inbound_id) for inbound_id in desired)
+        ):
+            result.merge(part)
+
+        return result
+
+
+def legacy_sync(host, desired: Dict[int, List[XUIClient]]) -> BulkResult:
+    xui = XUI(host=host)
+    result = BulkResult()
+
+    for inbound_id, clients in desired.items():
+        remote = [
+            XUIClient.from_settings(client)
+            for client in xui.api.get_inbound_clients(inbound_id) or []
+        ]
+        added, updated, deleted = diff(remote, clients)
+
+        for client in added:
+            done = xui.api.add_client(
+                inbound_id=inbound_id, email=client.email, uuid=client.uuid
+            )
+            (result.succeeded if done else result.failed).append(client.email)
+
+        for client in updated:
+            done = xui.api.update_client(
+                inbound_id=inbound_id,
+                email=client.email,
+                uuid=client.uuid,
+                enable=client.enable,
+            )
+            (result.succeeded if done else result.failed).append(client.email)
+
+        for client in deleted:
+            done = xui.api.delete_client(inbound_id=inbound_id, uuid=client.uuid)
+            (result.succeeded if done else result.failed).append(client.email)
+
+    return result
+
+
+def run(name: str, args, sync) -> dict:
+    with MockXUIServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    ) as server:
+        desired = {}
+        for inbound_id in range(1, args.inbounds + 1):
+            server.panel.add_inbound(inbound_id, clients=args.clients)
+            desired[inbound_id] = desired_clients(
+                server.panel.clients(inbound_id), args.churn
+            )
+
+        start = time.perf_counter()
+        result = sync(server.host(), desired)
+        elapsed = time.perf_counter() - start
+
+        changes = len(result.succeeded) + len(result.failed)
+
+        return {
+            "name": name,
+            "seconds": round(elapsed, 3),
+            "changes": changes,
+            "failed": len(result.failed),
+            "changes_per_second": round(changes / elapsed, 1) if elapsed else None,
+            "panel_requests": sum(server.panel.requests.values()),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--inbounds", type=int, default=2)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--churn", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.005)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--legacy", action="store_true")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+
+    results = [run("driver", args, lambda host, d: asyncio.run(driver_sync(host, d)))]
+    if args.legacy:
+        results.append(run("legacy", args, legacy_sync))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for result in results:
+        print(
+            "{name:<8} {seconds:>9}s {changes:>7} changes {failed:>5} failed "
+            "{changes_per_second:>9}/s {panel_requests:>7} requests".format(**result)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import asyncio
+import logging
+import os
+import signal
+import threading
+
+# Jobs and bots only, API workers started with RUN_MODE=api serve the requests
+os.environ["RUN_MODE"] = "jobs"
+
+from src import app, config, logger  # noqa: E402
+
+
+def main():
+    logging.basicConfig(
+        level=config.LOG_LEVEL,
+        format="%(asctime)s - %(levelname)s - %(module)s.%(funcName)s:%(lineno)d - %(message)s",
+    )
+
+    stopped = threading.Event()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, frame: stopped.set())
+
+    # Startup handlers start the scheduler and the bots, like under uvicorn
+    asyncio.run(app.router.startup())
+    logger.info("Job runner started")
+
+    metrics_server = None
+    if config.ENABLE_METRICS and config.METRICS_PORT:
+        from src.system.metrics import start_metrics_server
+
+        metrics_server = start_metrics_server(
+            host=config.METRICS_HOST, port=config.METRICS_PORT
+        )
+
+    stopped.wait()
+
+    logger.info("Job runner stopping")
+    if metrics_server is not None:
+        metrics_server.shutdown()
+    asyncio.run(app.router.shutdown())
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,12 @@ from src import logger, app
 
 from src import config
 from src.config import (
+    API_WORKERS,
     DEBUG,
     UVICORN_HOST,
     UVICORN_PORT,
     UVICORN_UDS,
+    UVICORN_WORKERS,
     UVICORN_SSL_CERTFILE,
     UVICORN_SSL_KEYFILE,
 )
@@ -56,8 +58,11 @@ def validate_ssl_files() -> tuple[Optional[str], Optional[str]]:
 
 
 if __name__ == "__main__":
-    # Do NOT change workers count for now
-    # multi-workers support isn't implemented yet for APScheduler and XRay module
+    # More than one worker needs RUN_MODE=api and the jobs started with jobs.py
+    if API_WORKERS < UVICORN_WORKERS:
+        logger.warning(
+            f"UVICORN_WORKERS={UVICORN_WORKERS} needs RUN_MODE=api, starting one worker"
+        )
 
     log_config = uvicorn.config.LOGGING_CONFIG
     log_config["formatters"]["default"][
@@ -79,7 +84,7 @@ if __name__ == "__main__":
             ssl_certfile=ssl_cert,
             ssl_keyfile=ssl_key,
             forwarded_allow_ips="*",
-            workers=1,
+            workers=API_WORKERS,
             reload=DEBUG,
             use_colors=True,
             log_config=log_config,
@@ -3,8 +3,8 @@ import logging
 import os
 import signal
 import sys
+import time
 
-from apscheduler.schedulers.background import BackgroundScheduler
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse
@@ -14,6 +14,10 @@ from fastapi_responses import custom_openapi
 from src.accounts.router import router as account_router
 from src.admins.router import router as admin_router
 from src.admins.schemas import Admin
+
+# User relates to the club models by name, so they are mapped in every run mode
+import src.club.models  # noqa
+from src.club.router import club_router
 from src.club.user_router import club_user_router
 from src.commerce.router import (
     order_router,
@@ -22,7 +26,16 @@ from src.commerce.router import (
     transaction_router,
     payment_account_router,
 )
-from src.config import DOCS, DEBUG, UVICORN_HOST, UVICORN_PORT
+from src.config import (
+    API_WORKERS,
+    DOCS,
+    DEBUG,
+    ENABLE_METRICS,
+    ENABLE_QUERY_INSTRUMENTATION,
+    RUN_MODE,
+    UVICORN_HOST,
+    UVICORN_PORT,
+)
 from src.database import Base, engine
 from src.hosts.router import host_router as host_router
 from src.hosts.router import host_zone_router as host_zone_router
@@ -30,11 +43,15 @@ from src.inbound_configs.router import router as inbound_config_router
 from src.inbounds.router import router as inbound_router
 from src.monitoring.router import router as monitoring_router
 from src.notification.router import notification_router
+from src.reports.router import router as report_router
 from src.subscription.router import router as subscription_router
 from src.users.router import router as user_router
 from src.config_setting.router import router as config_setting_router
 from src.system.router import router as system_router
+from src.system.scheduler import JobScheduler
 from src.users.schemas import UserResponse
+from src.utils.instrumentation import instrument, install
+from src.utils.metrics import HTTP_REQUEST_DURATION
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 # logging_config = dict(
@@ -63,9 +80,7 @@ app = FastAPI(
     debug=DEBUG,
 )
 
-scheduler = BackgroundScheduler(
-    {"apscheduler.job_defaults.max_instances": 1}, timezone="UTC"
-)
+scheduler = JobScheduler({"apscheduler.job_defaults.max_instances": 1}, timezone="UTC")
 
 logger = logging.getLogger("uvicorn.default")
 
@@ -78,6 +93,38 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if ENABLE_QUERY_INSTRUMENTATION:
+    install(engine)
+
+    @app.middleware("http")
+    async def instrument_request(request: Request, call_next):
+        with instrument(request.method, scope=request.scope) as stats:
+            response = await call_next(request)
+
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.seconds * 1000:.1f};desc="{stats.queries} queries"'
+        )
+        return response
+
+
+if ENABLE_METRICS:
+
+    @app.middleware("http")
+    async def observe_request(request: Request, call_next):
+        start = time.perf_counter()
+        response = await call_next(request)
+
+        # Routes are known by their template, unmatched paths share one label
+        route = request.scope.get("route")
+        HTTP_REQUEST_DURATION.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=response.status_code,
+        )
+        return response
+
+
 static_path = os.path.join(os.path.dirname(__file__), "../static")
 
 app.include_router(subscription_router, prefix="/api", tags=["Subscription"])
@@ -95,6 +142,8 @@ app.include_router(transaction_router, prefix="/api", tags=["Transaction"])
 app.include_router(notification_router, prefix="/api", tags=["Notification"])
 app.include_router(monitoring_router, prefix="/api", tags=["Monitoring"])
 app.include_router(club_user_router, prefix="/api", tags=["ClubUser"])
+app.include_router(club_router, prefix="/api", tags=["Club"])
+app.include_router(report_router, prefix="/api", tags=["Report"])
 app.include_router(config_setting_router, prefix="/api", tags=["ConfigSettings"])
 app.include_router(payment_account_router, prefix="/api", tags=["PaymentAccounts"])
 
@@ -156,14 +205,19 @@ app.openapi = custom_openapi(app)
 
 # from src import hosts, admins
 
-from src import jobs, telegram  # noqa
-from src.club import jobs  # noqa
+from src import telegram  # noqa
+
+if RUN_MODE != "api":
+    # Jobs add themselves to the scheduler when they are imported
+    from src import jobs  # noqa
+    from src.club import jobs  # noqa
 
 
 @app.post(path="/api/restart")
 async def restart_server(admin: Admin = Depends(Admin.get_current)):
     try:
-        os.kill(os.getpid(), signal.SIGTERM)
+        # Workers are restarted by stopping the uvicorn process managing them
+        os.kill(os.getppid() if API_WORKERS > 1 else os.getpid(), signal.SIGTERM)
         return JSONResponse({"message": "Server restarting..."})
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -171,13 +225,15 @@ async def restart_server(admin: Admin = Depends(Admin.get_current)):
 
 @app.on_event("startup")
 def on_startup():
-    scheduler.start()
-    logger.info("Application started successfully!")
+    if RUN_MODE != "api":
+        scheduler.start()
+    logger.info(f"Application started successfully in {RUN_MODE} mode!")
 
 
 @app.on_event("shutdown")
 def on_shutdown():
-    scheduler.shutdown()
+    if scheduler.running:
+        scheduler.shutdown()
 
 
 # Root path handler
@@ -10,6 +10,8 @@ from sqlalchemy import (
     ForeignKey,
     BigInteger,
     case,
+    Index,
+    UniqueConstraint,
 )
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship, validates
@@ -20,6 +22,33 @@ from src.database import Base
 
 class Account(Base):
     __tablename__ = "account"
+    # Trigram indexes serving the ILIKE search of src.utils.search
+    __table_args__ = (
+        Index(
+            "ix_account_email_trgm",
+            "email",
+            postgresql_using="gin",
+            postgresql_ops={"email": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_account_user_title_trgm",
+            "user_title",
+            postgresql_using="gin",
+            postgresql_ops={"user_title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_account_service_title_trgm",
+            "service_title",
+            postgresql_using="gin",
+            postgresql_ops={"service_title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_account_uuid_trgm",
+            "uuid",
+            postgresql_using="gin",
+            postgresql_ops={"uuid": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("user.id"))
@@ -92,7 +121,54 @@ class AccountUsedTraffic(Base):
     id = Column(Integer, primary_key=True, index=True)
     account_id = Column(Integer, ForeignKey("account.id"))
     account = relationship("Account", back_populates="used_traffic_history")
+    host_id = Column(Integer, nullable=True)
+    inbound_id = Column(Integer, nullable=True)
     download = Column(BigInteger, default=0)
     upload = Column(BigInteger, default=0)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class AccountUsedTrafficRollup(Base):
+    __tablename__ = "account_used_traffic_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "period",
+            "bucket",
+            "account_id",
+            name="uq_account_used_traffic_rollup_period_bucket_account",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # hour or day, account_id 0 holds the totals of all accounts
+    period = Column(String(16), nullable=False)
+    bucket = Column(DateTime, nullable=False)
+    account_id = Column(Integer, nullable=False, default=0, index=True)
+    download = Column(BigInteger, default=0)
+    upload = Column(BigInteger, default=0)
+    count = Column(Integer, default=0)
+
+
+class NodeUsedTrafficRollup(Base):
+    __tablename__ = "node_used_traffic_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "period",
+            "bucket",
+            "host_id",
+            "inbound_id",
+            name="uq_node_used_traffic_rollup_period_bucket_node",
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    # hour or day, inbound_id 0 holds the totals of the host
+    period = Column(String(16), nullable=False)
+    bucket = Column(DateTime, nullable=False)
+    host_id = Column(Integer, nullable=False, index=True)
+    inbound_id = Column(Integer, nullable=False, default=0)
+    download = Column(BigInteger, default=0)
+    upload = Column(BigInteger, default=0)
+    # Accounts seen in the bucket, the busiest hour for day buckets
+    count = Column(Integer, default=0)
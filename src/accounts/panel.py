@@ -0,0 +1,117 @@
+import asyncio
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from src import logger
+from src.accounts.models import Account
+from src.hosts.schemas import HostResponse
+from src.inbounds.service import get_inbounds
+from src.middleware.xui_driver import XUIClient, get_driver
+
+
+def get_client_email(host_id: int, inbound_key: int, email: str):
+    return "%s_%s_%s" % (host_id, inbound_key, email)
+
+
+async def _propagate_to_inbound(inbound, host: HostResponse, db_accounts) -> int:
+    try:
+        driver = get_driver(host=host)
+    except ValueError as error:
+        logger.error(f"Could not connect to host {host.name}: {error}")
+        return 1
+
+    async with driver:
+        snapshot = await driver.snapshot(inbound.key)
+
+        if snapshot is None:
+            logger.warn(
+                f"Remote clients is None in Inbound Remark: {inbound.remark} with key {inbound.key} in {host.name}"
+            )
+            return 1
+
+        remote_clients = {client.email: client for client in snapshot.clients}
+
+        flow = inbound.flow.value if inbound.flow else ""
+
+        added, updated = [], []
+        for db_account in db_accounts:
+            client_email = get_client_email(host.id, inbound.key, db_account.email)
+            client = remote_clients.get(client_email)
+
+            if client is not None:
+                if client.enable == db_account.enable:
+                    continue
+
+                updated.append(
+                    XUIClient(
+                        uuid=db_account.uuid,
+                        email=client_email,
+                        enable=db_account.enable,
+                        ip_limit=db_account.ip_limit,
+                        flow=flow,
+                    )
+                )
+            elif db_account.enable and db_account.host_zone_id == host.host_zone_id:
+                added.append(
+                    XUIClient(
+                        uuid=db_account.uuid,
+                        email=client_email,
+                        ip_limit=db_account.ip_limit,
+                        flow=flow,
+                    )
+                )
+
+        results = await asyncio.gather(
+            driver.add_clients(inbound.key, added),
+            driver.update_clients(inbound.key, updated),
+        )
+
+    failed = 0
+    for result in results:
+        for client_email in result.failed:
+            logger.error(
+                f"Could not propagate account {client_email} to inbound {inbound.remark} on {host.name}"
+            )
+            failed += 1
+
+    return failed
+
+
+def propagate_accounts(db: Session, account_ids: List[int]) -> int:
+    """
+    Push the current state of the given accounts to every enabled inbound.
+
+    Enabled accounts are added to the inbounds of their host zone (or re-enabled
+    where they already exist) and disabled accounts are disabled wherever they
+    exist, so changes reach the panels without waiting for the next sync cycle.
+    Inbounds are handled concurrently and new clients of an inbound are added
+    in bulk. Returns the number of panel calls that failed.
+    """
+    if not account_ids:
+        return 0
+
+    db_accounts = db.query(Account).filter(Account.id.in_(account_ids)).all()
+    if not db_accounts:
+        return 0
+
+    targets = []
+
+    inbounds, count = get_inbounds(db=db, enable=1)
+    for inbound in inbounds:
+        host = inbound.host
+
+        if not inbound.enable or not host.enable:
+            continue
+
+        targets.append((inbound, HostResponse.from_orm(host)))
+
+    async def propagate():
+        return await asyncio.gather(
+            *(
+                _propagate_to_inbound(inbound, host, db_accounts)
+                for inbound, host in targets
+            )
+        )
+
+    return sum(asyncio.run(propagate()))
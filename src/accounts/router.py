@@ -1,7 +1,7 @@
 import datetime
 import logging
 import math
-from typing import List
+from typing import List, Optional, Union
 
 import humanize
 from fastapi import APIRouter, Depends, HTTPException
@@ -9,12 +9,15 @@ from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 import src.accounts.service as service
+import src.reports.service as report_service
 import src.users.service as user_service
 from src import config, messages
 from src.accounts.schemas import (
+    AccountCompactResponse,
     AccountCreate,
     AccountResponse,
     AccountModify,
+    AccountsCompactResponse,
     AccountsResponse,
     AccountUsedTrafficResponse,
     AccountsReport,
@@ -23,6 +26,7 @@ from src.accounts.schemas import (
 )
 from src.admins.schemas import Admin
 from src.database import get_db
+from src.utils.pagination import CountMode, get_cursor, get_next_cursor
 from src.hosts.service import get_host_zone
 from src.notification.schemas import NotificationCreate, NotificationType
 from src.notification.service import create_notification
@@ -180,18 +184,13 @@ def add_account(
 def get_accounts_report(
     db: Session = Depends(get_db), admin: Admin = Depends(Admin.get_current)
 ):
-    active_accounts = service.get_accounts(
-        db=db, filter_enable=True, enable=True, test_account=False
-    )
+    report = report_service.get_accounts_report(db=db)
 
-    disabled_accounts = service.get_accounts(
-        db=db, filter_enable=True, enable=False, test_account=False
+    return AccountsReport(
+        active=report.active_accounts,
+        total=report.active_accounts + report.disabled_accounts,
     )
 
-    total = active_accounts[1] + disabled_accounts[1]
-
-    return AccountsReport(active=active_accounts[1], total=total)
-
 
 @router.get(
     "/accounts/report_used_traffic",
@@ -292,7 +291,11 @@ def delete_account(
     return {}
 
 
-@router.get("/accounts/", tags=["Account"], response_model=AccountsResponse)
+@router.get(
+    "/accounts/",
+    tags=["Account"],
+    response_model=Union[AccountsResponse, AccountsCompactResponse],
+)
 def get_accounts(
     offset: int = None,
     limit: int = None,
@@ -300,6 +303,9 @@ def get_accounts(
     enable: bool = None,
     user_id: int = 0,
     q: str = None,
+    count: CountMode = CountMode.exact,
+    compact: bool = False,
+    cursor: Optional[list] = Depends(get_cursor),
     db: Session = Depends(get_db),
     admin: Admin = Depends(Admin.get_current),
 ):
@@ -319,15 +325,34 @@ def get_accounts(
     else:
         filter_enable = True
 
-    accounts, count = service.get_accounts(
-        filter_enable=filter_enable,
-        db=db,
-        enable=enable,
-        user_id=user_id,
-        offset=offset,
-        limit=limit,
-        sort=sort,
-        q=q,
-    )
+    # Searches without an explicit sort list the best matches first
+    if q and not sort:
+        sort = [service.get_account_search_rank(db=db, q=q).desc()]
+
+    try:
+        accounts, total = service.get_accounts(
+            filter_enable=filter_enable,
+            db=db,
+            enable=enable,
+            user_id=user_id,
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            q=q,
+            cursor=cursor,
+            count_mode=count,
+            compact=compact,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    next_cursor = get_next_cursor(db=db, items=accounts, sort=sort, limit=limit)
+
+    if compact:
+        return AccountsCompactResponse(
+            accounts=[AccountCompactResponse.from_orm(item) for item in accounts],
+            total=total,
+            next_cursor=next_cursor,
+        )
 
-    return {"accounts": accounts, "total": count}
+    return {"accounts": accounts, "total": total, "next_cursor": next_cursor}
@@ -20,6 +20,15 @@ class AccountUsedTrafficReportResponse(BaseModel):
     upload: Union[int, None] = 0
 
 
+class NodeUsedTrafficReportResponse(BaseModel):
+    host_id: int
+    inbound_id: int = 0
+    count: int = 0
+    date: datetime
+    download: Union[int, None] = 0
+    upload: Union[int, None] = 0
+
+
 class AccountUedTrafficTrunc(str, Enum):
     HOUR = "hour"
     DAY = "day"
@@ -92,7 +101,32 @@ class AccountResponse(AccountBase):
 
 class AccountsResponse(BaseModel):
     accounts: List[AccountResponse]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class AccountCompactResponse(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    host_zone_id: int
+    email: str
+    service_title: Optional[str] = None
+    user_title: Optional[str] = None
+    enable: bool
+    used_traffic: int = 0
+    data_limit: Optional[int] = None
+    expired_at: Optional[datetime] = None
+    created_at: datetime
+    modified_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class AccountsCompactResponse(BaseModel):
+    accounts: List[AccountCompactResponse]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class AccountsReport(BaseModel):
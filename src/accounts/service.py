@@ -3,21 +3,43 @@ import logging
 from enum import Enum
 from typing import List, Tuple, Optional
 
-from sqlalchemy import and_, func, or_, String, cast, desc, distinct
-from sqlalchemy.orm import Session
+from sqlalchemy import (
+    and_,
+    func,
+    String,
+    case,
+    cast,
+    desc,
+    distinct,
+    insert,
+    literal,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session, aliased, load_only
 
 from src import config
-from src.accounts.models import Account, AccountUsedTraffic
+from src.accounts.models import (
+    Account,
+    AccountUsedTraffic,
+    AccountUsedTrafficRollup,
+    NodeUsedTrafficRollup,
+)
 from src.accounts.schemas import (
+    AccountCompactResponse,
     AccountCreate,
     AccountModify,
     AccountUsedTrafficResponse,
     AccountUsedTrafficReportResponse,
     AccountUedTrafficTrunc,
+    NodeUsedTrafficReportResponse,
 )
-from src.hosts.models import HostZone
+from src.hosts.models import Host, HostZone
 from src.notification.models import Notification
 from src.users.models import User
+from src.utils.dates import date_trunc
+from src.utils.pagination import CountMode, paginate, schema_columns
+from src.utils.search import search_filter, search_rank
 
 AccountSortingOptions = Enum(
     "AccountSortingOptions",
@@ -37,9 +59,33 @@ AccountSortingOptions = Enum(
     },
 )
 
+ACCOUNT_SEARCH_COLUMNS = [
+    Account.email,
+    Account.user_title,
+    Account.service_title,
+    Account.uuid,
+]
+
+# Accounts are also found by their owner, results are ranked on account fields
+ACCOUNT_USER_SEARCH_COLUMNS = [
+    User.first_name,
+    User.last_name,
+    User.username,
+    User.telegram_username,
+    cast(User.telegram_chat_id, String),
+]
+
+
+def get_account_search_rank(db: Session, q: str):
+    return search_rank(db, ACCOUNT_SEARCH_COLUMNS, q)
+
 
 def create_account(
-    db: Session, db_user: User, account: AccountCreate, db_host_zone: HostZone = None
+    db: Session,
+    db_user: User,
+    account: AccountCreate,
+    db_host_zone: HostZone = None,
+    commit: bool = True,
 ):
     db_account = Account(
         host_zone_id=1 if db_host_zone is None else db_host_zone.id,
@@ -56,16 +102,28 @@ def create_account(
     )
 
     db.add(db_account)
-    db.commit()
-    db.refresh(db_account)
+    if commit:
+        db.commit()
+        db.refresh(db_account)
+    else:
+        db.flush()
     return db_account
 
 
 def create_account_used_traffic(
-    db: Session, db_account: Account, download: int, upload: int
+    db: Session,
+    db_account: Account,
+    download: int,
+    upload: int,
+    host_id: int = None,
+    inbound_id: int = None,
 ):
     db_account_used_traffic = AccountUsedTraffic(
-        account_id=db_account.id, download=download, upload=upload
+        account_id=db_account.id,
+        host_id=host_id,
+        inbound_id=inbound_id,
+        download=download,
+        upload=upload,
     )
 
     db.add(db_account_used_traffic)
@@ -86,6 +144,7 @@ def update_account(
     db_account: Account,
     modify: AccountModify,
     db_host_zone: HostZone = None,
+    commit: bool = True,
 ):
 
     db_account.uuid = modify.uuid
@@ -105,8 +164,11 @@ def update_account(
 
     db_account.enable = modify.enable
 
-    db.commit()
-    db.refresh(db_account)
+    if commit:
+        db.commit()
+        db.refresh(db_account)
+    else:
+        db.flush()
 
     return db_account
 
@@ -120,18 +182,25 @@ def update_account_used_traffic(db: Session, db_account: Account, used_traffic:
     return db_account
 
 
-def reset_traffic(db: Session, db_account: Account):
+def reset_traffic(db: Session, db_account: Account, commit: bool = True):
     db.query(Notification).filter(Notification.account_id == db_account.id).delete()
 
     db.query(AccountUsedTraffic).filter(
         AccountUsedTraffic.account_id == db_account.id
     ).delete()
 
+    db.query(AccountUsedTrafficRollup).filter(
+        AccountUsedTrafficRollup.account_id == db_account.id
+    ).delete()
+
     db_account.used_traffic = 0
     db_account.modified_at = datetime.datetime.utcnow()
 
-    db.commit()
-    db.refresh(db_account)
+    if commit:
+        db.commit()
+        db.refresh(db_account)
+    else:
+        db.flush()
 
     return db_account
 
@@ -146,6 +215,51 @@ def update_account_status(db: Session, db_account: Account, enable: bool = True)
     return db_account
 
 
+def get_exhausted_conditions(now: datetime.datetime):
+    """Conditions of accounts that are expired at now and over their data limit."""
+    expired = and_(Account.expired_at.isnot(None), Account.expired_at <= now)
+    exceeded = and_(Account.data_limit > 0, Account.used_traffic >= Account.data_limit)
+
+    return expired, exceeded
+
+
+def disable_exhausted_accounts(db: Session, commit: bool = True) -> list:
+    """
+    Disable every enabled account that is expired or over its data limit in a
+    single UPDATE ... RETURNING. Returns (id, user_id, email, service_title,
+    expired) rows of the disabled accounts, expired is False for accounts
+    disabled because of their data limit.
+    """
+    now = datetime.datetime.utcnow()
+
+    expired, exceeded = get_exhausted_conditions(now)
+
+    statement = (
+        update(Account)
+        .where(Account.enable == True, expired | exceeded)
+        .values(enable=False, modified_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    columns = (
+        Account.id,
+        Account.user_id,
+        Account.email,
+        Account.service_title,
+        case((expired, True), else_=False).label("expired"),
+    )
+
+    if db.get_bind().dialect.update_returning:
+        rows = db.execute(statement.returning(*columns)).all()
+    else:
+        rows = db.execute(select(*columns).where(statement.whereclause)).all()
+        db.execute(statement.where(Account.id.in_([row.id for row in rows])))
+
+    if commit:
+        db.commit()
+
+    return rows
+
+
 def update_account_user_title(db: Session, db_account: Account, title: str):
     db_account.user_title = title
     db.commit()
@@ -166,9 +280,17 @@ def get_accounts(
     user_id: int = 0,
     return_with_count: bool = True,
     q: str = None,
+    cursor: Optional[list] = None,
+    count_mode: CountMode = CountMode.exact,
+    compact: bool = False,
 ) -> Tuple[List[Account], int]:
     query = db.query(Account)
 
+    if compact:
+        query = query.options(
+            load_only(*schema_columns(Account, AccountCompactResponse))
+        )
+
     if filter_enable:
         if not test_account:
             query = query.filter(
@@ -176,23 +298,10 @@ def get_accounts(
             )
         query = query.filter(Account.enable == enable)
 
-    if sort:
-        query = query.order_by(*(opt.value for opt in sort))
-
     if q:
         query = query.join(User, Account.user_id == User.id)
         query = query.filter(
-            or_(
-                Account.email.ilike(f"%{q}%"),
-                Account.user_title.ilike(f"%{q}%"),
-                Account.service_title.ilike(f"%{q}%"),
-                Account.uuid.ilike(f"%{q}%"),
-                User.first_name.ilike(f"%{q}%"),
-                User.last_name.ilike(f"%{q}%"),
-                User.username.ilike(f"%{q}%"),
-                User.telegram_username.ilike(f"%{q}%"),
-                cast(User.telegram_chat_id, String).ilike(f"%{q}%"),
-            )
+            search_filter(ACCOUNT_SEARCH_COLUMNS + ACCOUNT_USER_SEARCH_COLUMNS, q)
         )
 
     if user_id > 0:
@@ -201,17 +310,20 @@ def get_accounts(
     if host_zone_id > 0:
         query = query.filter(Account.host_zone_id == host_zone_id)
 
-    count = query.count()
-
-    if offset:
-        query = query.offset(offset)
-    if limit:
-        query = query.limit(limit)
+    accounts, count = paginate(
+        query,
+        Account,
+        sort=sort,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode if return_with_count else CountMode.none,
+    )
 
     if return_with_count:
-        return query.all(), count
+        return accounts, count
     else:
-        return query.all()
+        return accounts
 
 
 def get_user_last_test_account(
@@ -231,57 +343,341 @@ def get_user_last_test_account(
     return query.first()
 
 
+def sum_used_traffic(
+    db: Session,
+    start: Optional[datetime.datetime] = None,
+    account_id: Optional[int] = None,
+) -> Tuple[int, int]:
+    """
+    Download and upload since start, of one account or of all of them.
+
+    Raw rows are compacted after TRAFFIC_RAW_RETENTION_DAYS but never past the
+    hourly rollup watermark, so they are summed from the watermark on. Earlier
+    traffic is read from the hourly buckets, and from the daily ones for days
+    whose hourly buckets were compacted, counted from the hour or day of start.
+    """
+    Rollup = AccountUsedTrafficRollup
+
+    totals = [0, 0]
+
+    def _add(query):
+        download, upload = query.one()
+        totals[0] += download or 0
+        totals[1] += upload or 0
+
+    def _rollup_query(period: AccountUedTrafficTrunc):
+        return db.query(func.sum(Rollup.download), func.sum(Rollup.upload)).filter(
+            Rollup.period == period.value, Rollup.account_id == (account_id or 0)
+        )
+
+    watermark = get_used_traffic_rollup_watermark(
+        db=db, period=AccountUedTrafficTrunc.HOUR
+    )
+
+    raw_query = db.query(
+        func.sum(AccountUsedTraffic.download), func.sum(AccountUsedTraffic.upload)
+    )
+    if account_id is not None:
+        raw_query = raw_query.filter(AccountUsedTraffic.account_id == account_id)
+
+    raw_start = start
+    if watermark is not None and (start is None or start < watermark):
+        raw_start = watermark
+
+        # Days before the first whole day of hourly buckets come from daily ones
+        hourly_start = (
+            db.query(func.min(Rollup.bucket))
+            .filter(Rollup.period == AccountUedTrafficTrunc.HOUR.value)
+            .scalar()
+        )
+        hourly_day = _truncate_datetime(hourly_start, AccountUedTrafficTrunc.DAY)
+        if hourly_day < hourly_start:
+            hourly_day += datetime.timedelta(days=1)
+        hourly_day = min(
+            hourly_day, _truncate_datetime(watermark, AccountUedTrafficTrunc.DAY)
+        )
+
+        hourly_query = _rollup_query(AccountUedTrafficTrunc.HOUR).filter(
+            Rollup.bucket >= hourly_day, Rollup.bucket < watermark
+        )
+        if start is not None:
+            hourly_query = hourly_query.filter(
+                Rollup.bucket >= _truncate_datetime(start, AccountUedTrafficTrunc.HOUR)
+            )
+        _add(hourly_query)
+
+        if start is None or start < hourly_day:
+            daily_query = _rollup_query(AccountUedTrafficTrunc.DAY).filter(
+                Rollup.bucket < hourly_day
+            )
+            if start is not None:
+                daily_query = daily_query.filter(
+                    Rollup.bucket
+                    >= _truncate_datetime(start, AccountUedTrafficTrunc.DAY)
+                )
+            _add(daily_query)
+
+    if raw_start is not None:
+        raw_query = raw_query.filter(AccountUsedTraffic.created_at >= raw_start)
+    _add(raw_query)
+
+    return totals[0], totals[1]
+
+
 def get_account_used_traffic(
     db: Session, db_account: Account, delta: int = 3
 ) -> AccountUsedTrafficResponse:
-    today = datetime.datetime.now()
-    n_days_ago = today - datetime.timedelta(days=delta)
+    start = None
+    if delta and delta > 0:
+        start = datetime.datetime.utcnow() - datetime.timedelta(days=delta)
 
-    query = db.query(
-        func.sum(AccountUsedTraffic.download).label("total_download"),
-        func.sum(AccountUsedTraffic.upload).label("total_upload"),
-    ).filter(
-        and_(
-            AccountUsedTraffic.account_id == db_account.id,
-        )
+    download, upload = sum_used_traffic(db=db, start=start, account_id=db_account.id)
+
+    return AccountUsedTrafficResponse(
+        account_id=db_account.id, download=download, upload=upload
     )
 
-    if delta > 0:
-        query.filter(and_(AccountUsedTraffic.created_at >= n_days_ago))
 
-    sum_result = query.one()
+def get_all_accounts_used_traffic(
+    db: Session, delta: int = 3
+) -> AccountUsedTrafficResponse:
+    start = None
+    if delta and delta > 0:
+        start = datetime.datetime.utcnow() - datetime.timedelta(days=delta)
+
+    logging.info("Generate Account used traffic report from " + str(start))
+
+    download, upload = sum_used_traffic(db=db, start=start)
+
+    return AccountUsedTrafficResponse(account_id=0, download=download, upload=upload)
 
-    if query:
-        return AccountUsedTrafficResponse(
-            account_id=db_account.id,
-            download=sum_result[0] or 0,
-            upload=sum_result[1] or 0,
+
+def get_used_traffic_rollup_watermark(
+    db: Session, period: AccountUedTrafficTrunc, model=AccountUsedTrafficRollup
+) -> Optional[datetime.datetime]:
+    return (
+        db.query(func.max(model.bucket))
+        .filter(model.period == AccountUedTrafficTrunc(period).value)
+        .scalar()
+    )
+
+
+def rollup_used_traffic(db: Session, period: AccountUedTrafficTrunc) -> int:
+    """
+    Rebuild the hour or day rollup buckets from the last rolled up bucket on.
+
+    Hourly buckets are summed from raw rows and daily buckets from the hourly
+    ones, so raw rows can be compacted once they are rolled up. The last bucket
+    may still have been open on the previous run, so it is always rebuilt.
+    Returns the number of per account buckets written.
+    """
+    period = AccountUedTrafficTrunc(period)
+    Rollup = AccountUsedTrafficRollup
+
+    watermark = get_used_traffic_rollup_watermark(db=db, period=period)
+
+    if period == AccountUedTrafficTrunc.HOUR:
+        source = AccountUsedTraffic
+        source_bucket = AccountUsedTraffic.created_at
+        source_filters = []
+    elif period == AccountUedTrafficTrunc.DAY:
+        source = Rollup
+        source_bucket = Rollup.bucket
+        source_filters = [
+            Rollup.period == AccountUedTrafficTrunc.HOUR.value,
+            Rollup.account_id > 0,
+        ]
+    else:
+        raise ValueError(f"Unsupported rollup period {period.value}")
+
+    if watermark is not None:
+        source_filters.append(source_bucket >= watermark)
+
+        db.query(Rollup).filter(
+            Rollup.period == period.value, Rollup.bucket >= watermark
+        ).delete(synchronize_session=False)
+
+    bucket = date_trunc(db, period, source_bucket)
+    columns = [
+        Rollup.period,
+        Rollup.bucket,
+        Rollup.account_id,
+        Rollup.download,
+        Rollup.upload,
+        Rollup.count,
+    ]
+
+    accounts_query = (
+        select(
+            literal(period.value),
+            bucket,
+            source.account_id,
+            func.coalesce(func.sum(source.download), 0),
+            func.coalesce(func.sum(source.upload), 0),
+            literal(1),
         )
+        .where(source.account_id.isnot(None), *source_filters)
+        .group_by(source.account_id, bucket)
+    )
+    result = db.execute(insert(Rollup).from_select(columns, accounts_query))
+
+    total_filters = [Rollup.period == period.value, Rollup.account_id > 0]
+    if watermark is not None:
+        total_filters.append(Rollup.bucket >= watermark)
+
+    total_query = (
+        select(
+            literal(period.value),
+            Rollup.bucket,
+            literal(0),
+            func.sum(Rollup.download),
+            func.sum(Rollup.upload),
+            func.count(Rollup.id),
+        )
+        .where(*total_filters)
+        .group_by(Rollup.bucket)
+    )
+    db.execute(insert(Rollup).from_select(columns, total_query))
+
+    db.commit()
 
+    return result.rowcount
+
+
+def rollup_node_used_traffic(db: Session, period: AccountUedTrafficTrunc) -> int:
+    """
+    Rebuild the hour or day traffic buckets per host and inbound, the same way
+    as rollup_used_traffic. Inbound 0 holds the totals of each host.
+    Returns the number of buckets written.
+    """
+    period = AccountUedTrafficTrunc(period)
+    Rollup = NodeUsedTrafficRollup
+
+    watermark = get_used_traffic_rollup_watermark(db=db, period=period, model=Rollup)
+
+    if watermark is not None:
+        db.query(Rollup).filter(
+            Rollup.period == period.value, Rollup.bucket >= watermark
+        ).delete(synchronize_session=False)
+
+    columns = [
+        Rollup.period,
+        Rollup.bucket,
+        Rollup.host_id,
+        Rollup.inbound_id,
+        Rollup.download,
+        Rollup.upload,
+        Rollup.count,
+    ]
+
+    if period == AccountUedTrafficTrunc.HOUR:
+        bucket = date_trunc(db, period, AccountUsedTraffic.created_at)
+
+        filters = [AccountUsedTraffic.host_id.isnot(None)]
+        if watermark is not None:
+            filters.append(AccountUsedTraffic.created_at >= watermark)
+
+        def _node_query(inbound_id):
+            group_by = [AccountUsedTraffic.host_id, bucket]
+            if inbound_id is None:
+                inbound_id = func.coalesce(AccountUsedTraffic.inbound_id, 0)
+                group_by.append(AccountUsedTraffic.inbound_id)
+
+            return (
+                select(
+                    literal(period.value),
+                    bucket,
+                    AccountUsedTraffic.host_id,
+                    inbound_id,
+                    func.coalesce(func.sum(AccountUsedTraffic.download), 0),
+                    func.coalesce(func.sum(AccountUsedTraffic.upload), 0),
+                    func.count(distinct(AccountUsedTraffic.account_id)),
+                )
+                .where(*filters)
+                .group_by(*group_by)
+            )
+
+        queries = [_node_query(inbound_id=None), _node_query(inbound_id=literal(0))]
+    elif period == AccountUedTrafficTrunc.DAY:
+        hourly = aliased(Rollup)
+        bucket = date_trunc(db, period, hourly.bucket)
+
+        filters = [hourly.period == AccountUedTrafficTrunc.HOUR.value]
+        if watermark is not None:
+            filters.append(hourly.bucket >= watermark)
+
+        queries = [
+            select(
+                literal(period.value),
+                bucket,
+                hourly.host_id,
+                hourly.inbound_id,
+                func.coalesce(func.sum(hourly.download), 0),
+                func.coalesce(func.sum(hourly.upload), 0),
+                func.max(hourly.count),
+            )
+            .where(*filters)
+            .group_by(hourly.host_id, hourly.inbound_id, bucket)
+        ]
     else:
-        return AccountUsedTrafficResponse(account_id=db_account.id)
+        raise ValueError(f"Unsupported rollup period {period.value}")
+
+    total = 0
+    for query in queries:
+        total += db.execute(insert(Rollup).from_select(columns, query)).rowcount
+
+    db.commit()
+
+    return total
 
 
-def get_all_accounts_used_traffic(db: Session, delta: int = 3) -> AccountUsedTraffic:
-    today = datetime.datetime.now()
-    n_days_ago = today - datetime.timedelta(days=delta)
+def compact_used_traffic(
+    db: Session, raw_before: datetime.datetime, hourly_before: datetime.datetime
+) -> Tuple[int, int]:
+    """
+    Delete raw rows and hourly buckets that are past retention and already
+    covered by the next rollup level. Returns the deleted raw and hourly counts.
+    """
+    Rollup = AccountUsedTrafficRollup
 
-    logging.info("Generate Account used traffic report from " + str(n_days_ago))
+    raw_deleted, hourly_deleted = 0, 0
 
-    query = db.query(
-        func.sum(AccountUsedTraffic.download).label("total_download"),
-        func.sum(AccountUsedTraffic.upload).label("total_upload"),
-    ).filter(and_(AccountUsedTraffic.created_at >= n_days_ago))
+    hourly_watermark = get_used_traffic_rollup_watermark(
+        db=db, period=AccountUedTrafficTrunc.HOUR
+    )
+    node_hourly_watermark = get_used_traffic_rollup_watermark(
+        db=db, period=AccountUedTrafficTrunc.HOUR, model=NodeUsedTrafficRollup
+    )
+    if hourly_watermark is not None:
+        raw_before = min(raw_before, hourly_watermark)
 
-    sum_result = query.one()
+        # Rows recorded before hosts were tracked never reach the node rollups
+        if node_hourly_watermark is not None:
+            raw_before = min(raw_before, node_hourly_watermark)
 
-    if query:
-        return AccountUsedTrafficResponse(
-            account_id=0, download=sum_result[0], upload=sum_result[1]
+        raw_deleted = (
+            db.query(AccountUsedTraffic)
+            .filter(AccountUsedTraffic.created_at < raw_before)
+            .delete(synchronize_session=False)
         )
 
-    else:
-        return AccountUsedTrafficResponse(account_id=0)
+    for model in (Rollup, NodeUsedTrafficRollup):
+        daily_watermark = get_used_traffic_rollup_watermark(
+            db=db, period=AccountUedTrafficTrunc.DAY, model=model
+        )
+        if daily_watermark is not None:
+            hourly_deleted += (
+                db.query(model)
+                .filter(
+                    model.period == AccountUedTrafficTrunc.HOUR.value,
+                    model.bucket < min(hourly_before, daily_watermark),
+                )
+                .delete(synchronize_session=False)
+            )
+
+    db.commit()
+
+    return raw_deleted, hourly_deleted
 
 
 def get_account_used_traffic_report(
@@ -291,33 +687,42 @@ def get_account_used_traffic_report(
     end_date: datetime.datetime = None,
     trunc: AccountUedTrafficTrunc = AccountUedTrafficTrunc.HOUR,
 ) -> List[AccountUsedTrafficReportResponse]:
-    query = db.query(
-        func.date_trunc(trunc, AccountUsedTraffic.created_at).label("date"),
-        func.sum(AccountUsedTraffic.download).label("total_download"),
-        func.sum(AccountUsedTraffic.upload).label("total_upload"),
-        func.count(distinct(AccountUsedTraffic.account_id)).label("count"),
-    ).group_by(func.date_trunc(trunc, AccountUsedTraffic.created_at))
-
-    if end_date:
-        query = query.filter(
-            and_(
-                AccountUsedTraffic.created_at <= end_date,
+    trunc = AccountUedTrafficTrunc(trunc)
+    Rollup = AccountUsedTrafficRollup
+
+    if trunc in (AccountUedTrafficTrunc.HOUR, AccountUedTrafficTrunc.DAY):
+        # Hour and day buckets are read as they are, account 0 holds the totals
+        query = db.query(
+            Rollup.bucket.label("date"),
+            Rollup.download,
+            Rollup.upload,
+            Rollup.count,
+        ).filter(Rollup.period == trunc.value, Rollup.account_id == account_id)
+    else:
+        bucket = date_trunc(db, trunc, Rollup.bucket)
+
+        query = (
+            db.query(
+                bucket.label("date"),
+                func.sum(Rollup.download).label("total_download"),
+                func.sum(Rollup.upload).label("total_upload"),
+                func.count(distinct(Rollup.account_id)).label("count"),
             )
-        )
-
-    if start_date:
-        query = query.filter(
-            and_(
-                AccountUsedTraffic.created_at >= start_date,
+            .filter(
+                Rollup.period == AccountUedTrafficTrunc.DAY.value,
+                Rollup.account_id > 0,
             )
+            .group_by(bucket)
         )
 
-    if account_id > 0:
-        query = query.filter(
-            and_(
-                AccountUsedTraffic.account_id == account_id,
-            )
-        )
+        if account_id > 0:
+            query = query.filter(Rollup.account_id == account_id)
+
+    if end_date:
+        query = query.filter(Rollup.bucket <= end_date)
+
+    if start_date:
+        query = query.filter(Rollup.bucket >= _truncate_datetime(start_date, trunc))
 
     query = query.order_by(desc("date"))
 
@@ -328,13 +733,119 @@ def get_account_used_traffic_report(
     for res in db_result:
         result.append(
             AccountUsedTrafficReportResponse(
-                date=res[0], download=res[1], upload=res[2], count=res[3]
+                account_id=account_id,
+                date=res[0],
+                download=res[1],
+                upload=res[2],
+                count=res[3],
             )
         )
 
     return result
 
 
+def get_node_used_traffic_report(
+    db: Session,
+    host_id: int,
+    inbound_id: int = 0,
+    start_date: datetime.datetime = None,
+    end_date: datetime.datetime = None,
+    trunc: AccountUedTrafficTrunc = AccountUedTrafficTrunc.HOUR,
+) -> List[NodeUsedTrafficReportResponse]:
+    trunc = AccountUedTrafficTrunc(trunc)
+    Rollup = NodeUsedTrafficRollup
+
+    if trunc in (AccountUedTrafficTrunc.HOUR, AccountUedTrafficTrunc.DAY):
+        query = db.query(
+            Rollup.bucket.label("date"),
+            Rollup.download,
+            Rollup.upload,
+            Rollup.count,
+        ).filter(Rollup.period == trunc.value)
+    else:
+        bucket = date_trunc(db, trunc, Rollup.bucket)
+
+        query = (
+            db.query(
+                bucket.label("date"),
+                func.sum(Rollup.download).label("total_download"),
+                func.sum(Rollup.upload).label("total_upload"),
+                func.max(Rollup.count).label("count"),
+            )
+            .filter(Rollup.period == AccountUedTrafficTrunc.DAY.value)
+            .group_by(bucket)
+        )
+
+    query = query.filter(Rollup.host_id == host_id, Rollup.inbound_id == inbound_id)
+
+    if end_date:
+        query = query.filter(Rollup.bucket <= end_date)
+
+    if start_date:
+        query = query.filter(Rollup.bucket >= _truncate_datetime(start_date, trunc))
+
+    query = query.order_by(desc("date"))
+
+    return [
+        NodeUsedTrafficReportResponse(
+            host_id=host_id,
+            inbound_id=inbound_id,
+            date=res[0],
+            download=res[1],
+            upload=res[2],
+            count=res[3],
+        )
+        for res in query.all()
+    ]
+
+
+def get_hosts_used_traffic(
+    db: Session,
+    start_date: datetime.datetime,
+    end_date: datetime.datetime = None,
+):
+    """Traffic carried by every host between the dates, from the hourly buckets."""
+    Rollup = NodeUsedTrafficRollup
+
+    query = (
+        db.query(
+            Host.id.label("host_id"),
+            Host.name,
+            Host.host_zone_id,
+            func.coalesce(func.sum(Rollup.download), 0).label("download"),
+            func.coalesce(func.sum(Rollup.upload), 0).label("upload"),
+            func.coalesce(func.max(Rollup.count), 0).label("peak_accounts"),
+        )
+        .outerjoin(
+            Rollup,
+            and_(
+                Rollup.host_id == Host.id,
+                Rollup.inbound_id == 0,
+                Rollup.period == AccountUedTrafficTrunc.HOUR.value,
+                Rollup.bucket
+                >= _truncate_datetime(start_date, AccountUedTrafficTrunc.HOUR),
+                *([Rollup.bucket <= end_date] if end_date else []),
+            ),
+        )
+        .group_by(Host.id, Host.name, Host.host_zone_id)
+        .order_by(Host.host_zone_id, Host.id)
+    )
+
+    return query.all()
+
+
+def _truncate_datetime(
+    value: datetime.datetime, trunc: AccountUedTrafficTrunc
+) -> datetime.datetime:
+    value = value.replace(minute=0, second=0, microsecond=0)
+
+    if trunc == AccountUedTrafficTrunc.HOUR:
+        return value
+
+    # Coarser reports are built from daily buckets
+    return value.replace(hour=0)
+
+
 def remove_account(db: Session, db_account: Account):
     db.query(Notification).filter(Notification.account_id == db_account.id).delete()
 
@@ -342,6 +853,10 @@ def remove_account(db: Session, db_account: Account):
         AccountUsedTraffic.account_id == db_account.id
     ).delete()
 
+    db.query(AccountUsedTrafficRollup).filter(
+        AccountUsedTrafficRollup.account_id == db_account.id
+    ).delete()
+
     db.delete(db_account)
     db.commit()
     return db_account
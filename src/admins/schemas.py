@@ -4,11 +4,9 @@ from typing import List
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel, root_validator, validator
-from sqlalchemy.orm import Session
 from passlib.context import CryptContext
 
 from src.config import SUDOERS
-from src.database import get_db
 from src.utils.jwt import get_admin_payload
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -25,9 +23,7 @@ class Admin(BaseModel):
     is_sudo: bool = False
 
     @classmethod
-    def get_current(
-        cls, db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)
-    ):
+    def get_current(cls, token: str = Depends(oauth2_scheme)):
         exc = HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
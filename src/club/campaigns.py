@@ -1,15 +1,13 @@
 import math
-from typing import Dict, List
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
-from telebot.apihelper import ApiTelegramException
 
 from src import config, logger, messages
 from src.club import service as club_service
 from src.club.schemas import ClubScoreCreate
-from src.commerce.schemas import OrderStatus
-from src.commerce.service import OrderSortingOptions
-from src.telegram import bot
+from src.commerce.models import Order
 from src.users import service as user_service
 from src.commerce import service as commerce_service
 from src.users.models import User
@@ -40,72 +38,162 @@ class CampaignRegistryBaseClass(metaclass=CampaignRegistryBase):
     class and the associated value, the class itself.
     """
 
-    def run_campaign(self, db: Session):
+    def run_campaign(
+        self,
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ):
+        """
+        Run the campaign, passing start_date or end_date runs it in backfill mode
+        for the given range.
+        """
         pass
 
 
 class OrderCampaign(CampaignRegistryBaseClass):
+    batch_size = 500
 
-    def run_campaign(self, db: Session, total=None):
-        logger.info(f"Run {self.__class__.__name__}")
+    # Orders completed in the last minutes may still be committing
+    checkpoint_delay = timedelta(minutes=5)
+
+    def _get_scores(
+        self, db: Session, db_orders: List[Order]
+    ) -> List[Tuple[User, ClubScoreCreate]]:
+        campaign_key = self.__class__.__name__
 
-        db_orders = commerce_service.get_orders(
+        db_orders = [
+            db_order
+            for db_order in db_orders
+            if db_order.total - db_order.total_discount_amount > 0
+            and db_order.user.referral_user_id is not None
+            and db_order.user.referral_user_id > 0
+        ]
+
+        scored_unique_ids = club_service.get_scored_unique_ids(
             db=db,
-            sort=[OrderSortingOptions["-created"]],
-            status=OrderStatus.completed,
-            return_with_count=False,
+            campaign_key=campaign_key,
+            unique_ids=[str(db_order.id) for db_order in db_orders],
         )
 
+        referral_users = {
+            db_user.id: db_user
+            for db_user in user_service.get_users_by_ids(
+                db=db,
+                user_ids=list(
+                    {db_order.user.referral_user_id for db_order in db_orders}
+                ),
+            )
+        }
+
+        scores = []
         for db_order in db_orders:
+            referral_user = referral_users.get(db_order.user.referral_user_id)
+
+            if str(db_order.id) in scored_unique_ids or referral_user is None:
+                continue
+
+            total = db_order.total - db_order.total_discount_amount
+            score = math.ceil(
+                (total * (config.REFERRAL_ORDER_SCORE_PERCENT / 100))
+                / config.CLUB_SCORE_PRICE
+            )
+
+            logger.info(
+                f"User {referral_user.full_name} "
+                f"winn {score} score "
+                f"form order {db_order.id} by {db_order.user.full_name} "
+            )
+
+            scores.append(
+                (
+                    referral_user,
+                    ClubScoreCreate(
+                        unique_id=str(db_order.id),
+                        score=score,
+                        campaign_key=campaign_key,
+                        description=messages.REFERRAL_ORDER_BONUS_DESCRIPTION.format(
+                            full_name=db_order.user.full_name,
+                            percent=config.REFERRAL_ORDER_SCORE_PERCENT,
+                        ),
+                    ),
+                )
+            )
+
+        return scores
+
+    def run_campaign(
+        self,
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ):
+        campaign_key = self.__class__.__name__
+        backfill = start_date is not None or end_date is not None
+
+        logger.info(f"Run {campaign_key}" + (" in backfill mode" if backfill else ""))
+
+        db_checkpoint = None
+        modified_after = None
+        after_id = 0
+
+        if not backfill:
+            db_checkpoint = club_service.get_campaign_checkpoint(
+                db=db, campaign_key=campaign_key
+            )
+            modified_after = db_checkpoint.last_processed_at
+            after_id = db_checkpoint.last_processed_id
+
+        modified_before = datetime.utcnow() - self.checkpoint_delay
+        total_orders = 0
+        total_scores = 0
+
+        while True:
+            db_orders = commerce_service.get_completed_orders_after(
+                db=db,
+                limit=self.batch_size,
+                modified_after=modified_after,
+                after_id=after_id,
+                modified_before=modified_before,
+                start_date=start_date,
+                end_date=end_date,
+            )
+
+            if not db_orders:
+                break
+
             try:
+                scores = self._get_scores(db=db, db_orders=db_orders)
+
+                club_service.create_bulk_scores(db=db, scores=scores, commit=False)
 
-                total = db_order.total - db_order.total_discount_amount
+                modified_after = db_orders[-1].modified_at
+                after_id = db_orders[-1].id
 
-                if total > 0:
-                    club_score = club_service.get_club_score_by_unique_id(
+                if db_checkpoint is not None:
+                    club_service.update_campaign_checkpoint(
                         db=db,
-                        unique_id=str(db_order.id),
-                        campaign_key=self.__class__.__name__,
+                        db_checkpoint=db_checkpoint,
+                        last_processed_id=after_id,
+                        last_processed_at=modified_after,
+                        commit=False,
                     )
 
-                    if (
-                        club_score is None
-                        and db_order.user.referral_user_id is not None
-                        and db_order.user.referral_user_id > 0
-                    ):
-
-                        score = math.ceil(
-                            (total * (config.REFERRAL_ORDER_SCORE_PERCENT / 100))
-                            / config.CLUB_SCORE_PRICE
-                        )
-
-                        referral_user = user_service.get_user(
-                            db=db, user_id=db_order.user.referral_user_id
-                        )
-
-                        if referral_user is not None:
-                            logger.info(
-                                f"User {referral_user.full_name} "
-                                f"winn {score} score "
-                                f"form order {db_order.id} by {db_order.user.full_name} "
-                            )
+                db.commit()
+            except Exception as error:
+                db.rollback()
+                logger.error(error)
+                break
 
-                            club_score = ClubScoreCreate(
-                                unique_id=str(db_order.id),
-                                score=score,
-                                campaign_key=self.__class__.__name__,
-                                description=messages.REFERRAL_ORDER_BONUS_DESCRIPTION.format(
-                                    full_name=db_order.user.full_name,
-                                    percent=config.REFERRAL_ORDER_SCORE_PERCENT,
-                                ),
-                            )
+            total_orders += len(db_orders)
+            total_scores += len(scores)
 
-                            club_service.create_score(
-                                db=db, db_user=referral_user, club_score=club_score
-                            )
+            if len(db_orders) < self.batch_size:
+                break
 
-            except Exception as error:
-                logger.error(error)
+        logger.info(
+            f"{campaign_key} processed {total_orders} orders and created {total_scores} scores"
+        )
 
 
 class ReferralCampaign(CampaignRegistryBaseClass):
@@ -124,24 +212,28 @@ class ReferralCampaign(CampaignRegistryBaseClass):
             return config.REFERRAL_SCORE_80_TO_1000
 
     @classmethod
-    def _is_channel_member(cls, db_user: User):
-        result = bot.get_chat_member(
-            chat_id=f"@{config.TELEGRAM_CHANNEL}",
-            user_id=db_user.telegram_chat_id,
-        )
-        if result.status in ["administrator", "creator", "member"]:
-            return True
-        else:
-            return False
-
-    def run_campaign(self, db: Session):
+    def _is_channel_member(cls, db: Session, db_user: User):
+        return club_service.is_channel_member(db=db, user_id=db_user.id)
+
+    def run_campaign(
+        self,
+        db: Session,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+    ):
         logger.info(f"Run {self.__class__.__name__}")
-        db_users = user_service.get_users(
-            db=db,
-            limit=100,
-            sort=[UserSortingOptions["-created"]],
-            return_with_count=False,
-        )
+
+        if start_date is not None or end_date is not None:
+            db_users = user_service.get_users_created_between(
+                db=db, start_date=start_date, end_date=end_date
+            )
+        else:
+            db_users = user_service.get_users(
+                db=db,
+                limit=100,
+                sort=[UserSortingOptions["-created"]],
+                return_with_count=False,
+            )
         for db_user in db_users:
             try:
                 if (
@@ -150,7 +242,7 @@ class ReferralCampaign(CampaignRegistryBaseClass):
                     and db_user.telegram_chat_id
                 ):
 
-                    if self._is_channel_member(db_user=db_user):
+                    if self._is_channel_member(db=db, db_user=db_user):
                         referral_user = user_service.get_user(
                             db=db, user_id=db_user.referral_user_id
                         )
@@ -191,7 +283,5 @@ class ReferralCampaign(CampaignRegistryBaseClass):
                                     db=db, db_user=referral_user, club_score=club_score
                                 )
 
-            except ApiTelegramException:
-                pass
             except Exception as error:
                 logger.error(error)
@@ -1,18 +1,15 @@
-import asyncio
-from datetime import datetime
-from typing import List
+import time
+from datetime import datetime, timedelta
 
 from apscheduler.triggers.cron import CronTrigger
 from telebot.apihelper import ApiTelegramException
 
 from src import scheduler, config, logger
 from src.club.campaigns import CampaignRegistryBase
-from src.club.schemas import ClubProfileCreate
 from src.database import GetDB
-import src.users.service as user_service
+from src.system.scheduler import count_job_items
 import src.club.service as club_service
 from src.telegram import bot
-from src.users.models import User
 
 
 def run_campaigns():
@@ -34,85 +31,73 @@ def sync_club_profiles():
 
         logger.info("Start sync Club Profile total subset " + str(datetime.now()))
 
-        db_users = user_service.get_users(
-            db=db,
-            sort=[user_service.UserSortingOptions["-created"]],
-            return_with_count=False,
-        )
-
-        logger.info(f"Total users is {len(db_users)}")
-        for db_user in db_users:
-            try:
-
-                referral_users = user_service.get_user_referral_users(db, db_user.id)
-
-                if len(referral_users) > 0:
-                    logger.info(
-                        f"User: {db_user.full_name} Referral users: {len(referral_users)}"
-                    )
-
-                    total_subset = _calculate_referral_count(referral_users)
-                    db_club_profile = club_service.get_club_profile(db, db_user.id)
-
-                    logger.info(
-                        f"Referral user for {db_user.full_name} count is {total_subset}/{len(referral_users)}"
-                    )
-
-                    club_service.update_club_profile_subset(
-                        db, db_club_profile, total_subset
-                    )
-
-            except Exception as error:
-                logger.error(error)
+        try:
+            total_changed = club_service.sync_club_profiles_subset(db)
+            count_job_items(total_changed)
+            logger.info(f"Total subset of {total_changed} club profiles changed")
+        except Exception as error:
+            logger.error(error)
 
         end = datetime.utcnow().timestamp()
         logger.info(f"Finish sync Club Profile total subset {int(end - start)} Sec")
 
 
-def create_new_club_profiles():
+def refresh_channel_members():
+    if bot is None or not config.TELEGRAM_CHANNEL:
+        logger.info("Telegram channel is not configured, Skip refresh members")
+        return
+
     with GetDB() as db:
-        db_users = user_service.get_users(
+        start = datetime.utcnow().timestamp()
+
+        db_users = club_service.get_channel_members_to_refresh(
             db=db,
-            sort=[user_service.UserSortingOptions["-created"]],
-            return_with_count=False,
+            checked_before=datetime.utcnow()
+            - timedelta(seconds=config.CHANNEL_MEMBER_TTL),
+            limit=config.CHANNEL_MEMBER_REFRESH_LIMIT,
         )
+
+        refreshed = 0
         for db_user in db_users:
             try:
-                db_club_profile = club_service.get_club_profile(db, db_user.id)
-
-                if db_club_profile is None:
-                    club_pofile = ClubProfileCreate(total_score=0, total_subset=0)
-
-                    club_service.create_club_profile(db, db_user, club_pofile)
-
-                    logger.info(
-                        f"New club profile hase been added for {db_user.full_name} [{db_user.id}]"
-                    )
-
+                result = bot.get_chat_member(
+                    chat_id=f"@{config.TELEGRAM_CHANNEL}",
+                    user_id=db_user.telegram_chat_id,
+                )
+                status = result.status
+            except ApiTelegramException as error:
+                if error.error_code == 429:
+                    logger.warn("Telegram rate limit reached, Stop refresh members")
+                    break
+                status = "unknown"
             except Exception as error:
                 logger.error(error)
+                continue
+
+            club_service.set_channel_member_status(
+                db=db, db_user=db_user, status=status, commit=False
+            )
+            refreshed += 1
+            count_job_items()
+
+            time.sleep(config.CHANNEL_MEMBER_REFRESH_DELAY)
 
+        db.commit()
 
-def _is_channel_member(db_user: User):
-    result = bot.get_chat_member(
-        chat_id=f"@{config.TELEGRAM_CHANNEL}", user_id=db_user.telegram_chat_id
-    )
-    if result.status in ["administrator", "creator", "member"]:
-        logger.info(f"User {db_user.full_name} is channel member")
-        return True
-    else:
-        return False
+        end = datetime.utcnow().timestamp()
+        logger.info(
+            f"Refresh {refreshed}/{len(db_users)} channel members in {int(end - start)} Sec"
+        )
 
 
-def _calculate_referral_count(users: List[User]):
-    count = 0
-    for db_user in users:
+def create_new_club_profiles():
+    with GetDB() as db:
         try:
-            if _is_channel_member(db_user=db_user):
-                count += 1
-        except ApiTelegramException:
-            pass
-    return count
+            total_created = club_service.create_missing_club_profiles(db)
+            if total_created:
+                logger.info(f"{total_created} new club profiles have been added")
+        except Exception as error:
+            logger.error(error)
 
 
 scheduler.add_job(
@@ -120,3 +105,10 @@ scheduler.add_job(
     max_instances=1,
     trigger=CronTrigger.from_crontab(config.CLUB_CAMPAIGN_RUN_CRON),
 )
+
+scheduler.add_job(
+    func=refresh_channel_members,
+    max_instances=1,
+    trigger="interval",
+    seconds=config.CHANNEL_MEMBER_REFRESH_INTERVAL,
+)
@@ -1,6 +1,7 @@
 from datetime import datetime
 
 from sqlalchemy import (
+    Boolean,
     Column,
     DateTime,
     Integer,
@@ -44,3 +45,28 @@ class ClubScore(Base):
     __table_args__ = (
         Index("campaign_key_unique_id_idx", unique_id, campaign_key, unique=True),
     )
+
+
+class ClubChannelMember(Base):
+    __tablename__ = "club_channel_member"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("user.id"), index=True, unique=True)
+
+    is_member = Column(Boolean, default=False, nullable=False)
+    status = Column(String(32), nullable=True)
+
+    checked_at = Column(DateTime, default=datetime.utcnow, index=True)
+
+
+class ClubCampaignCheckpoint(Base):
+    __tablename__ = "club_campaign_checkpoint"
+
+    id = Column(Integer, primary_key=True, index=True)
+    campaign_key = Column(String(128), nullable=False, index=True, unique=True)
+
+    last_processed_id = Column(Integer, default=0, nullable=False)
+    last_processed_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    modified_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,58 @@
+import logging
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
+
+from src.admins.schemas import Admin
+from src.database import GetDB
+
+club_router = APIRouter()
+
+logger = logging.getLogger("uvicorn.error")
+
+
+def _get_campaign_registry():
+    # Campaigns depend on the application logger, so they are loaded lazily
+    from src.club.campaigns import CampaignRegistryBase
+
+    return CampaignRegistryBase.CAMPAIGN_REGISTRY
+
+
+def _backfill_campaign(
+    campaign_key: str, start_date: Optional[datetime], end_date: Optional[datetime]
+):
+    campaign_class = _get_campaign_registry()[campaign_key]
+
+    with GetDB() as db:
+        try:
+            campaign_class().run_campaign(
+                db=db, start_date=start_date, end_date=end_date
+            )
+        except Exception as error:
+            logger.error(f"Error in backfill campaign {campaign_key}: {error}")
+
+
+@club_router.post("/club/campaigns/{campaign_key}/backfill", tags=["Club"])
+def backfill_campaign(
+    campaign_key: str,
+    background_tasks: BackgroundTasks,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    admin: Admin = Depends(Admin.get_current),
+):
+    if campaign_key not in _get_campaign_registry():
+        raise HTTPException(status_code=404, detail="Campaign not found")
+
+    if start_date is None and end_date is None:
+        raise HTTPException(
+            status_code=400, detail="start_date or end_date is required"
+        )
+
+    background_tasks.add_task(_backfill_campaign, campaign_key, start_date, end_date)
+
+    return {
+        "campaign_key": campaign_key,
+        "start_date": start_date,
+        "end_date": end_date,
+    }
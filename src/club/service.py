@@ -1,10 +1,17 @@
+from datetime import datetime
 from enum import Enum
+from typing import List, Set, Tuple
 
-from sqlalchemy import and_
+from sqlalchemy import and_, exists, func, insert, literal, or_, select
 from sqlalchemy.orm import Session
 
 from src import config
-from src.club.models import ClubScore, ClubProfile
+from src.club.models import (
+    ClubScore,
+    ClubProfile,
+    ClubChannelMember,
+    ClubCampaignCheckpoint,
+)
 from src.club.schemas import ClubScoreCreate, ClubProfileCreate
 from src.commerce import service as commerce_service
 from src.commerce.schemas import TransactionCreate, TransactionType
@@ -47,6 +54,91 @@ def create_score(db: Session, db_user: User, club_score: ClubScoreCreate) -> Clu
     return db_club_score
 
 
+def create_bulk_scores(
+    db: Session, scores: List[Tuple[User, ClubScoreCreate]], commit: bool = True
+):
+    """
+    Insert the given scores with their bonus transactions and deposit
+    notifications in one unit of work.
+    """
+    for db_user, club_score in scores:
+        db.add(
+            ClubScore(
+                user_id=db_user.id,
+                unique_id=club_score.unique_id,
+                campaign_key=club_score.campaign_key,
+                score=club_score.score,
+                description=club_score.description,
+            )
+        )
+
+        commerce_service.create_transaction(
+            db=db,
+            db_user=db_user,
+            transaction=TransactionCreate(
+                user_id=db_user.id,
+                description=club_score.description,
+                amount=club_score.score * config.CLUB_SCORE_PRICE,
+                type=TransactionType.bonus,
+            ),
+            commit=False,
+        )
+
+    if commit:
+        db.commit()
+
+
+def get_scored_unique_ids(
+    db: Session, campaign_key: str, unique_ids: List[str]
+) -> Set[str]:
+    if not unique_ids:
+        return set()
+
+    return {
+        unique_id
+        for unique_id, in db.query(ClubScore.unique_id).filter(
+            ClubScore.campaign_key == campaign_key,
+            ClubScore.unique_id.in_(unique_ids),
+        )
+    }
+
+
+def get_campaign_checkpoint(db: Session, campaign_key: str) -> ClubCampaignCheckpoint:
+    db_checkpoint = (
+        db.query(ClubCampaignCheckpoint)
+        .filter(ClubCampaignCheckpoint.campaign_key == campaign_key)
+        .first()
+    )
+
+    if db_checkpoint is None:
+        db_checkpoint = ClubCampaignCheckpoint(
+            campaign_key=campaign_key, last_processed_id=0
+        )
+        db.add(db_checkpoint)
+        db.commit()
+        db.refresh(db_checkpoint)
+
+    return db_checkpoint
+
+
+def update_campaign_checkpoint(
+    db: Session,
+    db_checkpoint: ClubCampaignCheckpoint,
+    last_processed_id: int,
+    last_processed_at: datetime,
+    commit: bool = True,
+) -> ClubCampaignCheckpoint:
+    db_checkpoint.last_processed_id = last_processed_id
+    db_checkpoint.last_processed_at = last_processed_at
+    db_checkpoint.modified_at = datetime.utcnow()
+
+    if commit:
+        db.commit()
+        db.refresh(db_checkpoint)
+
+    return db_checkpoint
+
+
 def create_club_profile(
     db: Session, db_user: User, club_profile: ClubProfileCreate
 ) -> ClubProfile:
@@ -63,6 +155,34 @@ def create_club_profile(
     return db_club_profile
 
 
+def create_missing_club_profiles(db: Session) -> int:
+    """
+    Create an empty club profile for every user without one using a single
+    INSERT ... SELECT anti-join.
+    """
+    now = datetime.utcnow()
+
+    users_without_profile = select(
+        User.id, literal(0), literal(0), literal(now), literal(now)
+    ).where(~exists().where(ClubProfile.user_id == User.id))
+
+    result = db.execute(
+        insert(ClubProfile).from_select(
+            [
+                ClubProfile.user_id,
+                ClubProfile.total_score,
+                ClubProfile.total_subset,
+                ClubProfile.created_at,
+                ClubProfile.modified_at,
+            ],
+            users_without_profile,
+        )
+    )
+    db.commit()
+
+    return result.rowcount
+
+
 def get_club_profile(db: Session, user_id: int) -> ClubProfile:
     return db.query(ClubProfile).filter(and_(ClubProfile.user_id == user_id)).first()
 
@@ -103,3 +223,94 @@ def get_club_score_by_unique_id(
         )
         .first()
     )
+
+
+def get_channel_members_to_refresh(
+    db: Session, checked_before: datetime, limit: int
+) -> List[User]:
+    """
+    Return referred users whose channel membership was never checked or was
+    checked before the given time, the least recently checked first.
+    """
+    return (
+        db.query(User)
+        .outerjoin(ClubChannelMember, ClubChannelMember.user_id == User.id)
+        .filter(
+            User.referral_user_id > 0,
+            User.telegram_chat_id.isnot(None),
+            or_(
+                ClubChannelMember.id.is_(None),
+                ClubChannelMember.checked_at < checked_before,
+            ),
+        )
+        .order_by(ClubChannelMember.checked_at.asc().nullsfirst(), User.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def set_channel_member_status(
+    db: Session, db_user: User, status: str, commit: bool = True
+) -> ClubChannelMember:
+    db_channel_member = (
+        db.query(ClubChannelMember)
+        .filter(ClubChannelMember.user_id == db_user.id)
+        .first()
+    )
+
+    if db_channel_member is None:
+        db_channel_member = ClubChannelMember(user_id=db_user.id)
+        db.add(db_channel_member)
+
+    db_channel_member.status = status
+    db_channel_member.is_member = status in ["administrator", "creator", "member"]
+    db_channel_member.checked_at = datetime.utcnow()
+
+    if commit:
+        db.commit()
+        db.refresh(db_channel_member)
+
+    return db_channel_member
+
+
+def is_channel_member(db: Session, user_id: int) -> bool:
+    is_member = (
+        db.query(ClubChannelMember.is_member)
+        .filter(ClubChannelMember.user_id == user_id)
+        .scalar()
+    )
+
+    return bool(is_member)
+
+
+def sync_club_profiles_subset(db: Session) -> int:
+    """
+    Recalculate total_subset of every club profile from the cached channel
+    memberships with one grouped query and update only the changed profiles.
+    """
+    referral_counts = dict(
+        db.query(User.referral_user_id, func.count(User.id))
+        .join(ClubChannelMember, ClubChannelMember.user_id == User.id)
+        .filter(User.referral_user_id > 0, ClubChannelMember.is_member == True)
+        .group_by(User.referral_user_id)
+        .all()
+    )
+
+    now = datetime.utcnow()
+    changes = [
+        {
+            "id": profile_id,
+            "total_subset": referral_counts.get(user_id, 0),
+            "modified_at": now,
+        }
+        for profile_id, user_id, total_subset in db.query(
+            ClubProfile.id, ClubProfile.user_id, ClubProfile.total_subset
+        ).all()
+        if (total_subset or 0) != referral_counts.get(user_id, 0)
+    ]
+
+    if changes:
+        db.bulk_update_mappings(ClubProfile, changes)
+        db.commit()
+
+    return len(changes)
@@ -10,6 +10,7 @@ from sqlalchemy import (
     Boolean,
     BigInteger,
     ForeignKey,
+    Index,
     Table,
 )
 
@@ -122,8 +123,12 @@ class Order(Base):
     total = Column(BigInteger, default=0)
     total_discount_amount = Column(BigInteger, default=0)
 
+    fulfillment_key = Column(String(128), nullable=True, unique=True)
+    fulfilled_at = Column(DateTime, nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
     modified_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    __table_args__ = (Index("ix_order_status_modified_at", status, modified_at),)
 
 
 service_host_zone = Table(
@@ -1,4 +1,5 @@
 import logging
+from typing import Optional, Union
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.exc import IntegrityError
@@ -10,6 +11,12 @@ import src.users.service as user_service
 from src.admins.schemas import Admin
 from src.commerce.models import Order, Payment, PaymentAccount
 from src.commerce.schemas import (
+    OrderCompactResponse,
+    OrdersCompactResponse,
+    PaymentCompactResponse,
+    PaymentsCompactResponse,
+    TransactionCompactResponse,
+    TransactionsCompactResponse,
     OrderResponse,
     OrderCreate,
     OrderModify,
@@ -36,6 +43,7 @@ from src.commerce.schemas import (
 )
 from src.database import get_db
 from src.exc import EloraApplicationError
+from src.utils.pagination import CountMode, get_cursor, get_next_cursor
 
 order_router = APIRouter()
 service_router = APIRouter()
@@ -140,7 +148,11 @@ def delete_order(
     return {}
 
 
-@order_router.get("/orders/", tags=["Order"], response_model=OrdersResponse)
+@order_router.get(
+    "/orders/",
+    tags=["Order"],
+    response_model=Union[OrdersResponse, OrdersCompactResponse],
+)
 def get_orders(
     offset: int = None,
     limit: int = None,
@@ -149,6 +161,9 @@ def get_orders(
     account_id: int = 0,
     user_id: int = 0,
     q: str = None,
+    count: CountMode = CountMode.exact,
+    compact: bool = False,
+    cursor: Optional[list] = Depends(get_cursor),
     db: Session = Depends(get_db),
     admin: Admin = Depends(Admin.get_current),
 ):
@@ -163,18 +178,33 @@ def get_orders(
                     status_code=400, detail=f'"{opt}" is not a valid sort option'
                 )
 
-    orders, count = commerce_service.get_orders(
-        db=db,
-        offset=offset,
-        limit=limit,
-        sort=sort,
-        status=status,
-        account_id=account_id,
-        user_id=user_id,
-        q=q,
-    )
+    try:
+        orders, total = commerce_service.get_orders(
+            db=db,
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            status=status,
+            account_id=account_id,
+            user_id=user_id,
+            q=q,
+            cursor=cursor,
+            count_mode=count,
+            compact=compact,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    next_cursor = get_next_cursor(db=db, items=orders, sort=sort, limit=limit)
 
-    return {"orders": orders, "total": count}
+    if compact:
+        return OrdersCompactResponse(
+            orders=[OrderCompactResponse.from_orm(item) for item in orders],
+            total=total,
+            next_cursor=next_cursor,
+        )
+
+    return {"orders": orders, "total": total, "next_cursor": next_cursor}
 
 
 # Service Routes
@@ -367,7 +397,11 @@ def delete_payment(
     return {}
 
 
-@payment_router.get("/payments/", tags=["Payment"], response_model=PaymentsResponse)
+@payment_router.get(
+    "/payments/",
+    tags=["Payment"],
+    response_model=Union[PaymentsResponse, PaymentsCompactResponse],
+)
 def get_payments(
     offset: int = None,
     limit: int = None,
@@ -376,6 +410,9 @@ def get_payments(
     method: PaymentMethod = None,
     user_id: int = 0,
     q: str = None,
+    count: CountMode = CountMode.exact,
+    compact: bool = False,
+    cursor: Optional[list] = Depends(get_cursor),
     db: Session = Depends(get_db),
     admin: Admin = Depends(Admin.get_current),
 ):
@@ -390,18 +427,33 @@ def get_payments(
                     status_code=400, detail=f'"{opt}" is not a valid sort option'
                 )
 
-    payments, count = commerce_service.get_payments(
-        db=db,
-        offset=offset,
-        limit=limit,
-        sort=sort,
-        status=status,
-        method=method,
-        user_id=user_id,
-        q=q,
-    )
+    try:
+        payments, total = commerce_service.get_payments(
+            db=db,
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            status=status,
+            method=method,
+            user_id=user_id,
+            q=q,
+            cursor=cursor,
+            count_mode=count,
+            compact=compact,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    next_cursor = get_next_cursor(db=db, items=payments, sort=sort, limit=limit)
 
-    return {"payments": payments, "total": count}
+    if compact:
+        return PaymentsCompactResponse(
+            payments=[PaymentCompactResponse.from_orm(item) for item in payments],
+            total=total,
+            next_cursor=next_cursor,
+        )
+
+    return {"payments": payments, "total": total, "next_cursor": next_cursor}
 
 
 # Transaction Routes
@@ -509,7 +561,9 @@ def delete_transaction(
 
 
 @transaction_router.get(
-    "/transactions/", tags=["Transaction"], response_model=TransactionsResponse
+    "/transactions/",
+    tags=["Transaction"],
+    response_model=Union[TransactionsResponse, TransactionsCompactResponse],
 )
 def get_transactions(
     offset: int = None,
@@ -518,6 +572,9 @@ def get_transactions(
     type_: TransactionType = None,
     user_id: int = 0,
     q: str = None,
+    count: CountMode = CountMode.exact,
+    compact: bool = False,
+    cursor: Optional[list] = Depends(get_cursor),
     db: Session = Depends(get_db),
     admin: Admin = Depends(Admin.get_current),
 ):
@@ -532,17 +589,34 @@ def get_transactions(
                     status_code=400, detail=f'"{opt}" is not a valid sort option'
                 )
 
-    transactions, count = commerce_service.get_transactions(
-        db=db,
-        offset=offset,
-        limit=limit,
-        sort=sort,
-        type_=type_,
-        user_id=user_id,
-        q=q,
-    )
+    try:
+        transactions, total = commerce_service.get_transactions(
+            db=db,
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            type_=type_,
+            user_id=user_id,
+            q=q,
+            cursor=cursor,
+            count_mode=count,
+            compact=compact,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    next_cursor = get_next_cursor(db=db, items=transactions, sort=sort, limit=limit)
+
+    if compact:
+        return TransactionsCompactResponse(
+            transactions=[
+                TransactionCompactResponse.from_orm(item) for item in transactions
+            ],
+            total=total,
+            next_cursor=next_cursor,
+        )
 
-    return {"transactions": transactions, "total": count}
+    return {"transactions": transactions, "total": total, "next_cursor": next_cursor}
 
 
 @payment_account_router.post(
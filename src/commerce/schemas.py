@@ -6,7 +6,7 @@ from pydantic import BaseModel, constr
 
 from src.accounts.schemas import AccountResponse
 from src.hosts.schemas import HostZoneResponse
-from src.users.schemas import UserResponse
+from src.users.schemas import UserCompactResponse, UserResponse
 
 
 class TransactionType(str, Enum):
@@ -192,17 +192,87 @@ class PaymentResponse(PaymentBase):
 
 class TransactionsResponse(BaseModel):
     transactions: List[TransactionResponse]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class OrdersResponse(BaseModel):
     orders: List[OrderResponse]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class PaymentsResponse(BaseModel):
     payments: List[PaymentResponse]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class TransactionCompactResponse(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    order_id: Optional[int] = None
+    payment_id: Optional[int] = None
+    amount: int
+    type: TransactionType
+    description: Optional[str] = None
+    user: Optional[UserCompactResponse]
+    created_at: datetime
+    modified_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class OrderCompactResponse(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    account_id: Optional[int] = None
+    service_id: Optional[int] = None
+    duration: Optional[int] = None
+    data_limit: Optional[int] = None
+    total: Optional[int] = None
+    status: OrderStatus
+    user: Optional[UserCompactResponse]
+    created_at: datetime
+    modified_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class PaymentCompactResponse(BaseModel):
+    id: int
+    user_id: Optional[int] = None
+    order_id: Optional[int] = None
     total: int
+    method: PaymentMethod
+    status: PaymentStatus
+    paid_at: Optional[datetime] = None
+    user: Optional[UserCompactResponse]
+    created_at: datetime
+    modified_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class TransactionsCompactResponse(BaseModel):
+    transactions: List[TransactionCompactResponse]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class OrdersCompactResponse(BaseModel):
+    orders: List[OrderCompactResponse]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class PaymentsCompactResponse(BaseModel):
+    payments: List[PaymentCompactResponse]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
 
 
 class PaymentAccountBase(BaseModel):
@@ -3,9 +3,9 @@ import traceback
 from enum import Enum
 from typing import List, Tuple, Optional
 
-from sqlalchemy import or_, String, cast, and_, func
+from sqlalchemy import or_, String, cast, and_, func, select
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload, load_only
 
 import src.users.service as user_service
 from src import messages
@@ -20,6 +20,9 @@ from src.commerce.exc import (
 )
 from src.commerce.models import Transaction, Order, Payment, Service, PaymentAccount
 from src.commerce.schemas import (
+    OrderCompactResponse,
+    PaymentCompactResponse,
+    TransactionCompactResponse,
     TransactionCreate,
     ServiceCreate,
     OrderCreate,
@@ -39,6 +42,8 @@ from src.notification.schemas import NotificationType, NotificationCreate
 from src.notification.service import create_notification
 from src.hosts import service as host_service
 from src.users.models import User
+from src.users.schemas import UserCompactResponse
+from src.utils.pagination import CountMode, paginate, schema_columns
 
 TransactionSortingOptions = Enum(
     "TransactionSortingOptions",
@@ -106,6 +111,7 @@ def create_transaction(
     transaction: TransactionCreate,
     db_order: Optional[Order] = None,
     db_payment: Optional[Payment] = None,
+    commit: bool = True,
 ):
     db_transaction = Transaction(
         user_id=db_user.id,
@@ -121,10 +127,13 @@ def create_transaction(
     db_user.balance = balance + db_transaction.amount
 
     db.add(db_transaction)
-    db.commit()
+    if commit:
+        db.commit()
 
-    db.refresh(db_transaction)
-    db.refresh(db_user)
+        db.refresh(db_transaction)
+        db.refresh(db_user)
+    else:
+        db.flush()
 
     if db_transaction.amount > 0:
         _send_notification(
@@ -136,6 +145,7 @@ def create_transaction(
             )
             + messages.USER_BALANCE.format(balance=db_user.balance_readable),
             send_to_admin=True,
+            commit=commit,
         )
     elif db_transaction.amount < 0:
         _send_notification(
@@ -147,6 +157,7 @@ def create_transaction(
             )
             + messages.USER_BALANCE.format(balance=db_user.balance_readable),
             send_to_admin=True,
+            commit=commit,
         )
 
     return db_transaction
@@ -191,9 +202,15 @@ def get_transactions(
     type_: TransactionType = None,
     return_with_count: bool = True,
     q: str = None,
+    cursor: Optional[list] = None,
+    count_mode: CountMode = CountMode.exact,
+    compact: bool = False,
 ) -> Tuple[List[Transaction], int]:
     query = db.query(Transaction)
 
+    if compact:
+        query = _compact_query(query, Transaction, TransactionCompactResponse)
+
     if user_id > 0:
         query = query.filter(Transaction.user_id == user_id)
 
@@ -216,7 +233,9 @@ def get_transactions(
             )
         )
 
-    return _get_query_result(limit, offset, query, return_with_count, sort)
+    return _get_query_result(
+        limit, offset, query, return_with_count, sort, cursor, count_mode
+    )
 
 
 def get_transactions_sum(
@@ -437,6 +456,88 @@ def update_order_status(
     return update_order(db=db, db_order=db_order, modify=order_modify)
 
 
+def get_fulfillable_order_ids(db: Session, limit: int, after_id: int = 0) -> List[int]:
+    """
+    Return the ids of the oldest paid orders after after_id that can be
+    fulfilled now.
+
+    Orders reserved for an account that is still enabled are left out, so they
+    can't fill up the batch while waiting for the account to be disabled.
+    """
+    query = (
+        db.query(Order.id)
+        .outerjoin(Account, Order.account_id == Account.id)
+        .filter(
+            Order.id > after_id,
+            Order.status == OrderStatus.paid,
+            Order.fulfillment_key.is_(None),
+            Order.service_id.isnot(None),
+            or_(Order.account_id.is_(None), Account.enable == False),
+        )
+        .order_by(Order.id.asc())
+        .limit(limit)
+    )
+
+    return [order_id for order_id, in query.all()]
+
+
+def lock_paid_order(db: Session, order_id: int) -> Optional[Order]:
+    """
+    Lock a paid order for fulfillment in the current transaction.
+
+    Returns None when the order is already fulfilled or another worker holds
+    the lock.
+    """
+    return (
+        db.query(Order)
+        .filter(
+            Order.id == order_id,
+            Order.status == OrderStatus.paid,
+            Order.fulfillment_key.is_(None),
+        )
+        .with_for_update(skip_locked=True)
+        .first()
+    )
+
+
+def complete_paid_order(
+    db: Session, db_order: Order, db_account: Account, fulfillment_key: str
+):
+    """
+    Complete a paid order and commit it together with every pending change of
+    the session, so the account recharge and the order status land atomically.
+    """
+    modify = OrderModify(
+        user_id=db_order.user_id,
+        account_id=db_account.id,
+        service_id=db_order.service_id,
+        duration=db_order.duration,
+        data_limit=db_order.data_limit,
+        total=db_order.total,
+        total_discount_amount=db_order.total_discount_amount,
+        status=OrderStatus.completed,
+    )
+
+    _validate_order(db=db, db_user=db_order.user, db_order=db_order, modify=modify)
+
+    db_order.status = modify.status
+    db_order.account_id = modify.account_id
+    db_order.fulfillment_key = fulfillment_key
+    db_order.fulfilled_at = datetime.datetime.utcnow()
+
+    db.commit()
+    db.refresh(db_order)
+
+    _process_order(
+        db=db,
+        db_user=db_order.user,
+        db_order=db_order,
+        db_service=db_order.service,
+    )
+
+    return db_order
+
+
 def remove_order(db: Session, db_order: Order):
     db.delete(db_order)
     db.commit()
@@ -457,9 +558,15 @@ def get_orders(
     q: str = None,
     start_date: datetime.datetime = None,
     end_date: datetime.datetime = None,
+    cursor: Optional[list] = None,
+    count_mode: CountMode = CountMode.exact,
+    compact: bool = False,
 ) -> Tuple[List[Order], int]:
     query = db.query(Order)
 
+    if compact:
+        query = _compact_query(query, Order, OrderCompactResponse)
+
     if user_id > 0:
         query = query.filter(Order.user_id == user_id)
 
@@ -492,7 +599,51 @@ def get_orders(
                 Order.created_at >= start_date,
             )
         )
-    return _get_query_result(limit, offset, query, return_with_count, sort)
+    return _get_query_result(
+        limit, offset, query, return_with_count, sort, cursor, count_mode
+    )
+
+
+def get_completed_orders_after(
+    db: Session,
+    limit: int,
+    modified_after: Optional[datetime.datetime] = None,
+    after_id: int = 0,
+    modified_before: Optional[datetime.datetime] = None,
+    start_date: Optional[datetime.datetime] = None,
+    end_date: Optional[datetime.datetime] = None,
+) -> List[Order]:
+    """
+    Return completed orders ordered by (modified_at, id) after the given
+    position, with their users loaded.
+
+    Completed orders are not editable anymore, so modified_at is the time the
+    order has been completed and can be used as a high-water mark.
+    """
+    query = (
+        db.query(Order)
+        .options(joinedload(Order.user))
+        .filter(Order.status == OrderStatus.completed)
+    )
+
+    if modified_after:
+        query = query.filter(
+            or_(
+                Order.modified_at > modified_after,
+                and_(Order.modified_at == modified_after, Order.id > after_id),
+            )
+        )
+
+    if modified_before:
+        query = query.filter(Order.modified_at <= modified_before)
+
+    if start_date:
+        query = query.filter(Order.created_at >= start_date)
+
+    if end_date:
+        query = query.filter(Order.created_at <= end_date)
+
+    return query.order_by(Order.modified_at.asc(), Order.id.asc()).limit(limit).all()
 
 
 def get_order(db: Session, order_id: int):
@@ -665,6 +816,23 @@ def remove_payment(db: Session, db_payment: Payment):
     return db_payment
 
 
+def get_payment_summary(
+    db: Session, telegram_chat_id: int
+) -> Optional[Tuple[int, int]]:
+    """Balance and total paid payments of a telegram user, in one query."""
+    total_paid = (
+        select(func.coalesce(func.sum(Payment.total), 0))
+        .where(Payment.user_id == User.id, Payment.status == PaymentStatus.paid)
+        .scalar_subquery()
+    )
+
+    return (
+        db.query(User.balance, total_paid)
+        .filter(User.telegram_chat_id == telegram_chat_id)
+        .first()
+    )
+
+
 def get_payments(
     db: Session,
     offset: Optional[int] = None,
@@ -676,9 +844,15 @@ def get_payments(
     method: PaymentMethod = None,
     status: PaymentStatus = None,
     q: str = None,
+    cursor: Optional[list] = None,
+    count_mode: CountMode = CountMode.exact,
+    compact: bool = False,
 ) -> Tuple[List[Payment], int]:
     query = db.query(Payment)
 
+    if compact:
+        query = _compact_query(query, Payment, PaymentCompactResponse)
+
     if user_id > 0:
         query = query.filter(Payment.user_id == user_id)
 
@@ -697,7 +871,9 @@ def get_payments(
                 cast(Payment.id, String).ilike(f"%{q}%"),
             )
         )
-    return _get_query_result(limit, offset, query, return_with_count, sort)
+    return _get_query_result(
+        limit, offset, query, return_with_count, sort, cursor, count_mode
+    )
 
 
 def get_payment(db: Session, payment_id: int):
@@ -725,18 +901,36 @@ def _validate_payment(db_payment: Payment, payment: Optional[PaymentModify] = No
         raise PaymentPaidStatusError
 
 
-def _get_query_result(limit, offset, query, return_with_count, sort):
-    if sort:
-        query = query.order_by(*(opt.value for opt in sort))
-    count = query.count()
-    if offset:
-        query = query.offset(offset)
-    if limit:
-        query = query.limit(limit)
+def _get_query_result(
+    limit,
+    offset,
+    query,
+    return_with_count,
+    sort,
+    cursor=None,
+    count_mode=CountMode.exact,
+):
+    items, count = paginate(
+        query,
+        query.column_descriptions[0]["entity"],
+        sort=sort,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode if return_with_count else CountMode.none,
+    )
     if return_with_count:
-        return query.all(), count
+        return items, count
     else:
-        return query.all()
+        return items
+
+
+def _compact_query(query, model, schema):
+    """Load only the columns of the compact schema, and its user in the same query."""
+    return query.options(
+        load_only(*schema_columns(model, schema)),
+        joinedload(model.user).load_only(*schema_columns(User, UserCompactResponse)),
+    )
 
 
 def create_payment_account(db: Session, account: PaymentAccountCreate, db_user: User):
@@ -850,11 +1044,13 @@ def _send_notification(
     type_: NotificationType,
     level: int = 0,
     send_to_admin: bool = False,
+    commit: bool = True,
 ):
     try:
         create_notification(
             db=db,
             db_user=db_user,
+            commit=commit,
             notification=NotificationCreate(
                 user_id=db_user.id,
                 approve=True,
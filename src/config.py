@@ -1,4 +1,5 @@
 import logging
+import socket
 
 import requests
 from decouple import config
@@ -29,6 +30,26 @@ UVICORN_HOST = get_setting("UVICORN_HOST", default="0.0.0.0")
 UVICORN_PORT = get_setting("UVICORN_PORT", cast=int, default=8000)
 CUSTOM_BASE_URL = get_setting("CUSTOM_BASE_URL", cast=str, default=None)
 UVICORN_UDS = config("UVICORN_UDS", default=None)
+UVICORN_WORKERS = config("UVICORN_WORKERS", cast=int, default=1)
+
+# all: API, jobs and bots in one process. api: only the API, so it can run
+# UVICORN_WORKERS workers. jobs: only the scheduler and bots, started by jobs.py
+RUN_MODE = config("RUN_MODE", default="all")
+if RUN_MODE not in ("all", "api", "jobs"):
+    raise ValueError(f"RUN_MODE must be all, api or jobs, not {RUN_MODE}")
+# Every worker would run its own scheduler and bots, so only api runs several
+API_WORKERS = UVICORN_WORKERS if RUN_MODE == "api" else 1
+
+# With several nodes on one database every job run first takes the job's lease,
+# the node holding it runs the job until it stops renewing it
+ENABLE_JOB_LEASES = config("ENABLE_JOB_LEASES", cast=bool, default=True)
+NODE_ID = config("NODE_ID", default=socket.gethostname())
+# Lease of jobs without an interval, interval jobs hold it for two intervals
+JOB_LEASE_TTL = config("JOB_LEASE_TTL", cast=int, default=300)
+# Seconds between checks for jobs requested to run through the API
+JOB_CONTROL_INTERVAL = config("JOB_CONTROL_INTERVAL", cast=int, default=5)
+JOB_RUN_RETENTION_DAYS = config("JOB_RUN_RETENTION_DAYS", cast=int, default=30)
+
 UVICORN_SSL_CERTFILE = get_setting("UVICORN_SSL_CERTFILE", default=None)
 UVICORN_SSL_KEYFILE = get_setting("UVICORN_SSL_KEYFILE", default=None)
 
@@ -42,6 +63,26 @@ BOT_USER_NAME = get_setting("BOT_USER_NAME", default="")
 TELEGRAM_CHANNEL = get_setting("TELEGRAM_CHANNEL", default=None)
 TELEGRAM_PROXY_URL = get_setting("TELEGRAM_PROXY_URL", default=None)
 
+# polling or webhook
+TELEGRAM_BOT_MODE = config("TELEGRAM_BOT_MODE", cast=str, default="polling")
+TELEGRAM_BOT_WORKERS = config("TELEGRAM_BOT_WORKERS", cast=int, default=8)
+TELEGRAM_WEBHOOK_URL = config("TELEGRAM_WEBHOOK_URL", cast=str, default="")
+TELEGRAM_WEBHOOK_SECRET = config("TELEGRAM_WEBHOOK_SECRET", cast=str, default="")
+if TELEGRAM_BOT_MODE == "webhook" and not TELEGRAM_WEBHOOK_SECRET:
+    # Without it anyone reaching the webhook endpoint could forge updates
+    raise ValueError("TELEGRAM_WEBHOOK_SECRET is required in webhook mode")
+# memory or database, conversations of bots on several workers need database
+BOT_STATE_STORE = config("BOT_STATE_STORE", cast=str, default="memory")
+BOT_STATE_TTL = config("BOT_STATE_TTL", cast=int, default=86400)
+BOT_STATE_CACHE_SIZE = config("BOT_STATE_CACHE_SIZE", cast=int, default=10000)
+# Files passed between the bots are streamed, spooled to disk past this size
+TELEGRAM_FILE_SPOOL_SIZE = config(
+    "TELEGRAM_FILE_SPOOL_SIZE", cast=int, default=1024 * 1024
+)
+TELEGRAM_FILE_CHUNK_SIZE = config(
+    "TELEGRAM_FILE_CHUNK_SIZE", cast=int, default=64 * 1024
+)
+
 # Bot URLS
 
 TELEGRAM_CHANNEL_URL = get_setting("TELEGRAM_CHANNEL_URL", default="")
@@ -75,19 +116,50 @@ TEST_SERVICE_ID = get_setting("TEST_SERVICE_ID", cast=int, default=0)
 JWT_ACCESS_TOKEN_EXPIRE_MINUTES = config(
     "JWT_ACCESS_TOKEN_EXPIRE_MINUTES", cast=int, default=1440
 )
+# Verified admin tokens kept until they expire, 0 verifies every request
+ADMIN_TOKEN_CACHE_SIZE = config("ADMIN_TOKEN_CACHE_SIZE", cast=int, default=256)
 
 # USERNAME: PASSWORD
 SUDOERS = {
     config("SUDO_USERNAME", default="admin"): config("SUDO_PASSWORD", default="admin")
 }
 
+QRCODE_CACHE_SIZE = config("QRCODE_CACHE_SIZE", cast=int, default=1024)
+
+REPORT_CACHE_TTL = config("REPORT_CACHE_TTL", cast=int, default=60)
+
+ENABLE_QUERY_INSTRUMENTATION = config(
+    "ENABLE_QUERY_INSTRUMENTATION", cast=bool, default=True
+)
+SLOW_QUERY_THRESHOLD_MS = config("SLOW_QUERY_THRESHOLD_MS", cast=int, default=200)
+QUERY_COUNT_WARNING = config("QUERY_COUNT_WARNING", cast=int, default=100)
+
+ENABLE_METRICS = config("ENABLE_METRICS", cast=bool, default=True)
+# Bearer token of Prometheus scrapes, admins can read the metrics without it
+METRICS_TOKEN = config("METRICS_TOKEN", default="")
+# Port the job runner serves /metrics on, its jobs and bots don't run in the API
+METRICS_PORT = config("METRICS_PORT", cast=int, default=0)
+METRICS_HOST = config("METRICS_HOST", default="127.0.0.1")
+
 SUBSCRIPTION_BASE_URL = get_setting(
     "SUBSCRIPTION_BASE_URL", default="https://localhost:8000/api/sub"
 )
+# Seconds the inbound configs of a host zone are reused by subscriptions
+SUBSCRIPTION_CACHE_TTL = config("SUBSCRIPTION_CACHE_TTL", cast=int, default=30)
+SUBSCRIPTION_CACHE_SIZE = config("SUBSCRIPTION_CACHE_SIZE", cast=int, default=256)
+# Order subscription configs by health score and drop the failing ones
+SUBSCRIPTION_ORDER_BY_HEALTH = config(
+    "SUBSCRIPTION_ORDER_BY_HEALTH", cast=bool, default=False
+)
+SUBSCRIPTION_DROP_FAILING = config(
+    "SUBSCRIPTION_DROP_FAILING", cast=bool, default=False
+)
 
 AVAILABLE_SERVICES = config("AVAILABLE_SERVICES", default="").split(",")
 
 X_UI_REQUEST_TIMEOUT = config("X_UI_REQUEST_TIMEOUT", cast=int, default=20)
+X_UI_DRIVER_CONCURRENCY = config("X_UI_DRIVER_CONCURRENCY", cast=int, default=16)
+X_UI_BULK_SIZE = config("X_UI_BULK_SIZE", cast=int, default=200)
 
 XUI_DB_PATH = config("XUI_DB_URL", default="./x-ui.db")
 OLD_BOT_DB_PATH = config("OLD_BOT_DB_PATH", default="./v2raybot.sqlite3")
@@ -128,14 +200,52 @@ SYNC_ACCOUNTS_INTERVAL = config("SYNC_ACCOUNTS_INTERVAL", cast=int, default=60)
 SYNC_ACCOUNTS_TRAFFIC_INTERVAL = config(
     "SYNC_ACCOUNTS_TRAFFIC_INTERVAL", cast=int, default=600
 )
+
+# Skip account sync and review runs while accounts, inbounds and hosts are
+# unchanged, stretching their interval up to ADAPTIVE_MAX_INTERVAL seconds
+ADAPTIVE_SCHEDULING = config("ADAPTIVE_SCHEDULING", cast=bool, default=False)
+ADAPTIVE_MAX_INTERVAL = config("ADAPTIVE_MAX_INTERVAL", cast=int, default=600)
+# Paid orders within ADAPTIVE_MAX_INTERVAL that bring intervals back to normal
+ADAPTIVE_ORDER_BURST = config("ADAPTIVE_ORDER_BURST", cast=int, default=5)
+TRAFFIC_ROLLUP_INTERVAL = config("TRAFFIC_ROLLUP_INTERVAL", cast=int, default=600)
+TRAFFIC_RAW_RETENTION_DAYS = config("TRAFFIC_RAW_RETENTION_DAYS", cast=int, default=45)
+TRAFFIC_HOURLY_RETENTION_DAYS = config(
+    "TRAFFIC_HOURLY_RETENTION_DAYS", cast=int, default=180
+)
 GLOBAL_TRAFFIC_RATIO = config("GLOBAL_TRAFFIC_RATIO", cast=float, default=1.0)
 
+# Monitoring results are downsampled to hourly rollups after the raw retention
+MONITORING_RAW_RETENTION_HOURS = config(
+    "MONITORING_RAW_RETENTION_HOURS", cast=int, default=48
+)
+MONITORING_ROLLUP_RETENTION_DAYS = config(
+    "MONITORING_ROLLUP_RETENTION_DAYS", cast=int, default=90
+)
+MONITORING_INGEST_BATCH_SIZE = config(
+    "MONITORING_INGEST_BATCH_SIZE", cast=int, default=1000
+)
+# Inbound config health is scored from the results of the last window hours
+MONITORING_HEALTH_INTERVAL = config("MONITORING_HEALTH_INTERVAL", cast=int, default=300)
+MONITORING_HEALTH_WINDOW_HOURS = config(
+    "MONITORING_HEALTH_WINDOW_HOURS", cast=int, default=6
+)
+MONITORING_HEALTH_MIN_RESULTS = config(
+    "MONITORING_HEALTH_MIN_RESULTS", cast=int, default=10
+)
+MONITORING_HEALTH_MIN_SUCCESS_RATE = config(
+    "MONITORING_HEALTH_MIN_SUCCESS_RATE", cast=float, default=0.5
+)
+
 ENABLE_ORDER_JOBS = config("ENABLE_ORDER_JOBS", cast=bool, default=True)
 
 PROCESS_PAID_ORDERS_INTERVAL = config(
     "PROCESS_PAID_ORDERS_INTERVAL", cast=int, default=60
 )
 
+PROCESS_PAID_ORDERS_BATCH_SIZE = config(
+    "PROCESS_PAID_ORDERS_BATCH_SIZE", cast=int, default=20
+)
+
 CLUB_SCORE_PRICE = config("CLUB_SCORE_PRICE", cast=int, default=1000)
 
 REFERRAL_SCORE_0_TO_30 = config("REFERRAL_SCORE_0_TO_30", cast=int, default=5)
@@ -148,4 +258,15 @@ REFERRAL_ORDER_SCORE_PERCENT = config(
 
 CLUB_CAMPAIGN_RUN_CRON = config("CLUB_CAMPAIGN_RUN_CRON", cast=str, default="0 * * * *")
 
+CHANNEL_MEMBER_TTL = config("CHANNEL_MEMBER_TTL", cast=int, default=86400)
+CHANNEL_MEMBER_REFRESH_INTERVAL = config(
+    "CHANNEL_MEMBER_REFRESH_INTERVAL", cast=int, default=300
+)
+CHANNEL_MEMBER_REFRESH_LIMIT = config(
+    "CHANNEL_MEMBER_REFRESH_LIMIT", cast=int, default=200
+)
+CHANNEL_MEMBER_REFRESH_DELAY = config(
+    "CHANNEL_MEMBER_REFRESH_DELAY", cast=float, default=0.05
+)
+
 WEB_APP_URL = config("WEB_APP_URL", cast=str, default="")
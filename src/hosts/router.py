@@ -1,3 +1,4 @@
+import datetime
 import logging
 from typing import List
 
@@ -17,7 +18,10 @@ from src.hosts.schemas import (
     HostZoneResponse,
     HostZoneCreate,
     HostZoneModify,
+    HostUsedTrafficResponse,
 )
+from src.accounts.schemas import AccountUedTrafficTrunc, NodeUsedTrafficReportResponse
+import src.accounts.service as account_service
 import src.hosts.service as service
 
 host_router = APIRouter()
@@ -77,6 +81,52 @@ def copy_host(
     return service.copy_host(db=db, db_host=db_host)
 
 
+@host_router.get(
+    "/hosts/used_traffic",
+    tags=["Host"],
+    response_model=List[HostUsedTrafficResponse],
+)
+def get_hosts_used_traffic(
+    delta: int = 7,
+    end_date: datetime.datetime = None,
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    end = end_date or datetime.datetime.utcnow()
+
+    return account_service.get_hosts_used_traffic(
+        db=db, start_date=end - datetime.timedelta(days=delta), end_date=end_date
+    )
+
+
+@host_router.get(
+    "/hosts/{host_id}/used_traffic",
+    tags=["Host"],
+    response_model=List[NodeUsedTrafficReportResponse],
+)
+def get_host_used_traffic(
+    host_id: int,
+    inbound_id: int = 0,
+    start_date: datetime.datetime = None,
+    end_date: datetime.datetime = None,
+    trunc: AccountUedTrafficTrunc = AccountUedTrafficTrunc.HOUR,
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    db_host = service.get_host(db, host_id)
+    if not db_host:
+        raise HTTPException(status_code=404, detail="Host not found")
+
+    return account_service.get_node_used_traffic_report(
+        db=db,
+        host_id=host_id,
+        inbound_id=inbound_id,
+        start_date=start_date,
+        end_date=end_date,
+        trunc=trunc,
+    )
+
+
 @host_router.get("/hosts/{host_id}", tags=["Host"], response_model=HostResponse)
 def get_host(
     host_id: int,
@@ -93,3 +93,15 @@ class HostModify(Host):
 class HostsResponse(BaseModel):
     hosts: List[HostResponse]
     total: int
+
+
+class HostUsedTrafficResponse(BaseModel):
+    host_id: int
+    name: str
+    host_zone_id: int
+    download: int = 0
+    upload: int = 0
+    peak_accounts: int = 0
+
+    class Config:
+        orm_mode = True
@@ -11,6 +11,7 @@ from src.hosts.schemas import HostCreate, HostModify, HostZoneCreate, HostZoneMo
 from src.inbounds.models import Inbound
 from src.inbounds.schemas import InboundCreate
 import src.inbounds.service as inbound_service
+from src.subscription.cache import subscription_cache
 
 HostSortingOptions = Enum(
     "HostSortingOptions",
@@ -58,6 +59,7 @@ def create_host(db: Session, host: HostCreate, db_host_zone: HostZone = None):
 
     db.add(db_host)
     db.commit()
+    subscription_cache.clear()
     db.refresh(db_host)
     return db_host
 
@@ -76,6 +78,7 @@ def update_host(db: Session, db_host: Host, modify: HostModify):
     db_host.type = modify.type
 
     db.commit()
+    subscription_cache.clear()
     db.refresh(db_host)
 
     return db_host
@@ -105,6 +108,7 @@ def copy_host(db: Session, db_host: Host):
 
     db.add(new_db_host)
     db.commit()
+    subscription_cache.clear()
     db.refresh(new_db_host)
 
     for db_inbound in db_host.inbounds:
@@ -173,6 +177,7 @@ def get_hosts(
 def remove_host(db: Session, db_host: Host):
     db.delete(db_host)
     db.commit()
+    subscription_cache.clear()
     return db_host
 
 
@@ -204,6 +209,7 @@ def update_host_zone(db: Session, db_host_zone: HostZone, modify: HostZoneModify
     db_host_zone.enable = modify.enable
 
     db.commit()
+    subscription_cache.clear()
     db.refresh(db_host_zone)
 
     return db_host_zone
@@ -250,6 +256,7 @@ def get_host_zones(
 def remove_host_zone(db: Session, db_host_zone: HostZone):
     db.delete(db_host_zone)
     db.commit()
+    subscription_cache.clear()
     return db_host_zone
 
 
@@ -8,6 +8,7 @@ from src.hosts.models import HostZone, Host
 from src.inbound_configs.models import InboundConfig
 from src.inbound_configs.schemas import InboundConfigCreate, InboundConfigModify
 from src.inbounds.models import Inbound
+from src.subscription.cache import subscription_cache
 
 InboundConfigSortingOptions = Enum(
     "InboundConfigSortingOptions",
@@ -56,6 +57,7 @@ def create_inbound_config(
 
     db.add(db_inbound_config)
     db.commit()
+    subscription_cache.clear()
     db.refresh(db_inbound_config)
     return db_inbound_config
 
@@ -85,6 +87,7 @@ def copy_inbound_config(db: Session, db_inbound_config: InboundConfig):
     )
     db.add(new_db_inbound_config)
     db.commit()
+    subscription_cache.clear()
     db.refresh(new_db_inbound_config)
     return new_db_inbound_config
 
@@ -115,6 +118,7 @@ def update_inbound_config(
     db_inbound_config.extra = modify.extra
 
     db.commit()
+    subscription_cache.clear()
     db.refresh(db_inbound_config)
 
     return db_inbound_config
@@ -196,6 +200,7 @@ def get_inbound_configs(
 def remove_inbound_config(db: Session, db_inbound_config: InboundConfig):
     db.delete(db_inbound_config)
     db.commit()
+    subscription_cache.clear()
     return db_inbound_config
 
 
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 from src.hosts.models import Host
 from src.inbounds.models import Inbound
 from src.inbounds.schemas import InboundCreate, InboundModify
+from src.subscription.cache import subscription_cache
 
 InboundSortingOptions = Enum(
     "InboundSortingOptions",
@@ -47,6 +48,7 @@ def create_inbound(db: Session, db_host: Host, inbound: InboundCreate):
 
     db.add(db_inbound)
     db.commit()
+    subscription_cache.clear()
     db.refresh(db_inbound)
     return db_inbound
 
@@ -67,6 +69,7 @@ def update_inbound(db: Session, db_inbound: Inbound, modify: InboundModify):
     db_inbound.type = modify.type
 
     db.commit()
+    subscription_cache.clear()
     db.refresh(db_inbound)
 
     return db_inbound
@@ -120,6 +123,7 @@ def get_inbounds(
 def remove_inbound(db: Session, db_inbound: Inbound):
     db.delete(db_inbound)
     db.commit()
+    subscription_cache.clear()
     return db_inbound
 
 
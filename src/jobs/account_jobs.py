@@ -2,14 +2,15 @@ from datetime import datetime, timedelta
 
 from src import scheduler, logger, config
 from src.accounts.models import Account
+from src.accounts.panel import get_client_email, propagate_accounts
 from src.accounts.service import (
     get_accounts,
-    update_account_status,
     remove_account,
     get_account_by_uuid_and_email,
     get_account_by_email,
     update_account_used_traffic,
     create_account_used_traffic,
+    disable_exhausted_accounts,
 )
 from src.database import GetDB
 from src.hosts.schemas import HostResponse
@@ -17,9 +18,10 @@ from src.hosts.service import get_host
 from src.inbounds.service import get_inbounds
 from src.middleware.x_ui import XUI
 from src.notification.schemas import NotificationType, NotificationCreate
-from src.notification.service import create_notification
+from src.notification.service import create_notifications
+from src.system.adaptive import adaptive
+from src.system.scheduler import count_job_items
 from src.telegram.user import messages, captions
-from src.users.models import User
 
 
 # from src.users.service import get_users
@@ -160,10 +162,6 @@ from src.users.models import User
 #
 
 
-def _get_account_email_prefix(host_id: int, inbound_key: int, email: str):
-    return "%s_%s_%s" % (host_id, inbound_key, email)
-
-
 def _get_account_real_email(client_email: str):
     if client_email is None:
         return None
@@ -200,9 +198,7 @@ def delete_client_in_all_inbounds(db, db_account: Account):
 
         logger.info("Host name: " + host.name)
 
-        account_unique_email = _get_account_email_prefix(
-            host.id, inbound.key, db_account.email
-        )
+        account_unique_email = get_client_email(host.id, inbound.key, db_account.email)
 
         logger.info(
             f"Account unique Email for this inbound is {account_unique_email} and uuid is {db_account.uuid}"
@@ -244,9 +240,7 @@ def update_client_in_all_inbounds(db, db_account: Account, enable: bool = False)
 
         logger.info("Host name: " + host.name)
 
-        account_unique_email = _get_account_email_prefix(
-            host.id, inbound.key, db_account.email
-        )
+        account_unique_email = get_client_email(host.id, inbound.key, db_account.email)
 
         client_stat = xui.api.get_client_stat(email=account_unique_email)
 
@@ -300,6 +294,8 @@ def clean_up_inbounds():
                     )
                     continue
 
+                count_job_items(len(remote_inbound_clients))
+
                 for client in remote_inbound_clients:
                     client_email = client["email"]
                     uuid = client["id"]
@@ -412,7 +408,7 @@ def sync_new_accounts():
                 if account.host_zone_id != inbound.host.host_zone_id:
                     continue
 
-                account_unique_email = _get_account_email_prefix(
+                account_unique_email = get_client_email(
                     host.id, inbound.key, account.email
                 )
 
@@ -432,6 +428,7 @@ def sync_new_accounts():
                         flow=inbound.flow.value if inbound.flow else "",
                         ip_limit=account.ip_limit,
                     )
+                    count_job_items()
         end = datetime.utcnow().timestamp()
         logger.info(f"End Sync new accounts in all Inbounds in {end - start} Sec")
 
@@ -517,6 +514,8 @@ def sync_accounts_traffic():
                                         db_account=db_account,
                                         upload=upload,
                                         download=download,
+                                        host_id=host.id,
+                                        inbound_id=inbound.id,
                                     )
                                     update_account_used_traffic(
                                         db=db,
@@ -524,6 +523,7 @@ def sync_accounts_traffic():
                                         used_traffic=used_traffic
                                         + db_account.used_traffic,
                                     )
+                                    count_job_items()
                                     logger.info(
                                         f"Traffic updated and reset successfully in {inbound.remark}[{inbound.key}] for {account_email}"
                                     )
@@ -594,62 +594,53 @@ def sync_accounts_traffic():
 
 
 def review_accounts():
-    now = datetime.utcnow().timestamp()
     logger.info("Start Review Accounts")
 
     with GetDB() as db:
-        for account in get_accounts(db=db, return_with_count=False):
-            account_expire_time = 0
-            if account.expired_at:
-                account_expire_time = account.expired_at.timestamp()
-
-            # telegram_user_name = (
-            #     account.user.telegram_username if account.user.telegram_username else ""
-            # )
+        disabled_accounts = disable_exhausted_accounts(db=db, commit=False)
+        count_job_items(len(disabled_accounts))
+
+        notifications = []
+        for account in disabled_accounts:
+            logger.info(
+                f"Account {account.email} has been expired due to "
+                + ("expired time" if account.expired else "exceeded Data limit usage")
+            )
 
-            if (0 < account_expire_time <= now) and account.enable:
-                logger.info("Account has been expired due to expired time.")
-                logger.info(f"Account uuid: {account.uuid}")
-                logger.info(f"Account email: {account.email}")
-                logger.info(f"Account Expire time: {account.expired_at}")
-                logger.info(f"Account status: {account.enable}")
-                update_account_status(db=db, db_account=account, enable=False)
+            if account.user_id is None:
+                continue
 
-                _send_notification(
-                    db=db,
-                    db_user=account.user,
+            notifications.append(
+                NotificationCreate(
+                    user_id=account.user_id,
+                    approve=True,
                     message=messages.USER_NOTIFICATION_ACCOUNT_EXPIRED.format(
                         id=account.email,
                         service_title=account.service_title,
-                        due=captions.EXPIRE_TIME,
+                        due=(
+                            captions.EXPIRE_TIME
+                            if account.expired
+                            else captions.EXCEEDED_DATA_LIMIT
+                        ),
                     ),
-                    type_=NotificationType.account,
+                    level=0,
+                    type=NotificationType.account,
                     send_to_admin=True,
                 )
+            )
 
-            elif account.used_traffic >= account.data_limit > 0 and account.enable:
-                logger.info(
-                    "Account has been expired due to exceeded Data limit usage."
-                )
-                logger.info(f"Account uuid: {account.uuid}")
-                logger.info(f"Account email: {account.email}")
-                logger.info(f"Account Expire time: {account.expired_at}")
-                logger.info(f"Account status: {account.enable}")
-
-                update_account_status(db=db, db_account=account, enable=False)
+        create_notifications(db=db, notifications=notifications, commit=False)
+        db.commit()
 
-                _send_notification(
-                    db=db,
-                    db_user=account.user,
-                    message=messages.USER_NOTIFICATION_ACCOUNT_EXPIRED.format(
-                        id=account.email,
-                        service_title=account.service_title,
-                        due=captions.EXCEEDED_DATA_LIMIT,
-                    ),
-                    type_=NotificationType.account,
-                    send_to_admin=True,
+        if disabled_accounts:
+            try:
+                propagate_accounts(
+                    db=db, account_ids=[account.id for account in disabled_accounts]
                 )
-    logger.info("End Review Accounts")
+            except Exception as error:
+                logger.error(f"Error in propagate disabled accounts: {error}")
+
+    logger.info(f"End Review Accounts, {len(disabled_accounts)} accounts disabled")
 
 
 def sync_accounts_status():
@@ -744,28 +735,6 @@ def remove_unused_test_accounts(last_days: int):
                 delete_account(db=db, db_account=db_account)
 
 
-def _send_notification(
-    db,
-    db_user: User,
-    message: str,
-    type_: NotificationType,
-    level: int = 0,
-    send_to_admin: bool = False,
-):
-    create_notification(
-        db=db,
-        db_user=db_user,
-        notification=NotificationCreate(
-            user_id=db_user.id,
-            approve=True,
-            message=message,
-            level=level,
-            type=type_,
-            send_to_admin=send_to_admin,
-        ),
-    )
-
-
 def run_review_account_jobs():
     logger.info(f"Start Review Account Jobs")
     review_accounts()
@@ -781,14 +750,16 @@ def run_remove_disabled_accounts_jobs():
 
 if config.ENABLE_SYNC_ACCOUNTS:
     scheduler.add_job(
-        func=run_review_account_jobs,
+        func=adaptive(config.REVIEW_ACCOUNTS_INTERVAL, run_on_exhausted=True)(
+            run_review_account_jobs
+        ),
         max_instances=1,
         trigger="interval",
         seconds=config.REVIEW_ACCOUNTS_INTERVAL,
     )
 
     scheduler.add_job(
-        func=sync_new_accounts,
+        func=adaptive(config.SYNC_ACCOUNTS_INTERVAL)(sync_new_accounts),
         max_instances=1,
         trigger="interval",
         seconds=config.SYNC_ACCOUNTS_INTERVAL,
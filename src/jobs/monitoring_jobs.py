@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+from src import scheduler, config, logger
+from src.database import GetDB
+from src.monitoring.service import (
+    downsample_monitoring_results,
+    remove_monitoring_rollups,
+    score_inbound_configs,
+)
+from src.subscription.service import health_cache
+from src.system.scheduler import count_job_items
+
+
+def downsample_monitoring():
+    with GetDB() as db:
+        now = datetime.utcnow()
+
+        try:
+            written, deleted = downsample_monitoring_results(
+                db=db,
+                before=now - timedelta(hours=config.MONITORING_RAW_RETENTION_HOURS),
+            )
+            removed = remove_monitoring_rollups(
+                db=db,
+                before=now - timedelta(days=config.MONITORING_ROLLUP_RETENTION_DAYS),
+            )
+        except Exception as error:
+            db.rollback()
+            logger.error(error)
+            return
+
+        count_job_items(deleted + removed)
+        logger.info(
+            f"Downsampled {deleted} monitoring results to {written} buckets, "
+            f"removed {removed} old buckets"
+        )
+
+
+def score_inbound_configs_health():
+    with GetDB() as db:
+        try:
+            scored = score_inbound_configs(
+                db=db,
+                start=datetime.utcnow()
+                - timedelta(hours=config.MONITORING_HEALTH_WINDOW_HOURS),
+            )
+        except Exception as error:
+            db.rollback()
+            logger.error(error)
+            return
+
+        # Subscriptions served by this process pick up the new scores right away
+        health_cache.clear()
+
+        count_job_items(scored)
+        logger.info(f"Scored the health of {scored} inbound configs")
+
+
+scheduler.add_job(
+    func=downsample_monitoring,
+    max_instances=1,
+    trigger="interval",
+    hours=1,
+)
+
+scheduler.add_job(
+    func=score_inbound_configs_health,
+    max_instances=1,
+    trigger="interval",
+    seconds=config.MONITORING_HEALTH_INTERVAL,
+)
@@ -21,10 +21,12 @@ from src.notification.service import (
     update_status,
     NotificationSortingOptions,
 )
+from src.system.scheduler import count_job_items
 from src.telegram import utils
 from src.telegram.user import messages
 from src.telegram.user.keyboard import BotUserKeyboard
 from src.users.service import get_user
+from src.utils.metrics import NOTIFICATIONS_SENT
 from src.utils.telebot import KeyboardFactory
 
 
@@ -197,8 +199,12 @@ def process_pending_notifications():
                             ),
                         )
 
+                    count_job_items()
+                    NOTIFICATIONS_SENT.inc(status="sent")
+
                 except Exception as error:
                     logging.error(error)
+                    NOTIFICATIONS_SENT.inc(status="failed")
                     update_status(
                         db=db,
                         db_notification=db_notification,
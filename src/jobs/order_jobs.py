@@ -5,6 +5,7 @@ from typing import List
 from sqlalchemy.orm import Session
 
 from src import scheduler, logger, config
+from src.accounts.panel import propagate_accounts
 from src.accounts.schemas import AccountCreate, AccountModify
 from src.accounts.service import (
     create_account,
@@ -12,10 +13,14 @@ from src.accounts.service import (
     update_account,
     get_accounts,
 )
-from src.commerce.schemas import OrderStatus
-from src.commerce.service import get_orders, update_order_status
+from src.commerce.service import (
+    complete_paid_order,
+    get_fulfillable_order_ids,
+    lock_paid_order,
+)
 from src.database import GetDB
 from src.hosts.models import HostZone
+from src.system.scheduler import count_job_items
 from src.telegram import utils
 from src.telegram.utils import get_random_string
 
@@ -47,114 +52,141 @@ def _get_random_available_host_zone(
     return None
 
 
+def _fulfill_order(db: Session, order_id: int):
+    db_order = lock_paid_order(db=db, order_id=order_id)
+
+    if db_order is None:
+        logger.info(f"Order {order_id} is already fulfilled or locked, Skip!")
+        return None
+
+    logger.info(f"Process order with id: {db_order.id}")
+
+    db_service = db_order.service
+    db_account = db_order.account
+    db_user = db_order.user
+
+    if db_service.host_zones is None:
+        logger.error(f"Host zone is empty in service {db_service.name}")
+
+    db_host_zone = _get_random_available_host_zone(
+        db=db,
+        host_zones=db_service.host_zones,
+        preferred_host_zone=(None if db_account is None else db_account.host_zone),
+    )
+    if db_host_zone is None:
+        logger.error(f"All host zones in service {db_service.name} are Full!")
+        return None
+
+    today = datetime.now()
+    expired_at = today + timedelta(days=db_order.duration)
+
+    if db_account:
+        logger.info(f"Recharge account {db_account.email}")
+
+        reset_traffic(db=db, db_account=db_account, commit=False)
+
+        account_modify = AccountModify(
+            id=db_account.id,
+            user_id=db_account.user_id,
+            host_zone_id=db_host_zone.id,
+            uuid=db_account.uuid,
+            service_title=db_service.name,
+            user_title=db_account.user_title,
+            data_limit=db_order.data_limit,
+            ip_limit=db_order.ip_limit,
+            email=db_account.email,
+            enable=True,
+            expired_at=expired_at,
+            started_at=today,
+        )
+
+        db_account = update_account(
+            db=db,
+            db_account=db_account,
+            modify=account_modify,
+            db_host_zone=db_host_zone,
+            commit=False,
+        )
+    else:
+        logger.info(f"Create new account")
+
+        account = AccountCreate(
+            host_zone_id=db_host_zone.id,
+            user_id=db_order.user_id,
+            ip_limit=db_order.ip_limit,
+            data_limit=db_service.data_limit,
+            email=get_random_string(6),
+            service_title=db_service.name,
+            enable=True,
+            expired_at=expired_at,
+            started_at=today,
+        )
+
+        db_account = create_account(
+            db=db,
+            db_user=db_user,
+            account=account,
+            db_host_zone=db_host_zone,
+            commit=False,
+        )
+
+    complete_paid_order(
+        db=db,
+        db_order=db_order,
+        db_account=db_account,
+        fulfillment_key=f"order-{db_order.id}",
+    )
+
+    return db_account
+
+
 def process_paid_orders():
     logger.info("Process Paid Orders")
+    start = datetime.utcnow().timestamp()
+
+    # Orders that can't be fulfilled yet, like those whose host zones are all
+    # full, are passed over so they don't hold back the orders after them
+    fulfilled, last_order_id = 0, 0
+    while fulfilled < config.PROCESS_PAID_ORDERS_BATCH_SIZE:
+        with GetDB() as db:
+            order_ids = get_fulfillable_order_ids(
+                db=db,
+                limit=config.PROCESS_PAID_ORDERS_BATCH_SIZE - fulfilled,
+                after_id=last_order_id,
+            )
 
-    with GetDB() as db:
-        for db_order in get_orders(
-            db=db, status=OrderStatus.paid, return_with_count=False
-        ):
-            try:
-                logger.info(f"Process order with id: {db_order.id}")
-                if db_order.service_id:
-
-                    db_service = db_order.service
-                    db_account = db_order.account
-                    db_user = db_order.user
-
-                    if db_service.host_zones is None:
-                        logger.error(f"Host zone is empty in service {db_service.name}")
-
-                    db_host_zone = _get_random_available_host_zone(
-                        db=db,
-                        host_zones=db_service.host_zones,
-                        preferred_host_zone=(
-                            None if db_account is None else db_account.host_zone
-                        ),
+        if not order_ids:
+            break
+
+        for order_id in order_ids:
+            last_order_id = order_id
+
+            with GetDB() as db:
+                try:
+                    db_account = _fulfill_order(db=db, order_id=order_id)
+                except Exception as error:
+                    db.rollback()
+                    utils.send_message_to_admin(
+                        message=f"Error in process order {order_id}"
+                    )
+                    logger.error(error)
+                    continue
+
+                if db_account is None:
+                    continue
+
+                fulfilled += 1
+                count_job_items()
+
+                try:
+                    propagate_accounts(db=db, account_ids=[db_account.id])
+                except Exception as error:
+                    logger.error(
+                        f"Error in propagate account {db_account.email} of order {order_id}: {error}"
                     )
-                    if db_host_zone is None:
-                        logger.error(
-                            f"All host zones in service {db_service.name} are Full!"
-                        )
-                        continue
-
-                    today = datetime.now()
-                    expired_at = today + timedelta(days=db_order.duration)
-
-                    if db_account:
-                        if db_account.enable:
-                            logger.info("Account is enable, Skip to recharge now!")
-                        else:
-                            logger.info(f"Recharge account {db_account.email}")
-
-                            reset_traffic(db=db, db_account=db_account)
-
-                            account_modify = AccountModify(
-                                id=db_account.id,
-                                user_id=db_account.user_id,
-                                host_zone_id=db_host_zone.id,
-                                uuid=db_account.uuid,
-                                service_title=db_service.name,
-                                user_title=db_account.user_title,
-                                data_limit=db_order.data_limit,
-                                ip_limit=db_order.ip_limit,
-                                email=db_account.email,
-                                enable=True,
-                                expired_at=expired_at,
-                                started_at=today,
-                            )
-
-                            db_account = update_account(
-                                db=db,
-                                db_account=db_account,
-                                modify=account_modify,
-                                db_host_zone=db_host_zone,
-                            )
-
-                            update_order_status(
-                                db=db,
-                                db_order=db_order,
-                                db_account=db_account,
-                                status=OrderStatus.completed,
-                            )
-
-                    else:
-                        logger.info(f"Create new account")
-
-                        account = AccountCreate(
-                            host_zone_id=db_host_zone.id,
-                            user_id=db_order.user_id,
-                            ip_limit=db_order.ip_limit,
-                            data_limit=db_service.data_limit,
-                            email=get_random_string(6),
-                            service_title=db_service.name,
-                            enable=True,
-                            expired_at=expired_at,
-                            started_at=today,
-                        )
-
-                        db_account = create_account(
-                            db=db,
-                            db_user=db_user,
-                            account=account,
-                            db_host_zone=db_host_zone,
-                        )
-
-                        update_order_status(
-                            db=db,
-                            db_order=db_order,
-                            db_account=db_account,
-                            status=OrderStatus.completed,
-                        )
-
-                else:
-                    # TODO
-                    logger.warn("Not implemented yet")
-            except Exception as error:
-                utils.send_message_to_admin(
-                    message=f"Error in process order {db_order.id}"
-                )
-                logger.error(error)
+
+    end = datetime.utcnow().timestamp()
+    logger.info(f"End Process {fulfilled} Paid Orders in {end - start} Sec")
 
 
 if config.ENABLE_ORDER_JOBS:
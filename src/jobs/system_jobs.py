@@ -0,0 +1,41 @@
+from datetime import datetime, timedelta
+
+from src import scheduler, config, logger
+from src.database import GetDB
+from src.system.service import remove_expired_bot_states, remove_job_runs
+from src.system.scheduler import count_job_items
+
+
+def remove_old_job_runs():
+    with GetDB() as db:
+        removed = remove_job_runs(
+            db=db,
+            before=datetime.utcnow() - timedelta(days=config.JOB_RUN_RETENTION_DAYS),
+        )
+        count_job_items(removed)
+
+        logger.info(f"Removed {removed} job runs")
+
+
+def remove_expired_bot_state():
+    with GetDB() as db:
+        removed = remove_expired_bot_states(db=db)
+        count_job_items(removed)
+
+        logger.info(f"Removed {removed} expired bot states")
+
+
+scheduler.add_job(
+    func=remove_old_job_runs,
+    max_instances=1,
+    trigger="interval",
+    hours=6,
+)
+
+if config.BOT_STATE_STORE == "database":
+    scheduler.add_job(
+        func=remove_expired_bot_state,
+        max_instances=1,
+        trigger="interval",
+        hours=1,
+    )
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from src import scheduler, config, logger
+from src.accounts.schemas import AccountUedTrafficTrunc
+from src.accounts.service import (
+    rollup_used_traffic,
+    rollup_node_used_traffic,
+    compact_used_traffic,
+)
+from src.database import GetDB
+from src.system.scheduler import count_job_items
+
+
+def rollup_accounts_traffic():
+    with GetDB() as db:
+        start = datetime.utcnow().timestamp()
+
+        logger.info("Start rollup accounts used traffic " + str(datetime.now()))
+
+        try:
+            for period in (AccountUedTrafficTrunc.HOUR, AccountUedTrafficTrunc.DAY):
+                accounts = rollup_used_traffic(db=db, period=period)
+                nodes = rollup_node_used_traffic(db=db, period=period)
+                count_job_items(accounts + nodes)
+                logger.info(
+                    f"Rolled up {accounts} account and {nodes} node {period.value} buckets"
+                )
+        except Exception as error:
+            db.rollback()
+            logger.error(error)
+            return
+
+        now = datetime.utcnow()
+
+        try:
+            raw_deleted, hourly_deleted = compact_used_traffic(
+                db=db,
+                raw_before=now - timedelta(days=config.TRAFFIC_RAW_RETENTION_DAYS),
+                hourly_before=now
+                - timedelta(days=config.TRAFFIC_HOURLY_RETENTION_DAYS),
+            )
+            logger.info(
+                f"Compacted {raw_deleted} raw rows and {hourly_deleted} hourly buckets"
+            )
+        except Exception as error:
+            db.rollback()
+            logger.error(error)
+
+        end = datetime.utcnow().timestamp()
+        logger.info(f"Finish rollup accounts used traffic {int(end - start)} Sec")
+
+
+if config.ENABLE_SYNC_ACCOUNTS:
+    scheduler.add_job(
+        func=rollup_accounts_traffic,
+        max_instances=1,
+        trigger="interval",
+        seconds=config.TRAFFIC_ROLLUP_INTERVAL,
+    )
+else:
+    logger.warn("Traffic rollup JOBS are disabled!")
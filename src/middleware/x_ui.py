@@ -1,9 +1,11 @@
 import json
+import time
 
 import requests
 
 from src import logger, config
 from src.hosts.schemas import HostType, HostResponse
+from src.middleware.xui_driver import observe_xui_request
 import urllib3
 
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
@@ -27,6 +29,21 @@ class MHSANAEI:
         )
         self._login_cookies = self._get_login_cookie()
 
+    def _request(self, method: str, url: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        response = None
+
+        try:
+            response = requests.request(method, url, **kwargs)
+            return response
+        finally:
+            observe_xui_request(
+                self._host.name,
+                url,
+                started,
+                ok=response is not None and response.status_code == 200,
+            )
+
     def _generate_base_url(self, ssl: bool = False, api_path: str = ""):
         address = self._host.ip if self._host.domain is None else self._host.domain
 
@@ -46,7 +63,7 @@ class MHSANAEI:
         login_url = base_login_url + "/login"
         payload = {"username": self._host.username, "password": self._host.password}
         logger.debug("Try login with url: " + login_url)
-        req = requests.request(
+        req = self._request(
             "POST",
             login_url,
             data=payload,
@@ -59,7 +76,8 @@ class MHSANAEI:
     def get_client_stat(self, email: str):
         try:
             url = f"{self._base_api_url}/inbounds/getClientTraffics/{email}"
-            client_stat = requests.get(
+            client_stat = self._request(
+                "GET",
                 url,
                 cookies=self._login_cookies,
                 verify=False,
@@ -91,7 +109,8 @@ class MHSANAEI:
         logger.debug(f"Final url for reset client traffic is: {url}")
 
         try:
-            response = requests.post(
+            response = self._request(
+                "POST",
                 url,
                 cookies=self._login_cookies,
                 verify=False,
@@ -118,7 +137,8 @@ class MHSANAEI:
         logger.info(f"Final url for reset client traffic is: {url}")
 
         try:
-            response = requests.post(
+            response = self._request(
+                "POST",
                 url,
                 cookies=self._login_cookies,
                 verify=False,
@@ -147,7 +167,8 @@ class MHSANAEI:
 
             logger.debug(f"Final url for delete client is: {url}")
 
-            response = requests.post(
+            response = self._request(
+                "POST",
                 url,
                 cookies=self._login_cookies,
                 verify=False,
@@ -198,7 +219,8 @@ class MHSANAEI:
 
             logger.debug(f"Final payload to add client is: {payload_add_client}")
 
-            response = requests.post(
+            response = self._request(
+                "POST",
                 url,
                 cookies=self._login_cookies,
                 data=payload_add_client,
@@ -250,7 +272,8 @@ class MHSANAEI:
 
             logger.debug(f"Final payload to update is: {payload_add_client}")
 
-            response = requests.post(
+            response = self._request(
+                "POST",
                 url,
                 cookies=self._login_cookies,
                 data=payload_add_client,
@@ -314,7 +337,8 @@ class MHSANAEI:
 
             url = f"{self._base_api_url}/inbounds/list"
 
-            response = requests.get(
+            response = self._request(
+                "GET",
                 url,
                 cookies=self._login_cookies,
                 verify=False,
@@ -344,7 +368,8 @@ class MHSANAEI:
 
             url = f"{self._base_api_url}/inbounds/get/{inbound_id}"
 
-            inbound_stat = requests.get(
+            inbound_stat = self._request(
+                "GET",
                 url,
                 cookies=self._login_cookies,
                 verify=False,
@@ -0,0 +1,383 @@
+import asyncio
+import json
+import time
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Dict, List, Optional, Type
+
+import requests
+from pydantic import BaseModel
+from requests.adapters import HTTPAdapter
+
+from src import logger, config
+from src.hosts.schemas import HostType, HostResponse
+from src.utils.metrics import XUI_REQUEST_DURATION, XUI_REQUEST_ERRORS
+
+_OPERATIONS = {
+    "login",
+    "list",
+    "get",
+    "addClient",
+    "updateClient",
+    "delClient",
+    "resetClientTraffic",
+    "resetAllClientTraffics",
+    "getClientTraffics",
+}
+
+
+def xui_operation(url: str) -> str:
+    """Metric label of a panel url, ids and emails in it are left out."""
+    for segment in url.split("?")[0].split("/"):
+        if segment in _OPERATIONS:
+            return segment
+
+    return "other"
+
+
+def observe_xui_request(host: str, url: str, started: float, ok: bool):
+    operation = xui_operation(url)
+
+    XUI_REQUEST_DURATION.observe(
+        time.perf_counter() - started, host=host, operation=operation
+    )
+    if not ok:
+        XUI_REQUEST_ERRORS.inc(host=host, operation=operation)
+
+
+class XUIClient(BaseModel):
+    uuid: str
+    email: str
+    enable: bool = True
+    data_limit: int = 0
+    expire_time: int = 0
+    ip_limit: int = 0
+    flow: str = ""
+
+    def to_settings(self) -> dict:
+        return {
+            "id": self.uuid,
+            "flow": self.flow,
+            "alterId": 0,
+            "email": self.email,
+            "limitIp": self.ip_limit,
+            "totalGB": self.data_limit,
+            "expiryTime": self.expire_time,
+            "enable": self.enable,
+            "tgId": "",
+            "subId": "",
+        }
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "XUIClient":
+        return cls(
+            uuid=settings.get("id", ""),
+            email=settings.get("email", ""),
+            enable=settings.get("enable", True),
+            data_limit=settings.get("totalGB", 0) or 0,
+            expire_time=settings.get("expiryTime", 0) or 0,
+            ip_limit=settings.get("limitIp", 0) or 0,
+            flow=settings.get("flow", "") or "",
+        )
+
+
+class XUIClientStat(BaseModel):
+    email: str
+    enable: bool = True
+    upload: int = 0
+    download: int = 0
+
+
+class InboundSnapshot(BaseModel):
+    inbound_id: int
+    clients: List[XUIClient] = []
+    client_stats: List[XUIClientStat] = []
+
+
+class BulkResult(BaseModel):
+    succeeded: List[str] = []
+    failed: List[str] = []
+
+    def merge(self, other: "BulkResult"):
+        self.succeeded.extend(other.succeeded)
+        self.failed.extend(other.failed)
+
+
+class XUIDriver(ABC):
+    """
+    Asynchronous interface to the panel of a host.
+
+    Bulk methods take every client of one inbound at once and report the
+    emails that were and were not applied, a driver sends them in as few
+    requests as its panel allows.
+    """
+
+    def __init__(self, host: HostResponse):
+        self.host = host
+
+    @abstractmethod
+    async def snapshot(self, inbound_id: int) -> Optional[InboundSnapshot]:
+        """Clients and traffic of an inbound, None when the panel is unreachable."""
+
+    @abstractmethod
+    async def add_clients(
+        self, inbound_id: int, clients: List[XUIClient]
+    ) -> BulkResult:
+        pass
+
+    @abstractmethod
+    async def update_clients(
+        self, inbound_id: int, clients: List[XUIClient]
+    ) -> BulkResult:
+        pass
+
+    @abstractmethod
+    async def delete_clients(
+        self, inbound_id: int, clients: List[XUIClient]
+    ) -> BulkResult:
+        pass
+
+    @abstractmethod
+    async def reset_clients_traffic(
+        self, inbound_id: int, emails: Optional[List[str]] = None
+    ) -> BulkResult:
+        """Reset the traffic of emails, or of every client when emails is None."""
+
+    async def close(self):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class SanaeiDriver(XUIDriver):
+    """
+    Driver of the MHSanaei x-ui panel. Requests share one keep-alive session and
+    run in the default executor, at most X_UI_DRIVER_CONCURRENCY at a time.
+    """
+
+    def __init__(self, host: HostResponse):
+        super().__init__(host)
+
+        address = host.ip if host.domain is None else host.domain
+        self._base_url = "%s://%s:%s" % (
+            "https" if host.master else "http",
+            address,
+            host.port,
+        )
+        self._base_api_url = self._base_url + host.api_path
+
+        self._session = requests.Session()
+        self._session.verify = False
+        self._session.mount(
+            self._base_url,
+            HTTPAdapter(
+                pool_connections=1, pool_maxsize=config.X_UI_DRIVER_CONCURRENCY
+            ),
+        )
+        self._logged_in = False
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _send(self, method: str, url: str, **kwargs) -> requests.Response:
+        started = time.perf_counter()
+        response = None
+
+        try:
+            response = self._session.request(
+                method, url, timeout=config.X_UI_REQUEST_TIMEOUT, **kwargs
+            )
+            return response
+        finally:
+            observe_xui_request(
+                self.host.name,
+                url,
+                started,
+                ok=response is not None and response.status_code == 200,
+            )
+
+    def _login(self) -> bool:
+        login_url = self._base_api_url.replace("/panel/api", "") + "/login"
+        response = self._send(
+            "POST",
+            login_url,
+            data={"username": self.host.username, "password": self.host.password},
+        )
+        self._logged_in = (
+            response.status_code == 200 and response.json().get("success") is True
+        )
+
+        return self._logged_in
+
+    def _request(self, method: str, path: str, **kwargs):
+        """Blocking call of the panel api, the obj of the response or None."""
+        try:
+            for attempt in range(2):
+                if not self._logged_in and not self._login():
+                    logger.warn(f"Could not login to host {self.host.name}")
+                    return None
+
+                response = self._send(
+                    method, self._base_api_url + path, allow_redirects=False, **kwargs
+                )
+
+                # Expired sessions are answered with a redirect to the login page
+                if response.status_code in (401, 404) or response.is_redirect:
+                    self._logged_in = False
+                    continue
+
+                if response.status_code != 200:
+                    logger.warn(
+                        f"Status code {response.status_code} for {path} on {self.host.name}"
+                    )
+                    return None
+
+                data = response.json()
+                if data.get("success") is not True:
+                    logger.debug(f"Unsuccessful {path} on {self.host.name}: {data}")
+                    return None
+
+                return data.get("obj", True) or True
+        except Exception as error:
+            logger.warn(error)
+
+        return None
+
+    async def _call(self, method: str, path: str, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(config.X_UI_DRIVER_CONCURRENCY)
+
+        async with self._semaphore:
+            return await asyncio.get_event_loop().run_in_executor(
+                None, partial(self._request, method, path, **kwargs)
+            )
+
+    async def _each(self, items: List[str], calls) -> BulkResult:
+        results = await asyncio.gather(*calls)
+
+        result = BulkResult()
+        for item, done in zip(items, results):
+            (result.succeeded if done else result.failed).append(item)
+
+        return result
+
+    async def snapshot(self, inbound_id: int) -> Optional[InboundSnapshot]:
+        obj = await self._call("GET", f"/inbounds/get/{inbound_id}")
+        if not isinstance(obj, dict):
+            return None
+
+        settings = json.loads(obj.get("settings") or "{}")
+
+        return InboundSnapshot(
+            inbound_id=inbound_id,
+            clients=[
+                XUIClient.from_settings(client)
+                for client in settings.get("clients") or []
+            ],
+            client_stats=[
+                XUIClientStat(
+                    email=stat["email"],
+                    enable=stat.get("enable", True),
+                    upload=stat.get("up", 0),
+                    download=stat.get("down", 0),
+                )
+                for stat in obj.get("clientStats") or []
+            ],
+        )
+
+    async def add_clients(
+        self, inbound_id: int, clients: List[XUIClient]
+    ) -> BulkResult:
+        # addClient takes any number of clients, they are sent in chunks
+        chunks = [
+            clients[index : index + config.X_UI_BULK_SIZE]
+            for index in range(0, len(clients), config.X_UI_BULK_SIZE)
+        ]
+
+        results = await asyncio.gather(
+            *(
+                self._call(
+                    "POST",
+                    "/inbounds/addClient",
+                    json={
+                        "id": inbound_id,
+                        "settings": json.dumps(
+                            {"clients": [client.to_settings() for client in chunk]}
+                        ),
+                    },
+                )
+                for chunk in chunks
+            )
+        )
+
+        result = BulkResult()
+        for chunk, done in zip(chunks, results):
+            emails = [client.email for client in chunk]
+            (result.succeeded if done else result.failed).extend(emails)
+
+        return result
+
+    async def update_clients(
+        self, inbound_id: int, clients: List[XUIClient]
+    ) -> BulkResult:
+        return await self._each(
+            [client.email for client in clients],
+            [
+                self._call(
+                    "POST",
+                    f"/inbounds/updateClient/{client.uuid}",
+                    json={
+                        "id": inbound_id,
+                        "settings": json.dumps({"clients": [client.to_settings()]}),
+                    },
+                )
+                for client in clients
+            ],
+        )
+
+    async def delete_clients(
+        self, inbound_id: int, clients: List[XUIClient]
+    ) -> BulkResult:
+        return await self._each(
+            [client.email for client in clients],
+            [
+                self._call("POST", f"/inbounds/{inbound_id}/delClient/{client.uuid}")
+                for client in clients
+            ],
+        )
+
+    async def reset_clients_traffic(
+        self, inbound_id: int, emails: Optional[List[str]] = None
+    ) -> BulkResult:
+        if emails is None:
+            done = await self._call(
+                "POST", f"/inbounds/resetAllClientTraffics/{inbound_id}"
+            )
+            return BulkResult(succeeded=["*"]) if done else BulkResult(failed=["*"])
+
+        return await self._each(
+            emails,
+            [
+                self._call("POST", f"/inbounds/{inbound_id}/resetClientTraffic/{email}")
+                for email in emails
+            ],
+        )
+
+    async def close(self):
+        self._session.close()
+
+
+DRIVERS: Dict[HostType, Type[XUIDriver]] = {
+    HostType.x_ui_sanaei: SanaeiDriver,
+}
+
+
+def get_driver(host: HostResponse) -> XUIDriver:
+    driver = DRIVERS.get(host.type)
+
+    if driver is None:
+        raise ValueError(f"There is no driver for host type {host.type}")
+
+    return driver(host=host)
@@ -0,0 +1,56 @@
+"""Add trigram search indexes
+
+Revision ID: 7e3b0d5f1a29
+Revises: 9a2d6c4e8f17
+Create Date: 2026-10-19 14:31:56.117902
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "7e3b0d5f1a29"
+down_revision = "9a2d6c4e8f17"
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = {
+    "account": ["email", "user_title", "service_title", "uuid"],
+    "user": ["first_name", "last_name", "username", "telegram_username"],
+}
+
+
+def upgrade() -> None:
+    # pg_trgm only exists on postgres, other databases keep scanning
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, columns in TRIGRAM_INDEXES.items():
+        for column in columns:
+            op.create_index(
+                f"ix_{table}_{column}_trgm",
+                table,
+                [column],
+                unique=False,
+                postgresql_using="gin",
+                postgresql_ops={column: "gin_trgm_ops"},
+            )
+
+    op.execute(
+        'CREATE INDEX ix_user_telegram_chat_id_trgm ON "user" '
+        "USING gin ((telegram_chat_id::text) gin_trgm_ops)"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_index("ix_user_telegram_chat_id_trgm", table_name="user")
+
+    for table, columns in TRIGRAM_INDEXES.items():
+        for column in columns:
+            op.drop_index(f"ix_{table}_{column}_trgm", table_name=table)
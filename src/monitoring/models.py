@@ -3,6 +3,8 @@ from datetime import datetime
 from sqlalchemy import (
     Column,
     DateTime,
+    Float,
+    ForeignKey,
     Integer,
     String,
     Boolean,
@@ -18,18 +20,59 @@ class MonitoringResult(Base):
     # host_id = Column(Integer, ForeignKey("host.id"))
     # host = relationship("Host", back_populates="inbounds")
 
-    client_name = Column(String(128), index=True)
-    client_ip = Column(String(128), index=True)
-    test_url = Column(String(128), index=True)
-    remark = Column(String(128), index=True)
-    port = Column(Integer, index=True)
-    domain = Column(String(128), index=True)
-    sni = Column(String(128), index=True)
+    # Only created_at is indexed, results are inserted in bulk and read by time
+    client_name = Column(String(128))
+    client_ip = Column(String(128))
+    region = Column(String(64), nullable=True)
+    test_url = Column(String(128))
+    remark = Column(String(128))
+    port = Column(Integer)
+    domain = Column(String(128))
+    sni = Column(String(128))
     delay = Column(Integer, index=False)
     ping = Column(Integer, index=False)
 
     develop = Column(Boolean, default=False)
     success = Column(Boolean, default=False)
 
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
     modified_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class MonitoringResultRollup(Base):
+    __tablename__ = "monitoring_result_rollup"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Hourly count of results per config, region and delay bucket
+    bucket = Column(DateTime, nullable=False, index=True)
+    remark = Column(String(128))
+    port = Column(Integer)
+    domain = Column(String(128))
+    sni = Column(String(128))
+    # The client name for results sent without a region, cut to its length
+    region = Column(String(64))
+    develop = Column(Boolean, default=False)
+    # Upper bound of the delay bucket in ms, -1 for failed results
+    delay = Column(Integer, nullable=False)
+    count = Column(Integer, default=0)
+
+
+class InboundConfigHealth(Base):
+    __tablename__ = "inbound_config_health"
+
+    id = Column(Integer, primary_key=True, index=True)
+    inbound_config_id = Column(
+        Integer,
+        ForeignKey("inbound_config.id", ondelete="CASCADE"),
+        nullable=False,
+        unique=True,
+    )
+    # Over the last MONITORING_HEALTH_WINDOW_HOURS
+    results = Column(Integer, default=0)
+    success_rate = Column(Float, default=0)
+    p50_delay = Column(Integer, nullable=True)
+    p95_delay = Column(Integer, nullable=True)
+    score = Column(Float, default=0)
+    failing = Column(Boolean, default=False)
+
+    updated_at = Column(DateTime, default=datetime.utcnow)
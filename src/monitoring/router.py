@@ -1,14 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException
+import json
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError, parse_obj_as
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 import src.monitoring.service as monitoring_result_service
 from src.admins.schemas import Admin
+from src.config import MONITORING_INGEST_BATCH_SIZE
 from src.database import get_db
-from src.monitoring.schemas import MonitoringResultResponse, MonitoringResultCreate
+from src.monitoring.schemas import (
+    InboundConfigHealthResponse,
+    MonitoringResultCreate,
+    MonitoringResultResponse,
+    MonitoringResultsCreateResponse,
+    MonitoringStatsGroup,
+    MonitoringStatsResponse,
+)
 
 router = APIRouter()
 
+NDJSON_MEDIA_TYPES = ("application/x-ndjson", "application/jsonl")
+
 
 @router.post("/monitoring-results/", response_model=MonitoringResultResponse)
 def add_inbound_config(
@@ -25,3 +41,121 @@ def add_inbound_config(
         raise HTTPException(status_code=409, detail="Monitoring Result already exists")
 
     return db_monitoring_result
+
+
+async def _ndjson_lines(request: Request):
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+
+    yield buffer
+
+
+def _parse_results(items, line: Optional[int] = None) -> List[MonitoringResultCreate]:
+    try:
+        return parse_obj_as(List[MonitoringResultCreate], items)
+    except ValidationError as error:
+        detail = error.errors()
+        if line is not None:
+            detail = [dict(item, line=line) for item in detail]
+
+        raise HTTPException(status_code=422, detail=detail)
+
+
+@router.post("/monitoring-results/bulk", response_model=MonitoringResultsCreateResponse)
+async def add_monitoring_results(
+    request: Request,
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    """
+    Store a JSON array of monitoring results, or an NDJSON stream of them with
+    the application/x-ndjson content type, all or none of them. Results are
+    inserted in batches of MONITORING_INGEST_BATCH_SIZE.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+
+    async def store(batch: List[MonitoringResultCreate]) -> int:
+        return await run_in_threadpool(
+            monitoring_result_service.create_monitoring_results,
+            db=db,
+            monitoring_results=batch,
+            commit=False,
+        )
+
+    created = 0
+    try:
+        if content_type in NDJSON_MEDIA_TYPES:
+            batch, number = [], 0
+            async for line in _ndjson_lines(request):
+                number += 1
+                if not line.strip():
+                    continue
+
+                try:
+                    item = json.loads(line)
+                except ValueError:
+                    raise HTTPException(
+                        status_code=400, detail=f"Invalid JSON on line {number}"
+                    )
+
+                batch += _parse_results([item], line=number)
+                if len(batch) >= MONITORING_INGEST_BATCH_SIZE:
+                    created += await store(batch)
+                    batch = []
+
+            created += await store(batch)
+        else:
+            try:
+                items = json.loads(await request.body())
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid JSON")
+
+            if not isinstance(items, list):
+                raise HTTPException(
+                    status_code=400, detail="Expected an array of monitoring results"
+                )
+
+            results = _parse_results(items)
+            for index in range(0, len(results), MONITORING_INGEST_BATCH_SIZE):
+                created += await store(
+                    results[index : index + MONITORING_INGEST_BATCH_SIZE]
+                )
+
+        await run_in_threadpool(db.commit)
+    except Exception:
+        await run_in_threadpool(db.rollback)
+        raise
+
+    return MonitoringResultsCreateResponse(created=created)
+
+
+@router.get("/monitoring-results/stats", response_model=List[MonitoringStatsResponse])
+def get_monitoring_stats(
+    group_by: MonitoringStatsGroup = MonitoringStatsGroup.config,
+    hours: int = Query(24, ge=1),
+    end: Optional[datetime] = None,
+    develop: Optional[bool] = None,
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    """Success rate and p50/p95 delay of the last hours up to end."""
+    start = (end or datetime.utcnow()) - timedelta(hours=hours)
+
+    return monitoring_result_service.get_monitoring_stats(
+        db=db, group_by=group_by, start=start, end=end, develop=develop
+    )
+
+
+@router.get(
+    "/monitoring-results/health", response_model=List[InboundConfigHealthResponse]
+)
+def get_inbound_config_health(
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    """Health of the scored inbound configs, healthiest first."""
+    return monitoring_result_service.get_inbound_config_health(db=db)
@@ -1,11 +1,15 @@
 from datetime import datetime
+from enum import Enum
+from typing import Optional
 
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, constr, validator
 
 
 class MonitoringResultBase(BaseModel):
     client_name: str
     client_ip: str
+    # Where the client tests from, results without one are grouped by client
+    region: Optional[constr(max_length=64)] = None
     test_url: str
     remark: str
     port: int
@@ -31,3 +35,42 @@ class MonitoringResultResponse(MonitoringResultBase):
 
 class MonitoringResultCreate(MonitoringResultBase):
     pass
+
+
+class MonitoringResultsCreateResponse(BaseModel):
+    created: int
+
+
+class MonitoringStatsGroup(str, Enum):
+    config = "config"
+    region = "region"
+    config_region = "config_region"
+
+
+class MonitoringStatsResponse(BaseModel):
+    remark: Optional[str] = None
+    domain: Optional[str] = None
+    sni: Optional[str] = None
+    port: Optional[int] = None
+    region: Optional[str] = None
+
+    total: int
+    success: int
+    success_rate: float
+    # Upper bounds of the delay buckets holding the percentiles, in ms
+    p50_delay: Optional[int] = None
+    p95_delay: Optional[int] = None
+
+
+class InboundConfigHealthResponse(BaseModel):
+    inbound_config_id: int
+    results: int
+    success_rate: float
+    p50_delay: Optional[int] = None
+    p95_delay: Optional[int] = None
+    score: float
+    failing: bool
+    updated_at: datetime
+
+    class Config:
+        orm_mode = True
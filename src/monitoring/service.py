@@ -1,7 +1,29 @@
+import math
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import case, func, insert, select
 from sqlalchemy.orm import Session
 
-from src.monitoring.models import MonitoringResult
-from src.monitoring.schemas import MonitoringResultCreate
+from src import config
+from src.inbound_configs.models import InboundConfig
+from src.monitoring.models import (
+    InboundConfigHealth,
+    MonitoringResult,
+    MonitoringResultRollup,
+)
+from src.monitoring.schemas import (
+    MonitoringResultCreate,
+    MonitoringStatsGroup,
+    MonitoringStatsResponse,
+)
+from src.utils.dates import date_trunc
+
+# Upper bounds in ms of the delay buckets results are counted in once they are
+# downsampled, slower results count in the last one
+DELAY_BUCKETS = (50, 100, 150, 200, 300, 400, 500, 750, 1000, 1500, 2000, 3000, 5000)
+FAILED_DELAY = -1
 
 
 def create_monitoring_result(
@@ -12,6 +34,7 @@ def create_monitoring_result(
     db_monitoring_result = MonitoringResult(
         client_name=monitoring_result.client_name,
         client_ip=monitoring_result.client_ip,
+        region=monitoring_result.region,
         test_url=monitoring_result.test_url,
         remark=monitoring_result.remark,
         port=monitoring_result.port,
@@ -26,3 +49,291 @@ def create_monitoring_result(
     db.commit()
     db.refresh(db_monitoring_result)
     return db_monitoring_result
+
+
+def create_monitoring_results(
+    db: Session,
+    monitoring_results: List[MonitoringResultCreate],
+    commit: bool = True,
+) -> int:
+    """Insert monitoring results with one bulk insert, returns their count."""
+    if not monitoring_results:
+        return 0
+
+    now = datetime.utcnow()
+    db.execute(
+        insert(MonitoringResult),
+        [
+            dict(monitoring_result.dict(), created_at=now, modified_at=now)
+            for monitoring_result in monitoring_results
+        ],
+    )
+    if commit:
+        db.commit()
+
+    return len(monitoring_results)
+
+
+def _result_region():
+    # Results without a region are grouped by client, cut to the region length
+    return func.coalesce(
+        MonitoringResult.region,
+        func.substr(
+            MonitoringResult.client_name, 1, MonitoringResultRollup.region.type.length
+        ),
+    )
+
+
+def _delay_bucket(success, delay):
+    return case(
+        (success.isnot(True), FAILED_DELAY),
+        *((func.coalesce(delay, 0) <= bound, bound) for bound in DELAY_BUCKETS[:-1]),
+        else_=DELAY_BUCKETS[-1],
+    )
+
+
+def downsample_monitoring_results(db: Session, before: datetime) -> Tuple[int, int]:
+    """
+    Count the results of whole hours before before into hourly rollup buckets
+    per config, region and delay bucket, then delete them.
+    Returns the number of buckets written and results deleted.
+    """
+    before = before.replace(minute=0, second=0, microsecond=0)
+
+    bucket = date_trunc(db, "hour", MonitoringResult.created_at)
+    region = _result_region()
+    delay = _delay_bucket(MonitoringResult.success, MonitoringResult.delay)
+    keys = [
+        MonitoringResult.remark,
+        MonitoringResult.port,
+        MonitoringResult.domain,
+        MonitoringResult.sni,
+        region,
+        MonitoringResult.develop,
+        delay,
+    ]
+
+    query = (
+        select(bucket, *keys, func.count(MonitoringResult.id))
+        .where(MonitoringResult.created_at < before)
+        .group_by(bucket, *keys)
+    )
+    written = db.execute(
+        insert(MonitoringResultRollup).from_select(
+            [
+                MonitoringResultRollup.bucket,
+                MonitoringResultRollup.remark,
+                MonitoringResultRollup.port,
+                MonitoringResultRollup.domain,
+                MonitoringResultRollup.sni,
+                MonitoringResultRollup.region,
+                MonitoringResultRollup.develop,
+                MonitoringResultRollup.delay,
+                MonitoringResultRollup.count,
+            ],
+            query,
+        )
+    ).rowcount
+
+    deleted = (
+        db.query(MonitoringResult)
+        .filter(MonitoringResult.created_at < before)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+
+    return written, deleted
+
+
+def remove_monitoring_rollups(db: Session, before: datetime) -> int:
+    removed = (
+        db.query(MonitoringResultRollup)
+        .filter(MonitoringResultRollup.bucket < before)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+
+    return removed
+
+
+def _stats_keys(model, group_by: MonitoringStatsGroup, region) -> list:
+    keys = []
+    if group_by != MonitoringStatsGroup.region:
+        keys += [model.remark, model.domain, model.sni, model.port]
+    if group_by != MonitoringStatsGroup.config:
+        keys.append(region)
+
+    return keys
+
+
+def _percentile(delays: List[Tuple[int, int]], total: int, q: float) -> Optional[int]:
+    rank = math.ceil(q * total)
+    seen = 0
+    for delay, count in delays:
+        seen += count
+        if seen >= rank:
+            return delay
+
+    return None
+
+
+def _count_delays(
+    db: Session,
+    raw_keys: list,
+    rollup_keys: list,
+    start: datetime,
+    end: Optional[datetime] = None,
+    develop: Optional[bool] = None,
+) -> Dict[tuple, Counter]:
+    """Results per key and delay bucket, from raw results and rollups."""
+    Raw, Rollup = MonitoringResult, MonitoringResultRollup
+    counts = defaultdict(Counter)
+
+    raw_delay = _delay_bucket(Raw.success, Raw.delay)
+    raw_filters = [Raw.created_at >= start]
+    rollup_filters = [Rollup.bucket >= start.replace(minute=0, second=0, microsecond=0)]
+
+    if end is not None:
+        raw_filters.append(Raw.created_at < end)
+        rollup_filters.append(Rollup.bucket < end)
+    if develop is not None:
+        raw_filters.append(Raw.develop == develop)
+        rollup_filters.append(Rollup.develop == develop)
+
+    queries = [
+        select(*raw_keys, raw_delay, func.count(Raw.id))
+        .where(*raw_filters)
+        .group_by(*raw_keys, raw_delay),
+        select(*rollup_keys, Rollup.delay, func.sum(Rollup.count))
+        .where(*rollup_filters)
+        .group_by(*rollup_keys, Rollup.delay),
+    ]
+    for query in queries:
+        for *key, delay, count in db.execute(query):
+            counts[tuple(key)][delay] += count
+
+    return counts
+
+
+def _summarize(delays: Counter) -> Tuple[int, int, Optional[int], Optional[int]]:
+    """Total, successful, p50 and p95 delay of the results counted in delays."""
+    total = sum(delays.values())
+    success = total - delays[FAILED_DELAY]
+    successful = sorted(
+        (delay, count) for delay, count in delays.items() if delay != FAILED_DELAY
+    )
+
+    return (
+        total,
+        success,
+        _percentile(successful, success, 0.5),
+        _percentile(successful, success, 0.95),
+    )
+
+
+def get_monitoring_stats(
+    db: Session,
+    group_by: MonitoringStatsGroup,
+    start: datetime,
+    end: Optional[datetime] = None,
+    develop: Optional[bool] = None,
+) -> List[MonitoringStatsResponse]:
+    """
+    Success rate and p50/p95 delay per config, client region or both, from
+    raw results and the rollups of downsampled ones. Delays are counted in
+    DELAY_BUCKETS, so percentiles are the bounds of the buckets holding them.
+    """
+    group_by = MonitoringStatsGroup(group_by)
+
+    Raw, Rollup = MonitoringResult, MonitoringResultRollup
+    counts = _count_delays(
+        db=db,
+        raw_keys=_stats_keys(Raw, group_by, _result_region()),
+        rollup_keys=_stats_keys(Rollup, group_by, Rollup.region),
+        start=start,
+        end=end,
+        develop=develop,
+    )
+
+    stats = []
+    for key, delays in counts.items():
+        total, success, p50_delay, p95_delay = _summarize(delays)
+
+        fields = {}
+        if group_by != MonitoringStatsGroup.region:
+            fields.update(zip(("remark", "domain", "sni", "port"), key[:4]))
+        if group_by != MonitoringStatsGroup.config:
+            fields["region"] = key[-1]
+
+        stats.append(
+            MonitoringStatsResponse(
+                **fields,
+                total=total,
+                success=success,
+                success_rate=round(success / total, 4) if total else 0,
+                p50_delay=p50_delay,
+                p95_delay=p95_delay,
+            )
+        )
+
+    return sorted(stats, key=lambda item: (-item.success_rate, item.p50_delay or 0))
+
+
+def health_score(success_rate: float, p50_delay: Optional[int]) -> float:
+    """Between 0 and 1, the success rate scaled down by the p50 delay, halved at 1s."""
+    return round(success_rate * 1000 / (1000 + (p50_delay or 0)), 4)
+
+
+def score_inbound_configs(db: Session, start: datetime) -> int:
+    """
+    Rebuild the health of inbound configs from the results since start, matched
+    on domain, SNI and port. Configs with less than MONITORING_HEALTH_MIN_RESULTS
+    results are left unscored. Returns the number of configs scored.
+    """
+    Raw, Rollup = MonitoringResult, MonitoringResultRollup
+    counts = _count_delays(
+        db=db,
+        raw_keys=[Raw.domain, Raw.sni, Raw.port],
+        rollup_keys=[Rollup.domain, Rollup.sni, Rollup.port],
+        start=start,
+    )
+
+    now = datetime.utcnow()
+    rows = []
+    for inbound_config_id, domain, sni, port in db.query(
+        InboundConfig.id, InboundConfig.domain, InboundConfig.sni, InboundConfig.port
+    ):
+        delays = counts.get((domain, sni, port))
+        if not delays:
+            continue
+
+        total, success, p50_delay, p95_delay = _summarize(delays)
+        if total < config.MONITORING_HEALTH_MIN_RESULTS:
+            continue
+
+        success_rate = round(success / total, 4)
+        rows.append(
+            dict(
+                inbound_config_id=inbound_config_id,
+                results=total,
+                success_rate=success_rate,
+                p50_delay=p50_delay,
+                p95_delay=p95_delay,
+                score=health_score(success_rate, p50_delay),
+                failing=success_rate < config.MONITORING_HEALTH_MIN_SUCCESS_RATE,
+                updated_at=now,
+            )
+        )
+
+    db.query(InboundConfigHealth).delete(synchronize_session=False)
+    if rows:
+        db.execute(insert(InboundConfigHealth), rows)
+    db.commit()
+
+    return len(rows)
+
+
+def get_inbound_config_health(db: Session) -> List[InboundConfigHealth]:
+    return (
+        db.query(InboundConfigHealth).order_by(InboundConfigHealth.score.desc()).all()
+    )
@@ -13,6 +13,7 @@ from src.admins.schemas import Admin
 from src.database import get_db
 from src.exc import EloraApplicationError
 from src.utils.exc import InvalidJSONFormatError
+from src.utils.pagination import CountMode, get_cursor, get_next_cursor
 from src.notification.schemas import (
     NotificationsResponse,
     NotificationStatus,
@@ -40,6 +41,8 @@ def get_notifications(
     account_id: int = 0,
     user_id: int = 0,
     q: str = None,
+    count: CountMode = CountMode.exact,
+    cursor: Optional[list] = Depends(get_cursor),
     db: Session = Depends(get_db),
     admin: Admin = Depends(Admin.get_current),
 ):
@@ -54,20 +57,31 @@ def get_notifications(
                     status_code=400, detail=f'"{opt}" is not a valid sort option'
                 )
 
-    notifications, count = notification_service.get_notifications(
-        db=db,
-        offset=offset,
-        limit=limit,
-        sort=sort,
-        status=status,
-        approve=approve,
-        account_id=account_id,
-        user_id=user_id,
-        notification_type=type_,
-        q=q,
-    )
+    try:
+        notifications, total = notification_service.get_notifications(
+            db=db,
+            offset=offset,
+            limit=limit,
+            sort=sort,
+            status=status,
+            approve=approve,
+            account_id=account_id,
+            user_id=user_id,
+            notification_type=type_,
+            q=q,
+            cursor=cursor,
+            count_mode=count,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    next_cursor = get_next_cursor(db=db, items=notifications, sort=sort, limit=limit)
 
-    return {"notifications": notifications, "total": count}
+    return {
+        "notifications": notifications,
+        "total": total,
+        "next_cursor": next_cursor,
+    }
 
 
 @notification_router.post("/notifications/bulk_send", tags=["Notification"])
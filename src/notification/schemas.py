@@ -107,4 +107,5 @@ class NotificationResponse(NotificationBase):
 
 class NotificationsResponse(BaseModel):
     notifications: List[NotificationResponse]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
@@ -2,7 +2,7 @@ import json
 from enum import Enum
 from typing import List, Tuple, Optional
 
-from sqlalchemy import or_
+from sqlalchemy import func, or_
 from sqlalchemy.orm import Session
 
 import src.accounts.service as account_service
@@ -16,6 +16,7 @@ from src.notification.schemas import (
     NotificationModify,
 )
 from src.users.models import User
+from src.utils.pagination import CountMode, paginate
 
 NotificationSortingOptions = Enum(
     "NotificationSortingOptions",
@@ -43,6 +44,7 @@ def create_notification(
     notification: NotificationCreate,
     db_account: Optional[Account] = None,
     db_user: Optional[User] = None,
+    commit: bool = True,
 ):
     keyboard = notification.keyboard
     if keyboard and not isinstance(keyboard, str):
@@ -64,11 +66,43 @@ def create_notification(
     )
 
     db.add(db_notification)
-    db.commit()
-    db.refresh(db_notification)
+    if commit:
+        db.commit()
+        db.refresh(db_notification)
+    else:
+        db.flush()
     return db_notification
 
 
+def create_notifications(
+    db: Session, notifications: List[NotificationCreate], commit: bool = True
+):
+    for notification in notifications:
+        keyboard = notification.keyboard
+        if keyboard and not isinstance(keyboard, str):
+            keyboard = json.dumps(keyboard)
+
+        db.add(
+            Notification(
+                account_id=notification.account_id,
+                user_id=notification.user_id,
+                level=notification.level,
+                message=notification.message,
+                details=notification.details,
+                approve=notification.approve,
+                send_to_admin=notification.send_to_admin,
+                status=notification.status,
+                engine=notification.engine,
+                type=notification.type,
+                keyboard=json.loads(keyboard) if keyboard else None,
+                photo_url=notification.photo_url,
+            )
+        )
+
+    if commit:
+        db.commit()
+
+
 def create_bulk_notification(
     db: Session,
     user_ids: Optional[List[int]],
@@ -129,6 +163,8 @@ def get_notifications(
     level: int = 0,
     status: NotificationStatus = None,
     return_with_count: bool = True,
+    cursor: Optional[list] = None,
+    count_mode: CountMode = CountMode.exact,
 ) -> Tuple[List[Notification], int]:
     query = db.query(Notification)
 
@@ -158,20 +194,20 @@ def get_notifications(
             )
         )
 
-    if sort:
-        query = query.order_by(*(opt.value for opt in sort))
-
-    count = query.count()
-
-    if offset:
-        query = query.offset(offset)
-    if limit:
-        query = query.limit(limit)
+    notifications, count = paginate(
+        query,
+        Notification,
+        sort=sort,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode if return_with_count else CountMode.none,
+    )
 
     if return_with_count:
-        return query.all(), count
+        return notifications, count
     else:
-        return query.all()
+        return notifications
 
 
 def _validate_notification(
@@ -234,3 +270,15 @@ def get_notification_by_level(db: Session, account_id: int, level: int) -> Notif
         .filter(Notification.account_id == account_id, Notification.level == level)
         .first()
     )
+
+
+def count_pending_notifications(db: Session) -> int:
+    """Approved notifications the send job has not processed yet."""
+    return (
+        db.query(func.count(Notification.id))
+        .filter(
+            Notification.status == NotificationStatus.pending,
+            Notification.approve == True,
+        )
+        .scalar()
+    )
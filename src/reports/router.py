@@ -0,0 +1,30 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+import src.reports.service as service
+from src.admins.schemas import Admin
+from src.database import get_db
+from src.reports.schemas import AccountsUsageReport, OrdersReport, TransactionsReport
+
+router = APIRouter()
+
+
+@router.get("/reports/transactions", tags=["Report"], response_model=TransactionsReport)
+def get_transactions_report(
+    db: Session = Depends(get_db), admin: Admin = Depends(Admin.get_current)
+):
+    return service.get_transactions_report(db=db)
+
+
+@router.get("/reports/orders", tags=["Report"], response_model=OrdersReport)
+def get_orders_report(
+    db: Session = Depends(get_db), admin: Admin = Depends(Admin.get_current)
+):
+    return service.get_orders_report(db=db)
+
+
+@router.get("/reports/accounts", tags=["Report"], response_model=AccountsUsageReport)
+def get_accounts_report(
+    db: Session = Depends(get_db), admin: Admin = Depends(Admin.get_current)
+):
+    return service.get_accounts_report(db=db)
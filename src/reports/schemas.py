@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+
+
+class WindowsReport(BaseModel):
+    last_24h: int = 0
+    last_week: int = 0
+    last_month: int = 0
+    total: int = 0
+
+
+class TransactionsReport(BaseModel):
+    payment: WindowsReport = WindowsReport()
+    order: WindowsReport = WindowsReport()
+    bonus: WindowsReport = WindowsReport()
+
+
+class OrdersReport(BaseModel):
+    paid: WindowsReport = WindowsReport()
+    completed: WindowsReport = WindowsReport()
+
+
+class AccountsUsageReport(BaseModel):
+    active_accounts: int = 0
+    disabled_accounts: int = 0
+    active_test_accounts: int = 0
+    used_traffic: WindowsReport = WindowsReport()
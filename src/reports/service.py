@@ -0,0 +1,132 @@
+import datetime
+from typing import Callable
+
+from sqlalchemy import and_, case, func, literal, not_
+from sqlalchemy.orm import Session
+
+from src import config
+from src.accounts.models import Account
+from src.accounts.service import sum_used_traffic
+from src.commerce.models import Order, Transaction
+from src.commerce.schemas import OrderStatus
+from src.reports.schemas import (
+    AccountsUsageReport,
+    OrdersReport,
+    TransactionsReport,
+    WindowsReport,
+)
+from src.utils.cache import LRUCache
+
+WINDOWS = {"last_24h": 1, "last_week": 7, "last_month": 30}
+
+_reports = LRUCache(maxsize=16, ttl=config.REPORT_CACHE_TTL)
+
+
+def _cached(key: str, build: Callable):
+    report = _reports.get(key)
+
+    if report is None:
+        report = build()
+        _reports.set(key, report)
+
+    return report
+
+
+def _windows_columns(value, created_at, now: datetime.datetime):
+    """Conditional sums of value for every report window plus the total."""
+    return [
+        func.coalesce(
+            func.sum(
+                case(
+                    (created_at >= now - datetime.timedelta(days=days), value),
+                    else_=0,
+                )
+            ),
+            0,
+        ).label(name)
+        for name, days in WINDOWS.items()
+    ] + [func.coalesce(func.sum(value), 0).label("total")]
+
+
+def _windows_report(row) -> WindowsReport:
+    return WindowsReport(
+        **{name: int(getattr(row, name)) for name in [*WINDOWS, "total"]}
+    )
+
+
+def get_transactions_report(db: Session) -> TransactionsReport:
+    def build():
+        now = datetime.datetime.utcnow()
+
+        rows = (
+            db.query(
+                Transaction.type,
+                *_windows_columns(Transaction.amount, Transaction.created_at, now),
+            )
+            .group_by(Transaction.type)
+            .all()
+        )
+
+        return TransactionsReport(
+            **{row.type.name: _windows_report(row) for row in rows}
+        )
+
+    return _cached("transactions", build)
+
+
+def get_orders_report(db: Session) -> OrdersReport:
+    def build():
+        now = datetime.datetime.utcnow()
+
+        rows = (
+            db.query(
+                Order.status,
+                *_windows_columns(literal(1), Order.created_at, now),
+            )
+            .filter(Order.status.in_([OrderStatus.paid, OrderStatus.completed]))
+            .group_by(Order.status)
+            .all()
+        )
+
+        return OrdersReport(**{row.status.name: _windows_report(row) for row in rows})
+
+    return _cached("orders", build)
+
+
+def get_accounts_report(db: Session) -> AccountsUsageReport:
+    def build():
+        now = datetime.datetime.utcnow()
+
+        is_test = Account.email.like(f"{config.TEST_ACCOUNT_EMAIL_PREFIX}%")
+
+        accounts = db.query(
+            func.coalesce(
+                func.sum(case((and_(Account.enable, not_(is_test)), 1), else_=0)), 0
+            ).label("active"),
+            func.coalesce(
+                func.sum(case((and_(not_(Account.enable), not_(is_test)), 1), else_=0)),
+                0,
+            ).label("disabled"),
+            func.coalesce(
+                func.sum(case((and_(Account.enable, is_test), 1), else_=0)), 0
+            ).label("active_test"),
+        ).one()
+
+        # From the traffic rollups, so the total reaches past raw retention
+        used_traffic = {
+            name: sum(
+                sum_used_traffic(
+                    db=db, start=now - datetime.timedelta(days=days) if days else None
+                )
+            )
+            for name, days in {**WINDOWS, "total": None}.items()
+        }
+
+        return AccountsUsageReport(
+            active_accounts=accounts.active,
+            disabled_accounts=accounts.disabled,
+            active_test_accounts=accounts.active_test,
+            used_traffic=WindowsReport(**used_traffic),
+        )
+
+    return _cached("accounts", build)
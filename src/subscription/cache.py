@@ -0,0 +1,8 @@
+from src import config
+from src.utils.cache import LRUCache
+
+# Subscription configs per host zone and search, cleared by every write to
+# inbound configs, inbounds and hosts of this process
+subscription_cache = LRUCache(
+    maxsize=config.SUBSCRIPTION_CACHE_SIZE, ttl=config.SUBSCRIPTION_CACHE_TTL
+)
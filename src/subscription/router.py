@@ -3,12 +3,13 @@ import socket
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from starlette.responses import PlainTextResponse
+from starlette.responses import PlainTextResponse, Response
 
 import src.accounts.service as account_service
+import src.subscription.service as subscription_service
+from src import config
 from src.database import get_db
-from src.inbound_configs.service import get_inbound_configs
-from src.utils import xray
+from src.utils import qr, xray
 
 router = APIRouter()
 
@@ -34,55 +35,54 @@ def sub(
     if not db_account:
         raise HTTPException(status_code=404, detail="Account not found")
 
-    inbound_configs, count = get_inbound_configs(
+    rows = []
+
+    inbound_configs = subscription_service.get_subscription_configs(
         db=db, host_zone_id=db_account.host_zone_id, q=q
     )
-
-    rows = []
+    if config.SUBSCRIPTION_ORDER_BY_HEALTH or config.SUBSCRIPTION_DROP_FAILING:
+        inbound_configs = subscription_service.rank_subscription_configs(
+            db=db,
+            configs=inbound_configs,
+            order=config.SUBSCRIPTION_ORDER_BY_HEALTH,
+            drop_failing=config.SUBSCRIPTION_DROP_FAILING,
+        )
 
     for inbound_config in inbound_configs:
-        if (
-            inbound_config.enable
-            and inbound_config.inbound.enable
-            and inbound_config.inbound.host.enable
-            and (inbound_config.develop is not True or develop is True)
-        ):
-
-            if address:
-                inbound_address = address
-            else:
-                inbound_address = inbound_config.address
-
-            if resolve:
-                inbound_address = _get_ip(inbound_address)
-                remark = inbound_config.remark + " " + inbound_config.address
-            else:
-                remark = inbound_config.remark
-
-            link = xray.generate_vless_config(
-                address=inbound_address,
-                network_type=inbound_config.network.value,
-                port=inbound_config.port,
-                uuid=uuid,
-                host=inbound_config.host,
-                sni=inbound_config.sni,
-                fp=inbound_config.finger_print.value,
-                path=inbound_config.path,
-                security=inbound_config.security.value,
-                sid=inbound_config.sid,
-                pbk=inbound_config.pbk,
-                spx=inbound_config.spx,
-                flow=(
-                    inbound_config.inbound.flow.value
-                    if inbound_config.inbound.flow
-                    else None
-                ),
-                remark=remark,
-                alpns=inbound_config.alpns,
-                mode=inbound_config.config_mode,
-                extra=inbound_config.extra,
-            )
-            rows.append(link)
+        if inbound_config.develop and develop is not True:
+            continue
+
+        if address:
+            inbound_address = address
+        else:
+            inbound_address = inbound_config.address
+
+        if resolve:
+            inbound_address = _get_ip(inbound_address)
+            remark = inbound_config.remark + " " + inbound_config.address
+        else:
+            remark = inbound_config.remark
+
+        link = xray.generate_vless_config(
+            address=inbound_address,
+            network_type=inbound_config.network,
+            port=inbound_config.port,
+            uuid=uuid,
+            host=inbound_config.host,
+            sni=inbound_config.sni,
+            fp=inbound_config.finger_print,
+            path=inbound_config.path,
+            security=inbound_config.security,
+            sid=inbound_config.sid,
+            pbk=inbound_config.pbk,
+            spx=inbound_config.spx,
+            flow=inbound_config.flow,
+            remark=remark,
+            alpns=inbound_config.alpns,
+            mode=inbound_config.config_mode,
+            extra=inbound_config.extra,
+        )
+        rows.append(link)
 
     text = "\n".join(rows) + "\n"
     if not plain:
@@ -93,6 +93,29 @@ def sub(
     return html
 
 
+@router.get("/sub/{uuid}/qrcode", tags=["Subscription"])
+def sub_qrcode(
+    uuid: str,
+    format: str = "png",
+    db: Session = Depends(get_db),
+):
+    if format not in qr.MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be png or svg")
+
+    db_account = account_service.get_account_by_uuid(db=db, uuid=uuid)
+
+    if not db_account:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    subscription_url = "{}/{}".format(config.SUBSCRIPTION_BASE_URL, db_account.uuid)
+
+    return Response(
+        content=qr.render_qrcode(subscription_url, image_format=format),
+        media_type=qr.MEDIA_TYPES[format],
+        headers={"Cache-Control": "private, max-age=3600"},
+    )
+
+
 def _get_ip(d):
     """
     This method returns the first IP address string
@@ -0,0 +1,142 @@
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from src import config
+from src.inbound_configs.service import get_inbound_configs
+from src.monitoring.models import InboundConfigHealth
+from src.subscription.cache import subscription_cache
+from src.utils.cache import LRUCache
+
+# Scores change once per scoring run, so they are reloaded as often
+health_cache = LRUCache(maxsize=1, ttl=config.MONITORING_HEALTH_INTERVAL)
+
+
+class SubscriptionConfig(BaseModel):
+    """What a subscription link needs of an enabled inbound config."""
+
+    id: int
+    remark: Optional[str] = None
+    address: Optional[str] = None
+    port: Optional[int] = None
+    network: str
+    host: Optional[str] = None
+    sni: Optional[str] = None
+    finger_print: Optional[str] = None
+    path: Optional[str] = None
+    security: Optional[str] = None
+    sid: Optional[str] = None
+    pbk: Optional[str] = None
+    spx: Optional[str] = None
+    flow: Optional[str] = None
+    alpns: Optional[list] = None
+    config_mode: Optional[str] = None
+    extra: Optional[str] = None
+    develop: bool = False
+
+
+def get_subscription_configs(
+    db: Session, host_zone_id: int, q: Optional[str] = None
+) -> List[SubscriptionConfig]:
+    """
+    Enabled inbound configs of a host zone on enabled inbounds and hosts. They
+    are shared by every account of the zone for SUBSCRIPTION_CACHE_TTL seconds,
+    or until an inbound config, inbound or host is written.
+    """
+    key = (host_zone_id, q)
+    configs = subscription_cache.get(key)
+    if configs is not None:
+        return configs
+
+    inbound_configs, count = get_inbound_configs(db=db, host_zone_id=host_zone_id, q=q)
+
+    configs = [
+        SubscriptionConfig(
+            id=inbound_config.id,
+            remark=inbound_config.remark,
+            address=inbound_config.address,
+            port=inbound_config.port,
+            network=inbound_config.network.value,
+            host=inbound_config.host,
+            sni=inbound_config.sni,
+            finger_print=inbound_config.finger_print.value,
+            path=inbound_config.path,
+            security=inbound_config.security.value,
+            sid=inbound_config.sid,
+            pbk=inbound_config.pbk,
+            spx=inbound_config.spx,
+            flow=(
+                inbound_config.inbound.flow.value
+                if inbound_config.inbound.flow
+                else None
+            ),
+            alpns=inbound_config.alpns,
+            config_mode=inbound_config.config_mode,
+            extra=inbound_config.extra,
+            develop=inbound_config.develop is True,
+        )
+        for inbound_config in inbound_configs
+        if inbound_config.enable
+        and inbound_config.inbound.enable
+        and inbound_config.inbound.host.enable
+    ]
+
+    if config.SUBSCRIPTION_CACHE_TTL > 0:
+        subscription_cache.set(key, configs)
+
+    return configs
+
+
+def get_health_scores(db: Session) -> Dict[int, Tuple[float, bool]]:
+    """Score and failing flag per scored inbound config id."""
+    scores = health_cache.get("scores")
+    if scores is not None:
+        return scores
+
+    scores = {
+        inbound_config_id: (score, failing)
+        for inbound_config_id, score, failing in db.query(
+            InboundConfigHealth.inbound_config_id,
+            InboundConfigHealth.score,
+            InboundConfigHealth.failing,
+        )
+    }
+    health_cache.set("scores", scores)
+
+    return scores
+
+
+def rank_subscription_configs(
+    db: Session,
+    configs: List[SubscriptionConfig],
+    order: bool = True,
+    drop_failing: bool = False,
+) -> List[SubscriptionConfig]:
+    """
+    Healthiest configs first and failing ones last. Unscored configs rank as
+    the median passing config, so new configs are neither buried nor promoted.
+    Failing configs are dropped unless every config is failing.
+    """
+    scores = get_health_scores(db=db)
+
+    if drop_failing:
+        healthy = [item for item in configs if not scores.get(item.id, (0, False))[1]]
+        configs = healthy or configs
+
+    if order:
+        passing = sorted(
+            scores[item.id][0]
+            for item in configs
+            if item.id in scores and not scores[item.id][1]
+        )
+        neutral = (passing[len(passing) // 2], False) if passing else (0, False)
+
+        def _rank(item: SubscriptionConfig):
+            score, failing = scores.get(item.id, neutral)
+            return failing, -score
+
+        # sorted is stable, configs ranked the same keep the remark order
+        configs = sorted(configs, key=_rank)
+
+    return configs
@@ -0,0 +1,167 @@
+import functools
+import logging
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+from apscheduler.util import get_callable_name
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from src.accounts.models import Account
+from src.accounts.service import get_exhausted_conditions
+from src.commerce.models import Order
+from src.commerce.schemas import OrderStatus
+from src.config import ADAPTIVE_MAX_INTERVAL, ADAPTIVE_ORDER_BURST, ADAPTIVE_SCHEDULING
+from src.database import GetDB
+from src.hosts.models import Host
+from src.inbounds.models import Inbound
+from src.system.scheduler import SkipJobRun
+
+logger = logging.getLogger("uvicorn.default")
+
+
+class SyncWatermark(NamedTuple):
+    # Changes when accounts, inbounds or hosts are added, removed or modified
+    state: tuple
+    # Enabled accounts that are expired or over their data limit
+    exhausted: int
+    # Orders paid in the last ADAPTIVE_MAX_INTERVAL seconds
+    paid_orders: int
+
+
+def get_sync_watermark(db: Session) -> SyncWatermark:
+    """Everything the account sync and review jobs depend on, in one query."""
+    now = datetime.utcnow()
+    expired, exceeded = get_exhausted_conditions(now)
+
+    def scalar(*columns, where=None):
+        statement = select(*columns)
+        if where is not None:
+            statement = statement.where(where)
+
+        return statement.scalar_subquery()
+
+    row = db.execute(
+        select(
+            scalar(func.max(Account.modified_at)),
+            scalar(func.max(Account.created_at)),
+            scalar(func.count(Account.id)),
+            scalar(func.sum(case((Account.enable == True, 1), else_=0))),
+            scalar(func.max(Inbound.modified_at)),
+            scalar(func.count(Inbound.id)),
+            scalar(func.max(Host.modified_at)),
+            scalar(func.count(Host.id)),
+            scalar(
+                func.count(Account.id),
+                where=(Account.enable == True) & (expired | exceeded),
+            ),
+            scalar(
+                func.count(Order.id),
+                where=Order.status.in_([OrderStatus.paid, OrderStatus.completed])
+                & (Order.modified_at >= now - timedelta(seconds=ADAPTIVE_MAX_INTERVAL)),
+            ),
+        )
+    ).one()
+
+    return SyncWatermark(
+        state=tuple(row[:8]), exhausted=row[8] or 0, paid_orders=row[9] or 0
+    )
+
+
+class AdaptiveSchedule:
+    """
+    Decides on every tick of a job whether it runs. A job runs when the
+    watermark changed, otherwise it runs once its interval elapsed and the
+    interval doubles up to ADAPTIVE_MAX_INTERVAL. Changes and bursts of paid
+    orders bring the interval back to the one the job is scheduled with.
+    """
+
+    def __init__(self, name: str, interval: int, run_on_exhausted: bool = False):
+        self.name = name
+        self.base_interval = interval
+        self.interval = interval
+        self.run_on_exhausted = run_on_exhausted
+        self.state: Optional[tuple] = None
+        self.last_run_at: Optional[datetime] = None
+
+    def _reason(self, watermark: SyncWatermark) -> Optional[str]:
+        if self.last_run_at is None:
+            return "first run"
+
+        if watermark.state != self.state:
+            return "accounts, inbounds or hosts changed"
+
+        if self.run_on_exhausted and watermark.exhausted:
+            return f"{watermark.exhausted} accounts to disable"
+
+        if watermark.paid_orders >= ADAPTIVE_ORDER_BURST:
+            return f"{watermark.paid_orders} orders paid recently"
+
+        return None
+
+    def decide(self, watermark: SyncWatermark, now: datetime):
+        """Raise SkipJobRun when the job should not run at now."""
+        reason = self._reason(watermark)
+
+        if reason is not None:
+            if self.interval != self.base_interval:
+                logger.info(
+                    f"Adaptive scheduling: {self.name} back to every "
+                    f"{self.base_interval}s, {reason}"
+                )
+            self.interval = self.base_interval
+            logger.info(f"Adaptive scheduling: run {self.name}, {reason}")
+            return
+
+        elapsed = (now - self.last_run_at).total_seconds()
+        if elapsed < self.interval:
+            message = (
+                f"No changes since {self.last_run_at:%H:%M:%S}, "
+                f"next run within {int(self.interval - elapsed)}s"
+            )
+            logger.info(f"Adaptive scheduling: skip {self.name}, {message}")
+            raise SkipJobRun(message)
+
+        previous, self.interval = self.interval, min(
+            self.interval * 2, max(ADAPTIVE_MAX_INTERVAL, self.base_interval)
+        )
+        logger.info(
+            f"Adaptive scheduling: run {self.name} after {int(elapsed)}s without "
+            f"changes, interval stretched from {previous}s to {self.interval}s"
+        )
+
+    def ran(self, watermark: SyncWatermark, now: datetime):
+        self.state = watermark.state
+        self.last_run_at = now
+
+
+def adaptive(interval: int, run_on_exhausted: bool = False):
+    """
+    Run a job scheduled every interval seconds only when needed, see
+    AdaptiveSchedule. Without ADAPTIVE_SCHEDULING the job is left as is.
+    """
+
+    def decorator(job):
+        if not ADAPTIVE_SCHEDULING:
+            return job
+
+        schedule = AdaptiveSchedule(
+            get_callable_name(job), interval, run_on_exhausted=run_on_exhausted
+        )
+
+        @functools.wraps(job)
+        def wrapper(*args, **kwargs):
+            now = datetime.utcnow()
+            with GetDB() as db:
+                watermark = get_sync_watermark(db=db)
+
+            schedule.decide(watermark, now)
+            result = job(*args, **kwargs)
+            # Changes made while the job ran are picked up by the next tick
+            schedule.ran(watermark, now)
+
+            return result
+
+        return wrapper
+
+    return decorator
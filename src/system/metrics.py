@@ -0,0 +1,83 @@
+import logging
+import secrets
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.config import METRICS_TOKEN
+from src.database import GetDB, engine
+from src.notification.service import count_pending_notifications
+from src.subscription.cache import subscription_cache
+from src.utils.metrics import (
+    CACHE_REQUESTS,
+    DB_POOL_CONNECTIONS,
+    NOTIFICATION_QUEUE_DEPTH,
+    REGISTRY,
+)
+
+logger = logging.getLogger("uvicorn.default")
+
+
+def _collect():
+    # Values read on scrape instead of being updated on every change
+    pool = engine.pool
+    for state, read in (
+        ("size", "size"),
+        ("checked_out", "checkedout"),
+        ("checked_in", "checkedin"),
+        ("overflow", "overflow"),
+    ):
+        if hasattr(pool, read):
+            DB_POOL_CONNECTIONS.set(getattr(pool, read)(), state=state)
+
+    CACHE_REQUESTS.set(subscription_cache.hits, cache="subscription", result="hit")
+    CACHE_REQUESTS.set(subscription_cache.misses, cache="subscription", result="miss")
+
+    try:
+        with GetDB() as db:
+            NOTIFICATION_QUEUE_DEPTH.set(count_pending_notifications(db=db))
+    except Exception as error:
+        logger.error(f"Failed to count pending notifications: {error}")
+
+
+def render_metrics() -> str:
+    """The metrics of this process in the Prometheus text format."""
+    _collect()
+
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        scheme, _, token = self.headers.get("Authorization", "").partition(" ")
+        if METRICS_TOKEN and not (
+            scheme.lower() == "bearer"
+            and secrets.compare_digest(token.encode(), METRICS_TOKEN.encode())
+        ):
+            self.send_error(401)
+            return
+
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics {self.address_string()} {format % args}")
+
+
+def start_metrics_server(host: str, port: int) -> ThreadingHTTPServer:
+    """
+    Serve /metrics of this process on its own port, for the job runner which
+    has no API. Scrapes need METRICS_TOKEN as a bearer token when it is set.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logger.info(f"Metrics are served on http://{host}:{port}/metrics")
+
+    return server
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Enum,
+    Float,
+    Integer,
+    String,
+    Text,
+)
+
+from src.database import Base
+from src.system.schemas import JobRunStatus, JobRunTrigger
+
+
+class JobLease(Base):
+    __tablename__ = "job_lease"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(128), unique=True, nullable=False)
+    owner = Column(String(128), nullable=False)
+
+    acquired_at = Column(DateTime, default=datetime.utcnow)
+    renewed_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False)
+    takeovers = Column(Integer, default=0)
+
+
+class Job(Base):
+    __tablename__ = "job"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(128), unique=True, nullable=False)
+    # Seconds between runs, None for cron jobs
+    interval = Column(Integer, nullable=True)
+    paused = Column(Boolean, default=False)
+    run_requested_at = Column(DateTime, nullable=True)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    modified_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class JobRun(Base):
+    __tablename__ = "job_run"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name = Column(String(128), nullable=False, index=True)
+    node = Column(String(128), nullable=False)
+
+    status = Column(
+        Enum(JobRunStatus),
+        nullable=False,
+        default=JobRunStatus.running.value,
+    )
+    trigger = Column(
+        Enum(JobRunTrigger),
+        nullable=False,
+        default=JobRunTrigger.schedule.value,
+    )
+
+    started_at = Column(DateTime, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+    duration = Column(Float, nullable=True)
+    items = Column(Integer, default=0)
+    errors = Column(Integer, default=0)
+    overran = Column(Boolean, default=False)
+    message = Column(String(512), nullable=True)
+
+
+class BotState(Base):
+    __tablename__ = "bot_state"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # Namespace and key of the state, like rename:<message id>:<chat id>
+    key = Column(String(255), unique=True, nullable=False)
+    value = Column(Text, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -1,5 +1,26 @@
-from fastapi import APIRouter
+import secrets
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.orm import Session
+from starlette.responses import PlainTextResponse
+
+from src.admins.schemas import Admin
+from src.config import ENABLE_METRICS, METRICS_TOKEN, NODE_ID
+from src.database import get_db
+from src.system import service
+from src.system.metrics import render_metrics
+from src.system.schemas import (
+    JobLeaseResponse,
+    JobLeasesResponse,
+    JobResponse,
+    JobRunResponse,
+    JobRunStatus,
+    JobTrendResponse,
+)
 from src.system.version_manager import version_manager
+from src.utils.instrumentation import query_metrics
 
 router = APIRouter()
 
@@ -8,3 +29,148 @@ router = APIRouter()
 async def get_version():
     """Get application version information."""
     return version_manager.get_version_info()
+
+
+def _authorize_metrics(request: Request):
+    # Prometheus scrapes with METRICS_TOKEN, admins with their own token
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    if (
+        METRICS_TOKEN
+        and scheme.lower() == "bearer"
+        and secrets.compare_digest(token, METRICS_TOKEN)
+    ):
+        return
+
+    Admin.get_current(token=token)
+
+
+@router.get("/metrics", tags=["system"], response_class=PlainTextResponse)
+def get_metrics(authorized: None = Depends(_authorize_metrics)):
+    """Metrics of this process in the Prometheus text format."""
+    if not ENABLE_METRICS:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/system/queries", tags=["system"])
+def get_query_metrics(admin: Admin = Depends(Admin.get_current)):
+    """Queries and database time per route, job and bot handler, heaviest first."""
+    return query_metrics.snapshot()
+
+
+@router.get("/system/leases", tags=["system"], response_model=JobLeasesResponse)
+def get_job_leases(
+    db: Session = Depends(get_db), admin: Admin = Depends(Admin.get_current)
+):
+    """Job leases and the node holding each, node is the node answering."""
+    now = datetime.utcnow()
+
+    return JobLeasesResponse(
+        node=NODE_ID,
+        leases=[
+            JobLeaseResponse(
+                name=lease.name,
+                owner=lease.owner,
+                acquired_at=lease.acquired_at,
+                renewed_at=lease.renewed_at,
+                expires_at=lease.expires_at,
+                takeovers=lease.takeovers,
+                expired=lease.expires_at <= now,
+            )
+            for lease in service.get_leases(db=db)
+        ],
+    )
+
+
+def _get_job_or_404(db: Session, name: str):
+    db_job = service.get_job(db=db, name=name)
+    if db_job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return db_job
+
+
+def _job_response(db_job, last_run=None, trend=None) -> JobResponse:
+    return JobResponse(
+        name=db_job.name,
+        interval=db_job.interval,
+        paused=db_job.paused,
+        run_requested_at=db_job.run_requested_at,
+        last_run=JobRunResponse.from_orm(last_run) if last_run else None,
+        trend=trend or JobTrendResponse(),
+    )
+
+
+@router.get("/system/jobs", tags=["system"], response_model=List[JobResponse])
+def get_jobs(
+    hours: int = Query(24, ge=1, le=24 * 90),
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    """Scheduled jobs with their last run and a summary of the last hours."""
+    last_runs = service.get_last_job_runs(db=db)
+    trends = service.get_job_trends(
+        db=db, since=datetime.utcnow() - timedelta(hours=hours)
+    )
+
+    return [
+        _job_response(
+            db_job, last_run=last_runs.get(db_job.name), trend=trends.get(db_job.name)
+        )
+        for db_job in service.get_jobs(db=db)
+    ]
+
+
+@router.get(
+    "/system/jobs/{name}/runs",
+    tags=["system"],
+    response_model=List[JobRunResponse],
+)
+def get_job_runs(
+    name: str,
+    status: Optional[JobRunStatus] = None,
+    offset: int = 0,
+    limit: int = Query(50, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    _get_job_or_404(db=db, name=name)
+
+    return service.get_job_runs(
+        db=db, name=name, status=status, offset=offset, limit=limit
+    )
+
+
+@router.post("/system/jobs/{name}/run", tags=["system"], response_model=JobResponse)
+def run_job(
+    name: str,
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    """Ask the node holding the job to run it within a few seconds, even if paused."""
+    db_job = _get_job_or_404(db=db, name=name)
+
+    return _job_response(service.request_job_run(db=db, db_job=db_job))
+
+
+@router.post("/system/jobs/{name}/pause", tags=["system"], response_model=JobResponse)
+def pause_job(
+    name: str,
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    db_job = _get_job_or_404(db=db, name=name)
+
+    return _job_response(service.update_job_paused(db=db, db_job=db_job, paused=True))
+
+
+@router.post("/system/jobs/{name}/resume", tags=["system"], response_model=JobResponse)
+def resume_job(
+    name: str,
+    db: Session = Depends(get_db),
+    admin: Admin = Depends(Admin.get_current),
+):
+    db_job = _get_job_or_404(db=db, name=name)
+
+    return _job_response(service.update_job_paused(db=db, db_job=db_job, paused=False))
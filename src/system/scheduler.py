@@ -0,0 +1,278 @@
+import functools
+import logging
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from apscheduler.events import EVENT_JOB_MAX_INSTANCES
+from apscheduler.triggers.interval import IntervalTrigger
+from apscheduler.util import get_callable_name
+
+from src.config import (
+    ENABLE_JOB_LEASES,
+    JOB_CONTROL_INTERVAL,
+    JOB_LEASE_TTL,
+    NODE_ID,
+)
+from src.database import GetDB
+from src.system import service
+from src.system.schemas import JobRunStatus, JobRunTrigger
+from src.utils.instrumentation import InstrumentedScheduler
+from src.utils.metrics import JOB_ITEMS_PROCESSED, JOB_RUN_DURATION
+
+logger = logging.getLogger("uvicorn.default")
+
+
+class SkipJobRun(Exception):
+    """Raised by a job that has nothing to do, its run is recorded as skipped."""
+
+
+class JobRunStats:
+    def __init__(self):
+        self.items = 0
+        self.errors = 0
+
+
+_current_run: ContextVar[Optional[JobRunStats]] = ContextVar(
+    "job_run_stats", default=None
+)
+
+
+def count_job_items(count: int = 1):
+    """Add count to the items processed by the running job, if any."""
+    stats = _current_run.get()
+    if stats is not None:
+        stats.items += count
+
+
+class _JobErrorCounter(logging.Handler):
+    # Jobs log their errors and carry on, so errors are counted from the log.
+    # It is attached to the root logger and to ours, which uvicorn's logging
+    # config keeps from propagating, so records reaching both count once.
+    def __init__(self):
+        super().__init__(level=logging.ERROR)
+
+    def emit(self, record: logging.LogRecord):
+        stats = _current_run.get()
+        if stats is not None and not getattr(record, "job_error_counted", False):
+            record.job_error_counted = True
+            stats.errors += 1
+
+
+class JobScheduler(InstrumentedScheduler):
+    """
+    Scheduler whose jobs only run on the node holding their lease, so nodes
+    sharing a database don't run the same job twice. The holder renews the
+    lease on every run and while a run takes long, when it stops another node
+    takes the lease over on its first run after the lease expired.
+
+    Every run is recorded in job_run, jobs are paused and run on demand
+    through the job table, which every node polls for run requests. A paused
+    job still runs when requested.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._intervals: Dict[str, Optional[int]] = {}
+        self._job_ids: Dict[str, str] = {}
+        self._manual_runs = set()
+        self._stopped = threading.Event()
+
+        error_counter = _JobErrorCounter()
+        logging.getLogger().addHandler(error_counter)
+        logger.addHandler(error_counter)
+        self.add_listener(self._on_max_instances, EVENT_JOB_MAX_INSTANCES)
+
+    def add_job(self, func, *args, **kwargs):
+        if not callable(func):
+            return super().add_job(func, *args, **kwargs)
+
+        name = kwargs.setdefault("name", get_callable_name(func))
+        job = super().add_job(self._wrap(name, func), *args, **kwargs)
+
+        self._job_ids[name] = job.id
+        self._intervals[name] = (
+            int(job.trigger.interval.total_seconds())
+            if isinstance(job.trigger, IntervalTrigger)
+            else None
+        )
+
+        return job
+
+    def start(self, *args, **kwargs):
+        super().start(*args, **kwargs)
+
+        try:
+            with GetDB() as db:
+                service.register_jobs(db=db, jobs=self._intervals)
+        except Exception as error:
+            logger.error(f"Failed to register jobs: {error}")
+
+        self._stopped.clear()
+        threading.Thread(target=self._poll_run_requests, daemon=True).start()
+
+    def shutdown(self, *args, **kwargs):
+        self._stopped.set()
+        super().shutdown(*args, **kwargs)
+
+        if ENABLE_JOB_LEASES:
+            try:
+                with GetDB() as db:
+                    service.release_leases(db=db, owner=NODE_ID)
+            except Exception as error:
+                logger.error(f"Failed to release job leases: {error}")
+
+    def _lease_ttl(self, name: str) -> timedelta:
+        # Interval jobs outlive the holder's next run, a late run keeps it
+        interval = self._intervals.get(name)
+        if interval:
+            return timedelta(seconds=interval * 2)
+
+        return timedelta(seconds=JOB_LEASE_TTL)
+
+    def _acquire_lease(self, name: str) -> bool:
+        if not ENABLE_JOB_LEASES:
+            return True
+
+        with GetDB() as db:
+            return service.acquire_lease(
+                db=db, name=name, owner=NODE_ID, ttl=self._lease_ttl(name)
+            )
+
+    def _wrap(self, name: str, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            trigger = JobRunTrigger.schedule
+            if name in self._manual_runs:
+                self._manual_runs.discard(name)
+                trigger = JobRunTrigger.manual
+
+            try:
+                # Paused jobs only skip their scheduled runs, not requested ones
+                if trigger == JobRunTrigger.schedule:
+                    with GetDB() as db:
+                        if service.is_job_paused(db=db, name=name):
+                            logger.debug(f"Job {name} skipped, it is paused")
+                            return
+
+                if not self._acquire_lease(name):
+                    logger.debug(f"Job {name} skipped, another node holds its lease")
+                    return
+            except Exception as error:
+                logger.error(f"Failed to take the lease of job {name}: {error}")
+                return
+
+            done = threading.Event()
+            renewer = None
+            if ENABLE_JOB_LEASES:
+                renewer = threading.Thread(
+                    target=self._renew, args=(name, done), daemon=True
+                )
+                renewer.start()
+
+            try:
+                return self._record(name, trigger, func, *args, **kwargs)
+            finally:
+                done.set()
+                if renewer is not None:
+                    renewer.join()
+
+        return wrapper
+
+    def _record(self, name: str, trigger: JobRunTrigger, func, *args, **kwargs):
+        with GetDB() as db:
+            db_run = service.start_job_run(
+                db=db, name=name, node=NODE_ID, trigger=trigger
+            )
+
+        stats = JobRunStats()
+        token = _current_run.set(stats)
+        status, message = JobRunStatus.success, None
+        started = time.perf_counter()
+
+        try:
+            return func(*args, **kwargs)
+        except SkipJobRun as skip:
+            status, message = JobRunStatus.skipped, str(skip) or None
+        except Exception as error:
+            status, message = JobRunStatus.failed, repr(error)
+            raise
+        finally:
+            _current_run.reset(token)
+
+            JOB_RUN_DURATION.observe(
+                time.perf_counter() - started, job=name, status=status.value
+            )
+            JOB_ITEMS_PROCESSED.inc(stats.items, job=name)
+
+            try:
+                with GetDB() as db:
+                    service.finish_job_run(
+                        db=db,
+                        db_run=db_run,
+                        status=status,
+                        items=stats.items,
+                        errors=stats.errors,
+                        interval=self._intervals.get(name),
+                        message=message,
+                    )
+            except Exception as error:
+                logger.error(f"Failed to record the run of job {name}: {error}")
+
+    def _renew(self, name: str, done: threading.Event):
+        # Keep the lease of a run outlasting it
+        ttl = self._lease_ttl(name)
+
+        while not done.wait(ttl.total_seconds() / 3):
+            try:
+                with GetDB() as db:
+                    if not service.renew_lease(
+                        db=db, name=name, owner=NODE_ID, ttl=ttl
+                    ):
+                        logger.warning(f"Job {name} lost its lease while running")
+                        return
+            except Exception as error:
+                logger.error(f"Failed to renew the lease of job {name}: {error}")
+
+    def _poll_run_requests(self):
+        while not self._stopped.wait(JOB_CONTROL_INTERVAL):
+            try:
+                with GetDB() as db:
+                    requested = service.get_requested_jobs(
+                        db=db, names=list(self._job_ids)
+                    )
+
+                for name in requested:
+                    # Leave the request to the node holding the job's lease
+                    if not self._acquire_lease(name):
+                        continue
+
+                    with GetDB() as db:
+                        if not service.claim_job_run(db=db, name=name):
+                            continue
+
+                    logger.info(f"Job {name} requested to run now")
+                    self._manual_runs.add(name)
+                    self.modify_job(
+                        self._job_ids[name], next_run_time=datetime.now(timezone.utc)
+                    )
+            except Exception as error:
+                logger.error(f"Failed to poll job run requests: {error}")
+
+    def _on_max_instances(self, event):
+        job = self.get_job(event.job_id)
+        if job is None:
+            return
+
+        try:
+            with GetDB() as db:
+                service.create_skipped_job_run(
+                    db=db,
+                    name=job.name,
+                    node=NODE_ID,
+                    message="Skipped, the previous run is still running",
+                )
+        except Exception as error:
+            logger.error(f"Failed to record the skipped run of {job.name}: {error}")
@@ -0,0 +1,76 @@
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class JobRunStatus(str, Enum):
+    running = "running"
+    success = "success"
+    failed = "failed"
+    skipped = "skipped"
+
+
+class JobRunTrigger(str, Enum):
+    schedule = "schedule"
+    manual = "manual"
+
+
+class JobLeaseResponse(BaseModel):
+    name: str
+    owner: str
+    acquired_at: datetime
+    renewed_at: datetime
+    expires_at: datetime
+    takeovers: int
+    expired: bool = False
+
+    class Config:
+        orm_mode = True
+
+
+class JobLeasesResponse(BaseModel):
+    node: str
+    leases: List[JobLeaseResponse]
+
+
+class JobRunResponse(BaseModel):
+    id: int
+    name: str
+    node: str
+    status: JobRunStatus
+    trigger: JobRunTrigger
+    started_at: datetime
+    finished_at: Optional[datetime] = None
+    duration: Optional[float] = None
+    items: int = 0
+    errors: int = 0
+    overran: bool = False
+    message: Optional[str] = None
+
+    class Config:
+        orm_mode = True
+
+
+class JobTrendResponse(BaseModel):
+    runs: int = 0
+    failed: int = 0
+    skipped: int = 0
+    overran: int = 0
+    items: int = 0
+    errors: int = 0
+    avg_duration: Optional[float] = None
+    max_duration: Optional[float] = None
+
+
+class JobResponse(BaseModel):
+    name: str
+    interval: Optional[int] = None
+    paused: bool = False
+    run_requested_at: Optional[datetime] = None
+    last_run: Optional[JobRunResponse] = None
+    trend: JobTrendResponse
+
+    class Config:
+        orm_mode = True
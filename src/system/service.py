@@ -0,0 +1,361 @@
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.system.models import BotState, Job, JobLease, JobRun
+from src.system.schemas import JobRunStatus, JobRunTrigger, JobTrendResponse
+
+
+def acquire_lease(db: Session, name: str, owner: str, ttl: timedelta) -> bool:
+    """
+    Take or renew the lease of a job for ttl. Only one owner gets it, the
+    owner holding an unexpired lease renews it and everyone else is refused.
+    """
+    now = datetime.utcnow()
+
+    held = JobLease.owner == owner
+    taken = (
+        db.query(JobLease)
+        .filter(JobLease.name == name, or_(held, JobLease.expires_at <= now))
+        .update(
+            {
+                JobLease.owner: owner,
+                JobLease.acquired_at: case((held, JobLease.acquired_at), else_=now),
+                JobLease.renewed_at: now,
+                JobLease.expires_at: now + ttl,
+                JobLease.takeovers: case(
+                    (held, JobLease.takeovers), else_=JobLease.takeovers + 1
+                ),
+            },
+            synchronize_session=False,
+        )
+    )
+    if taken:
+        db.commit()
+        return True
+
+    if db.query(JobLease.id).filter(JobLease.name == name).first() is not None:
+        db.rollback()
+        return False
+
+    # First run of the job anywhere, the unique name settles concurrent inserts
+    db.add(
+        JobLease(
+            name=name,
+            owner=owner,
+            acquired_at=now,
+            renewed_at=now,
+            expires_at=now + ttl,
+            takeovers=0,
+        )
+    )
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        return False
+
+    return True
+
+
+def renew_lease(db: Session, name: str, owner: str, ttl: timedelta) -> bool:
+    now = datetime.utcnow()
+
+    renewed = (
+        db.query(JobLease)
+        .filter(JobLease.name == name, JobLease.owner == owner)
+        .update(
+            {JobLease.renewed_at: now, JobLease.expires_at: now + ttl},
+            synchronize_session=False,
+        )
+    )
+    db.commit()
+
+    return bool(renewed)
+
+
+def release_leases(db: Session, owner: str) -> int:
+    """Expire the leases of owner so other nodes take its jobs on their next run."""
+    released = (
+        db.query(JobLease)
+        .filter(JobLease.owner == owner, JobLease.expires_at > datetime.utcnow())
+        .update({JobLease.expires_at: datetime.utcnow()}, synchronize_session=False)
+    )
+    db.commit()
+
+    return released
+
+
+def get_leases(db: Session) -> List[JobLease]:
+    return db.query(JobLease).order_by(JobLease.name).all()
+
+
+def register_jobs(db: Session, jobs: Dict[str, Optional[int]]):
+    """Add the jobs of a node with their interval, or update their interval."""
+    db_jobs = {
+        db_job.name: db_job
+        for db_job in db.query(Job).filter(Job.name.in_(list(jobs))).all()
+    }
+
+    for name, interval in jobs.items():
+        db_job = db_jobs.get(name)
+        if db_job is None:
+            db.add(Job(name=name, interval=interval, paused=False))
+        elif db_job.interval != interval:
+            db_job.interval = interval
+
+    try:
+        db.commit()
+    except IntegrityError:
+        # Another node registered them at the same time
+        db.rollback()
+
+
+def get_jobs(db: Session) -> List[Job]:
+    return db.query(Job).order_by(Job.name).all()
+
+
+def get_job(db: Session, name: str) -> Optional[Job]:
+    return db.query(Job).filter(Job.name == name).first()
+
+
+def is_job_paused(db: Session, name: str) -> bool:
+    return bool(db.query(Job.paused).filter(Job.name == name).scalar())
+
+
+def update_job_paused(db: Session, db_job: Job, paused: bool) -> Job:
+    db_job.paused = paused
+
+    db.commit()
+    db.refresh(db_job)
+
+    return db_job
+
+
+def request_job_run(db: Session, db_job: Job) -> Job:
+    db_job.run_requested_at = datetime.utcnow()
+
+    db.commit()
+    db.refresh(db_job)
+
+    return db_job
+
+
+def get_requested_jobs(db: Session, names: List[str]) -> List[str]:
+    return [
+        name
+        for (name,) in db.query(Job.name).filter(
+            Job.name.in_(names), Job.run_requested_at.isnot(None)
+        )
+    ]
+
+
+def claim_job_run(db: Session, name: str) -> bool:
+    """Clear the run request of a job, True for the one node that cleared it."""
+    claimed = (
+        db.query(Job)
+        .filter(Job.name == name, Job.run_requested_at.isnot(None))
+        .update({Job.run_requested_at: None}, synchronize_session=False)
+    )
+    db.commit()
+
+    return bool(claimed)
+
+
+def start_job_run(db: Session, name: str, node: str, trigger: JobRunTrigger) -> JobRun:
+    db_run = JobRun(
+        name=name,
+        node=node,
+        status=JobRunStatus.running,
+        trigger=trigger,
+        started_at=datetime.utcnow(),
+    )
+
+    db.add(db_run)
+    db.commit()
+
+    return db_run
+
+
+def finish_job_run(
+    db: Session,
+    db_run: JobRun,
+    status: JobRunStatus,
+    items: int = 0,
+    errors: int = 0,
+    interval: Optional[int] = None,
+    message: Optional[str] = None,
+) -> JobRun:
+    db_run = db.merge(db_run, load=False)
+    db_run.finished_at = datetime.utcnow()
+    db_run.duration = (db_run.finished_at - db_run.started_at).total_seconds()
+    db_run.status = status
+    db_run.items = items
+    db_run.errors = errors
+    db_run.overran = interval is not None and db_run.duration > interval
+    db_run.message = message[:512] if message else None
+
+    db.commit()
+
+    return db_run
+
+
+def create_skipped_job_run(db: Session, name: str, node: str, message: str) -> JobRun:
+    now = datetime.utcnow()
+    db_run = JobRun(
+        name=name,
+        node=node,
+        status=JobRunStatus.skipped,
+        trigger=JobRunTrigger.schedule,
+        started_at=now,
+        finished_at=now,
+        duration=0,
+        message=message[:512],
+    )
+
+    db.add(db_run)
+    db.commit()
+
+    return db_run
+
+
+def get_job_runs(
+    db: Session,
+    name: Optional[str] = None,
+    status: Optional[JobRunStatus] = None,
+    offset: int = 0,
+    limit: int = 50,
+) -> List[JobRun]:
+    query = db.query(JobRun)
+
+    if name is not None:
+        query = query.filter(JobRun.name == name)
+
+    if status is not None:
+        query = query.filter(JobRun.status == status)
+
+    return query.order_by(JobRun.id.desc()).offset(offset).limit(limit).all()
+
+
+def get_last_job_runs(db: Session) -> Dict[str, JobRun]:
+    last_ids = db.query(func.max(JobRun.id)).group_by(JobRun.name)
+
+    return {
+        db_run.name: db_run
+        for db_run in db.query(JobRun).filter(JobRun.id.in_(last_ids.scalar_subquery()))
+    }
+
+
+def get_job_trends(db: Session, since: datetime) -> Dict[str, JobTrendResponse]:
+    """Run counts and durations per job of the runs started after since."""
+
+    def count(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    finished = JobRun.status.in_([JobRunStatus.success, JobRunStatus.failed])
+
+    rows = (
+        db.query(
+            JobRun.name,
+            count(finished),
+            count(JobRun.status == JobRunStatus.failed),
+            count(JobRun.status == JobRunStatus.skipped),
+            count(JobRun.overran == True),
+            func.sum(JobRun.items),
+            func.sum(JobRun.errors),
+            func.avg(case((finished, JobRun.duration))),
+            func.max(case((finished, JobRun.duration))),
+        )
+        .filter(JobRun.started_at >= since)
+        .group_by(JobRun.name)
+    )
+
+    return {
+        name: JobTrendResponse(
+            runs=runs or 0,
+            failed=failed or 0,
+            skipped=skipped or 0,
+            overran=overran or 0,
+            items=items or 0,
+            errors=errors or 0,
+            avg_duration=round(avg_duration, 3) if avg_duration is not None else None,
+            max_duration=round(max_duration, 3) if max_duration is not None else None,
+        )
+        for (
+            name,
+            runs,
+            failed,
+            skipped,
+            overran,
+            items,
+            errors,
+            avg_duration,
+            max_duration,
+        ) in rows
+    }
+
+
+def remove_job_runs(db: Session, before: datetime) -> int:
+    removed = (
+        db.query(JobRun)
+        .filter(JobRun.started_at < before)
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+
+    return removed
+
+
+def get_bot_state(db: Session, key: str) -> Optional[str]:
+    return (
+        db.query(BotState.value)
+        .filter(BotState.key == key, BotState.expires_at > datetime.utcnow())
+        .scalar()
+    )
+
+
+def set_bot_state(db: Session, key: str, value: str, ttl: timedelta):
+    expires_at = datetime.utcnow() + ttl
+
+    values = {BotState.value: value, BotState.expires_at: expires_at}
+    if (
+        db.query(BotState)
+        .filter(BotState.key == key)
+        .update(values, synchronize_session=False)
+    ):
+        db.commit()
+        return
+
+    db.add(BotState(key=key, value=value, expires_at=expires_at))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Set by another worker in between, the last one wins
+        db.rollback()
+        db.query(BotState).filter(BotState.key == key).update(
+            values, synchronize_session=False
+        )
+        db.commit()
+
+
+def remove_bot_state(db: Session, key: str) -> bool:
+    removed = (
+        db.query(BotState).filter(BotState.key == key).delete(synchronize_session=False)
+    )
+    db.commit()
+
+    return bool(removed)
+
+
+def remove_expired_bot_states(db: Session) -> int:
+    removed = (
+        db.query(BotState)
+        .filter(BotState.expires_at <= datetime.utcnow())
+        .delete(synchronize_session=False)
+    )
+    db.commit()
+
+    return removed
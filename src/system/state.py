@@ -0,0 +1,99 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Any, Optional
+
+from src.config import BOT_STATE_CACHE_SIZE, BOT_STATE_STORE, BOT_STATE_TTL
+from src.database import GetDB
+from src.system import service
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger("uvicorn.default")
+
+
+class StateStore(ABC):
+    """
+    Conversation state of the bots, like which account a reply renames.
+    Values are JSON serializable and expire after ttl seconds.
+    """
+
+    def __init__(self, namespace: str, ttl: int = BOT_STATE_TTL):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    @abstractmethod
+    def get(self, key: str, default: Any = None) -> Any:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        pass
+
+    @abstractmethod
+    def pop(self, key: str, default: Any = None) -> Any:
+        pass
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+
+class MemoryStateStore(StateStore):
+    """State of this process only, the least recently used is evicted first."""
+
+    def __init__(self, namespace: str, ttl: int = BOT_STATE_TTL):
+        super().__init__(namespace, ttl=ttl)
+        self._cache = LRUCache(maxsize=BOT_STATE_CACHE_SIZE, ttl=ttl)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._cache.get(self._key(key), default)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        self._cache.set(self._key(key), value, ttl=ttl)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        # Expired entries are only dropped on get, so they are checked first
+        value = self.get(key)
+        self._cache.pop(self._key(key))
+        return default if value is None else value
+
+
+class DatabaseStateStore(StateStore):
+    """State shared by every worker and kept across restarts in bot_state."""
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with GetDB() as db:
+            value = service.get_bot_state(db=db, key=self._key(key))
+
+        return default if value is None else json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        with GetDB() as db:
+            service.set_bot_state(
+                db=db,
+                key=self._key(key),
+                value=json.dumps(value),
+                ttl=timedelta(seconds=self.ttl if ttl is None else ttl),
+            )
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        value = self.get(key)
+        if value is not None:
+            with GetDB() as db:
+                service.remove_bot_state(db=db, key=self._key(key))
+
+        return default if value is None else value
+
+
+def create_state_store(namespace: str, ttl: int = BOT_STATE_TTL) -> StateStore:
+    """A store of the kind set by BOT_STATE_STORE."""
+    if BOT_STATE_STORE == "database":
+        return DatabaseStateStore(namespace, ttl=ttl)
+
+    if BOT_STATE_STORE != "memory":
+        logger.warning(f"Unknown BOT_STATE_STORE {BOT_STATE_STORE}, using memory")
+
+    return MemoryStateStore(namespace, ttl=ttl)
@@ -1,25 +1,98 @@
 import glob
 import importlib.util
+import secrets
 from os.path import basename, dirname, join
 from threading import Thread
 
-from telebot import TeleBot, apihelper
+from fastapi import APIRouter, Depends, HTTPException, Request
+from telebot import apihelper, types
 
 from src import app, logger
+from src.admins.schemas import Admin
 from src.config import (
+    ENABLE_METRICS,
+    RUN_MODE,
     TELEGRAM_API_TOKEN,
     TELEGRAM_PROXY_URL,
     TELEGRAM_PAYMENT_API_TOKEN,
+    TELEGRAM_BOT_MODE,
+    TELEGRAM_BOT_WORKERS,
+    TELEGRAM_WEBHOOK_URL,
+    TELEGRAM_WEBHOOK_SECRET,
 )
+from src.utils.telebot import MeteredTeleBot, metered_request_sender
 
 bot = None
 payment_bot = None
 
+router = APIRouter()
+
 if TELEGRAM_API_TOKEN or TELEGRAM_PAYMENT_API_TOKEN:
     apihelper.proxy = {"http": TELEGRAM_PROXY_URL, "https": TELEGRAM_PROXY_URL}
 
+if ENABLE_METRICS:
+    apihelper.CUSTOM_REQUEST_SENDER = metered_request_sender
+
+
+def _get_bots():
+    return {"bot": bot, "payment_bot": payment_bot}
+
+
+def _start_bot_runtime(name: str, telegram_bot: MeteredTeleBot):
+    if RUN_MODE == "api":
+        # The job runner polls or sets the webhook, API workers only serve it
+        logger.info(f"Telegram {name} runtime is left to the job runner")
+    elif TELEGRAM_BOT_MODE == "webhook":
+        url = f"{TELEGRAM_WEBHOOK_URL.rstrip('/')}/api/telegram/webhook/{name}"
+        telegram_bot.remove_webhook()
+        telegram_bot.set_webhook(
+            url=url,
+            secret_token=TELEGRAM_WEBHOOK_SECRET,
+            max_connections=TELEGRAM_BOT_WORKERS,
+        )
+        logger.info(f"Telegram {name} webhook is set to {url}")
+    else:
+        thread = Thread(target=telegram_bot.infinity_polling, daemon=True)
+        thread.start()
+
+
+@router.post("/telegram/webhook/{name}", include_in_schema=False)
+async def telegram_webhook(name: str, request: Request):
+    telegram_bot = _get_bots().get(name)
+
+    if telegram_bot is None or TELEGRAM_BOT_MODE != "webhook":
+        raise HTTPException(status_code=404, detail="Bot not found")
+
+    if not secrets.compare_digest(
+        request.headers.get("X-Telegram-Bot-Api-Secret-Token", "").encode(),
+        TELEGRAM_WEBHOOK_SECRET.encode(),
+    ):
+        raise HTTPException(status_code=403, detail="Invalid secret token")
+
+    try:
+        update = types.Update.de_json(await request.json())
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid update")
+
+    # Handlers are only queued here, they run on the bot worker pool
+    telegram_bot.process_new_updates([update])
+
+    return {"ok": True}
+
+
+@router.get("/telegram/metrics", tags=["Telegram"])
+def telegram_metrics(admin: Admin = Depends(Admin.get_current)):
+    return {
+        name: telegram_bot.handler_metrics.snapshot()
+        for name, telegram_bot in _get_bots().items()
+        if telegram_bot is not None
+    }
+
+
+app.include_router(router, prefix="/api")
+
 if TELEGRAM_API_TOKEN:
-    bot = TeleBot(TELEGRAM_API_TOKEN)
+    bot = MeteredTeleBot(TELEGRAM_API_TOKEN, num_threads=TELEGRAM_BOT_WORKERS)
 
     @app.on_event("startup")
     def start_bot():
@@ -33,21 +106,21 @@ if TELEGRAM_API_TOKEN:
             spec = importlib.util.spec_from_file_location(name, file)
             spec.loader.exec_module(importlib.util.module_from_spec(spec))
 
-        thread = Thread(target=bot.infinity_polling, daemon=True)
-        thread.start()
+        _start_bot_runtime("bot", bot)
 
 else:
     logger.warn("Telegram Bot not set!")
 
 if TELEGRAM_PAYMENT_API_TOKEN:
-    payment_bot = TeleBot(TELEGRAM_PAYMENT_API_TOKEN)
+    payment_bot = MeteredTeleBot(
+        TELEGRAM_PAYMENT_API_TOKEN, num_threads=TELEGRAM_BOT_WORKERS
+    )
 
     @app.on_event("startup")
     def start_bot():
         logger.info("Start payment telegram bot")
 
-        thread = Thread(target=payment_bot.infinity_polling, daemon=True)
-        thread.start()
+        _start_bot_runtime("payment_bot", payment_bot)
 
 else:
     logger.warn("Telegram Payment Bot not set!")
@@ -7,7 +7,6 @@ from telebot.apihelper import ApiTelegramException
 
 from src import config
 from src.accounts.service import get_account
-from src.commerce.schemas import OrderStatus, TransactionType
 from src.database import GetDB
 from src.notification.schemas import NotificationStatus
 from src.notification.service import get_notification, update_status
@@ -167,24 +166,20 @@ def send_welcome(message: types.Message):
     func=lambda call: call.data == "report_account_usage", is_admin=True
 )
 def report_account_usage(call: types.CallbackQuery):
-    last_24h_usage = utils.get_all_account_usage(1)
-    last_week_usage = utils.get_all_account_usage(7)
-    last_month_usage = utils.get_all_account_usage(30)
-
-    active_accounts = utils.get_accounts(enable=True, test_account=False)
-
-    test_accounts = utils.get_accounts(enable=False, test_account=True)
+    report = utils.get_accounts_report()
 
     try:
         bot.edit_message_text(
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             text=messages.ACCOUNT_USAGE.format(
-                total_active_accounts=active_accounts[1],
-                total_active_test_accounts=test_accounts[1],
-                last_24h_usage=utils.get_readable_size(last_24h_usage),
-                last_week_usage=utils.get_readable_size(last_week_usage),
-                last_month_usage=utils.get_readable_size(last_month_usage),
+                total_active_accounts=report.active_accounts,
+                total_active_test_accounts=report.active_test_accounts,
+                last_24h_usage=utils.get_readable_size(report.used_traffic.last_24h),
+                last_week_usage=utils.get_readable_size(report.used_traffic.last_week),
+                last_month_usage=utils.get_readable_size(
+                    report.used_traffic.last_month
+                ),
             ),
             reply_markup=BotAdminKeyboard.main_menu(),
             parse_mode="MarkdownV2",
@@ -223,18 +218,11 @@ def account_usage_detail(call: types.CallbackQuery):
     func=lambda call: call.data == "report_orders", is_admin=True
 )
 def report_orders(call: types.CallbackQuery):
-    today_paid_orders = utils.get_orders(1, OrderStatus.paid)
-    today_completed_orders = utils.get_orders(1, OrderStatus.completed)
-
-    last_week_paid_orders = utils.get_orders(7, OrderStatus.paid)
-    last_week_completed_orders = utils.get_orders(7, OrderStatus.completed)
-
-    last_month_paid_orders = utils.get_orders(30, OrderStatus.paid)
-    last_month_completed_orders = utils.get_orders(30, OrderStatus.completed)
+    report = utils.get_orders_report()
 
-    last_24h_orders = today_paid_orders[1] + today_completed_orders[1]
-    last_week_orders = last_week_paid_orders[1] + last_week_completed_orders[1]
-    last_month_orders = last_month_paid_orders[1] + last_month_completed_orders[1]
+    last_24h_orders = report.paid.last_24h + report.completed.last_24h
+    last_week_orders = report.paid.last_week + report.completed.last_week
+    last_month_orders = report.paid.last_month + report.completed.last_month
 
     try:
         bot.edit_message_text(
@@ -259,47 +247,25 @@ def report_orders(call: types.CallbackQuery):
     func=lambda call: call.data == "report_transaction", is_admin=True
 )
 def report_transaction(call: types.CallbackQuery):
+    report = utils.get_transactions_report()
+
     try:
         bot.edit_message_text(
             chat_id=call.message.chat.id,
             message_id=call.message.message_id,
             text=messages.TRANSACTIONS_REPORT.format(
-                last_24h_payment=utils.get_price_readable(
-                    utils.get_transaction_sum(1, TransactionType.payment)
-                ),
-                last_24h_orders=utils.get_price_readable(
-                    utils.get_transaction_sum(1, TransactionType.order)
-                ),
-                last_24h_bonuses=utils.get_price_readable(
-                    utils.get_transaction_sum(1, TransactionType.bonus)
-                ),
-                last_week_payment=utils.get_price_readable(
-                    utils.get_transaction_sum(7, TransactionType.payment)
-                ),
-                last_week_orders=utils.get_price_readable(
-                    utils.get_transaction_sum(7, TransactionType.order)
-                ),
-                last_week_bonuses=utils.get_price_readable(
-                    utils.get_transaction_sum(7, TransactionType.bonus)
-                ),
-                last_month_payment=utils.get_price_readable(
-                    utils.get_transaction_sum(30, TransactionType.payment)
-                ),
-                last_month_orders=utils.get_price_readable(
-                    utils.get_transaction_sum(30, TransactionType.order)
-                ),
-                last_month_bonuses=utils.get_price_readable(
-                    utils.get_transaction_sum(30, TransactionType.bonus)
-                ),
-                total_payment=utils.get_price_readable(
-                    utils.get_transaction_sum(type_=TransactionType.payment)
-                ),
-                total_orders=utils.get_price_readable(
-                    utils.get_transaction_sum(type_=TransactionType.order)
-                ),
-                total_bonuses=utils.get_price_readable(
-                    utils.get_transaction_sum(type_=TransactionType.bonus)
-                ),
+                last_24h_payment=utils.get_price_readable(report.payment.last_24h),
+                last_24h_orders=utils.get_price_readable(report.order.last_24h),
+                last_24h_bonuses=utils.get_price_readable(report.bonus.last_24h),
+                last_week_payment=utils.get_price_readable(report.payment.last_week),
+                last_week_orders=utils.get_price_readable(report.order.last_week),
+                last_week_bonuses=utils.get_price_readable(report.bonus.last_week),
+                last_month_payment=utils.get_price_readable(report.payment.last_month),
+                last_month_orders=utils.get_price_readable(report.order.last_month),
+                last_month_bonuses=utils.get_price_readable(report.bonus.last_month),
+                total_payment=utils.get_price_readable(report.payment.total),
+                total_orders=utils.get_price_readable(report.order.total),
+                total_bonuses=utils.get_price_readable(report.bonus.total),
             ),
             reply_markup=BotAdminKeyboard.main_menu(),
             parse_mode="MarkdownV2",
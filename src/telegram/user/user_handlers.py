@@ -1,4 +1,5 @@
-import qrcode as qrcode
+import io
+
 from telebot import types, custom_filters
 from telebot.apihelper import ApiTelegramException
 from telebot.custom_filters import IsReplyFilter
@@ -16,8 +17,12 @@ from src.telegram import bot, utils, payment_bot
 from src.telegram.user import captions, messages
 from src.telegram.user.keyboard import BotUserKeyboard
 from src.users.models import User
+from src.utils import qr
+from src.system.state import create_state_store
+from src.utils.telebot import transferable_file
 
-change_account_name_message_ids = {}
+# Account renamed by a reply, per prompt message and chat
+change_account_name_states = create_state_store("change_account_name")
 
 
 @bot.message_handler(content_types=["web_app_data"])
@@ -187,8 +192,8 @@ def get_payment_receipt(call: types.CallbackQuery):
         reply_markup=ForceReply(),
     )
 
-    change_account_name_message_ids[f"{message.message_id}:{message.chat.id}"] = (
-        account_id
+    change_account_name_states.set(
+        f"{message.message_id}:{message.chat.id}", account_id
     )
 
     bot.answer_callback_query(callback_query_id=call.id)
@@ -636,27 +641,28 @@ def handle_payment_receipt_docs(message: types.Message):
         caption = caption + utils.get_user_payment_history(message.from_user.id)
 
         if message.photo:
-            photo_index = len(message.photo)
-            document_file = bot.get_file(file_id=message.photo[photo_index - 1].file_id)
-            document_byte = bot.download_file(file_path=document_file.file_path)
-            payment_bot.send_photo(
-                chat_id=config.TELEGRAM_ADMIN_ID,
-                photo=document_byte,
-                caption=caption,
-                disable_notification=False,
-                parse_mode="html",
-            )
+            with transferable_file(
+                source=bot, target=payment_bot, file_id=message.photo[-1].file_id
+            ) as photo:
+                payment_bot.send_photo(
+                    chat_id=config.TELEGRAM_ADMIN_ID,
+                    photo=photo,
+                    caption=caption,
+                    disable_notification=False,
+                    parse_mode="html",
+                )
         elif message.document:
-            document_file = bot.get_file(file_id=message.document.file_id)
-            document_byte = bot.download_file(file_path=document_file.file_path)
-
-            payment_bot.send_document(
-                chat_id=config.TELEGRAM_ADMIN_ID,
-                document=document_byte,
-                caption=caption,
-                disable_notification=False,
-                parse_mode="html",
-            )
+            with transferable_file(
+                source=bot, target=payment_bot, file_id=message.document.file_id
+            ) as document:
+                payment_bot.send_document(
+                    chat_id=config.TELEGRAM_ADMIN_ID,
+                    document=document,
+                    visible_file_name=message.document.file_name,
+                    caption=caption,
+                    disable_notification=False,
+                    parse_mode="html",
+                )
 
         bot.send_message(
             message.from_user.id,
@@ -689,10 +695,13 @@ def handle_payment_receipt_docs(message: types.Message):
 
 @bot.message_handler(is_reply=True)
 def get_service_name(message: types.Message):
-    key = f"{message.reply_to_message.message_id}:{message.chat.id}"
-    if key in change_account_name_message_ids:
+    # Popped, so another reply to the same prompt doesn't rename it again
+    account_id = change_account_name_states.pop(
+        f"{message.reply_to_message.message_id}:{message.chat.id}"
+    )
+    if account_id is not None:
         db_account = utils.update_account_user_title(
-            account_id=change_account_name_message_ids[key], title=message.text
+            account_id=account_id, title=message.text
         )
 
         bot.send_message(
@@ -713,8 +722,8 @@ def change_service_name(call: types.CallbackQuery):
         messages.PLEASE_ENTER_NEW_SERVICE_NAME,
         reply_markup=ForceReply(),
     )
-    change_account_name_message_ids[f"{message.message_id}:{message.chat.id}"] = (
-        account_id
+    change_account_name_states.set(
+        f"{message.message_id}:{message.chat.id}", account_id
     )
     bot.answer_callback_query(callback_query_id=call.id)
 
@@ -726,11 +735,7 @@ def account_qrcode(call: types.CallbackQuery):
     account_id = call.data.split(":")[1]
     account = utils.get_account(account_id)
 
-    file_name = "./pyqrcode/" + account_id + ".png"
-
-    img = qrcode.make("{}/{}".format(config.SUBSCRIPTION_BASE_URL, account.uuid))
-    type(img)  # qrcode.image.pil.PilImage
-    img.save(file_name)
+    subscription_url = "{}/{}".format(config.SUBSCRIPTION_BASE_URL, account.uuid)
 
     expired_at = (
         "Unlimited"
@@ -738,17 +743,31 @@ def account_qrcode(call: types.CallbackQuery):
         else utils.get_jalali_date(account.expired_at.timestamp())
     )
 
+    caption = captions.ACCOUNT_LIST_ITEM.format(
+        utils.get_readable_size_short(account.data_limit),
+        expired_at,
+        captions.ENABLE if account.enable else captions.DISABLE,
+    )
+
+    file_id = qr.get_telegram_file_id(subscription_url)
+    if file_id:
+        try:
+            bot.send_photo(caption=caption, chat_id=call.from_user.id, photo=file_id)
+            return
+        except ApiTelegramException as error:
+            logger.warn(f"Cached QR code file is not available anymore: {error}")
+            qr.forget_telegram_file_id(subscription_url)
+
     bot.send_chat_action(call.from_user.id, "upload_document")
-    bot.send_photo(
-        caption=captions.ACCOUNT_LIST_ITEM.format(
-            utils.get_readable_size_short(account.data_limit),
-            expired_at,
-            captions.ENABLE if account.enable else captions.DISABLE,
-        ),
+    message = bot.send_photo(
+        caption=caption,
         chat_id=call.from_user.id,
-        photo=open(file_name, "rb"),
+        photo=io.BytesIO(qr.render_qrcode(subscription_url)),
     )
 
+    if message.photo:
+        qr.set_telegram_file_id(subscription_url, message.photo[-1].file_id)
+
 
 @bot.callback_query_handler(
     func=lambda call: call.data.startswith("account_detail:"), is_subscribed_user=True
@@ -12,22 +12,23 @@ from telebot.apihelper import ApiTelegramException
 import src.accounts.service as account_service
 import src.club.service as club_service
 import src.commerce.service as commerce_service
+import src.reports.service as report_service
 import src.users.service as user_service
 from src import logger, config
 from src.accounts.models import Account
 from src.accounts.schemas import (
     AccountUsedTrafficReportResponse,
 )
+from src.club.schemas import ClubProfileCreate
 from src.commerce.models import Service, Order, PaymentAccount
 from src.commerce.schemas import (
     OrderCreate,
     OrderStatus,
-    TransactionType,
-    PaymentStatus,
 )
 from src.config import TELEGRAM_ADMIN_ID
 from src.database import GetDB
 from src.notification.models import Notification
+from src.reports.schemas import AccountsUsageReport, OrdersReport, TransactionsReport
 from src.telegram import bot
 from src.telegram.admin import messages
 from src.telegram.user import captions
@@ -237,20 +238,19 @@ def get_user_by_chat_id(telegram_chat_id: int) -> UserResponse:
 
 def get_user_payment_history(telegram_chat_id: int):
     with GetDB() as db:
-        db_user = user_service.get_user_by_telegram_chat_id(
+        summary = commerce_service.get_payment_summary(
             db=db, telegram_chat_id=telegram_chat_id
         )
 
-        payment_details = messages.USER_PAYMENT_DETAILS.format(
-            balance=get_price_readable(db_user.balance),
-            total=get_price_readable(get_total_payment(user_id=db_user.id)),
-        )
-
-        if db_user:
-            return payment_details
-        else:
+        if not summary:
             return ""
 
+        balance, total = summary
+        return messages.USER_PAYMENT_DETAILS.format(
+            balance=get_price_readable(balance),
+            total=get_price_readable(total),
+        )
+
 
 def add_or_get_user(telegram_user, referral_user: User = None) -> UserResponse:
     try:
@@ -279,6 +279,16 @@ def add_or_get_user(telegram_user, referral_user: User = None) -> UserResponse:
                     enable=True,
                 )
                 db_user = user_service.create_user(db=db, user=user)
+
+                try:
+                    club_service.create_club_profile(
+                        db=db,
+                        db_user=db_user,
+                        club_profile=ClubProfileCreate(total_score=0, total_subset=0),
+                    )
+                except Exception as error:
+                    db.rollback()
+                    logger.error(f"Could not create club profile: {error}")
             else:
                 db_user = user_service.update_user_info(
                     db=db,
@@ -298,20 +308,6 @@ def add_or_get_user(telegram_user, referral_user: User = None) -> UserResponse:
         logger.error(err)
 
 
-def get_all_account_usage(delta: int):
-    result = 0
-
-    with GetDB() as db:
-        data_usage = account_service.get_all_accounts_used_traffic(db=db, delta=delta)
-        if data_usage.download is not None:
-            result += data_usage.download
-
-        if data_usage.upload is not None:
-            result += data_usage.upload
-
-    return result
-
-
 def get_all_account_usage_report(delta: int) -> List[AccountUsedTrafficReportResponse]:
     with GetDB() as db:
         return account_service.get_account_used_traffic_report(
@@ -319,24 +315,19 @@ def get_all_account_usage_report(delta: int) -> List[AccountUsedTrafficReportRes
         )
 
 
-def get_accounts(enable: bool, test_account: bool):
+def get_transactions_report() -> TransactionsReport:
     with GetDB() as db:
-        return account_service.get_accounts(
-            db=db, filter_enable=True, enable=enable, test_account=test_account
-        )
+        return report_service.get_transactions_report(db=db)
 
 
-def get_total_payment(user_id: int):
+def get_orders_report() -> OrdersReport:
     with GetDB() as db:
-        payments, count = commerce_service.get_payments(
-            db=db, status=PaymentStatus.paid, user_id=user_id
-        )
-        total = 0
+        return report_service.get_orders_report(db=db)
 
-        for payment in payments:
-            total += payment.total
 
-        return total
+def get_accounts_report() -> AccountsUsageReport:
+    with GetDB() as db:
+        return report_service.get_accounts_report(db=db)
 
 
 def get_available_payment_accounts(user_id: int) -> List[PaymentAccount]:
@@ -376,16 +367,6 @@ def get_orders(
         )
 
 
-def get_transaction_sum(
-    delta: int = 0,
-    type_: TransactionType = None,
-) -> int:
-    with GetDB() as db:
-        return commerce_service.get_transactions_sum(
-            db=db, start_date=_get_date(delta=delta) if delta > 0 else None, type_=type_
-        )
-
-
 def get_random_string(length):
     # choose from all lowercase letter
     letters = string.ascii_lowercase
@@ -8,6 +8,7 @@ from sqlalchemy import (
     String,
     Boolean,
     BigInteger,
+    Index,
 )
 from sqlalchemy.orm import relationship, validates
 from telebot.formatting import escape_markdown
@@ -19,6 +20,34 @@ USERNAME_REGEXP = re.compile(r"^(?=\w{3,32}\b)[a-zA-Z0-9]+(?:_[a-zA-Z0-9]+)*$")
 
 class User(Base):
     __tablename__ = "user"
+    # Trigram indexes serving the ILIKE search of src.utils.search, the
+    # telegram_chat_id text index is an expression index in the migration
+    __table_args__ = (
+        Index(
+            "ix_user_first_name_trgm",
+            "first_name",
+            postgresql_using="gin",
+            postgresql_ops={"first_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_last_name_trgm",
+            "last_name",
+            postgresql_using="gin",
+            postgresql_ops={"last_name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_username_trgm",
+            "username",
+            postgresql_using="gin",
+            postgresql_ops={"username": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_telegram_username_trgm",
+            "telegram_username",
+            postgresql_using="gin",
+            postgresql_ops={"telegram_username": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     accounts = relationship(
@@ -1,3 +1,5 @@
+from typing import Optional, Union
+
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
@@ -5,7 +7,15 @@ from sqlalchemy.orm import Session
 import src.users.service as service
 from src.admins.schemas import Admin
 from src.database import get_db
-from src.users.schemas import UserCreate, UserResponse, UserModify, UsersResponse
+from src.users.schemas import (
+    UserCompactResponse,
+    UserCreate,
+    UserResponse,
+    UserModify,
+    UsersCompactResponse,
+    UsersResponse,
+)
+from src.utils.pagination import CountMode, get_cursor, get_next_cursor
 
 router = APIRouter()
 
@@ -66,7 +76,11 @@ def delete_user(
     return {}
 
 
-@router.get("/users/", tags=["User"], response_model=UsersResponse)
+@router.get(
+    "/users/",
+    tags=["User"],
+    response_model=Union[UsersResponse, UsersCompactResponse],
+)
 def get_users(
     offset: int = None,
     limit: int = None,
@@ -74,6 +88,9 @@ def get_users(
     enable: int = -1,
     is_debt: bool = False,
     q: str = None,
+    count: CountMode = CountMode.exact,
+    compact: bool = False,
+    cursor: Optional[list] = Depends(get_cursor),
     db: Session = Depends(get_db),
     admin: Admin = Depends(Admin.get_current),
 ):
@@ -88,14 +105,33 @@ def get_users(
                     status_code=400, detail=f'"{opt}" is not a valid sort option'
                 )
 
-    users, count = service.get_users(
-        db=db,
-        limit=limit,
-        offset=offset,
-        q=q,
-        sort=sort,
-        enable=enable,
-        is_debt=is_debt,
-    )
-
-    return {"users": users, "total": count}
+    # Searches without an explicit sort list the best matches first
+    if q and not sort:
+        sort = [service.get_user_search_rank(db=db, q=q).desc()]
+
+    try:
+        users, total = service.get_users(
+            db=db,
+            limit=limit,
+            offset=offset,
+            q=q,
+            sort=sort,
+            enable=enable,
+            is_debt=is_debt,
+            cursor=cursor,
+            count_mode=count,
+            compact=compact,
+        )
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    next_cursor = get_next_cursor(db=db, items=users, sort=sort, limit=limit)
+
+    if compact:
+        return UsersCompactResponse(
+            users=[UserCompactResponse.from_orm(item) for item in users],
+            total=total,
+            next_cursor=next_cursor,
+        )
+
+    return {"users": users, "total": total, "next_cursor": next_cursor}
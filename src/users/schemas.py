@@ -77,4 +77,28 @@ class UserResponse(UserBase):
 
 class UsersResponse(BaseModel):
     users: List[UserResponse]
-    total: int
+    total: Optional[int]
+    next_cursor: Optional[str] = None
+
+
+class UserCompactResponse(BaseModel):
+    id: int
+    username: str
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    telegram_chat_id: Optional[int] = None
+    telegram_username: Optional[str] = None
+    balance: Optional[int] = 0
+    enable: bool
+    banned: bool
+    created_at: datetime
+    modified_at: datetime
+
+    class Config:
+        orm_mode = True
+
+
+class UsersCompactResponse(BaseModel):
+    users: List[UserCompactResponse]
+    total: Optional[int]
+    next_cursor: Optional[str] = None
@@ -1,15 +1,17 @@
+import datetime
 from enum import Enum
 from typing import List, Tuple, Optional
 
-from sqlalchemy import cast, String, or_
-from sqlalchemy.orm import Session
+from sqlalchemy import cast, String
+from sqlalchemy.orm import Session, load_only
 
 from src import messages, config
-from src.accounts.models import Account
 from src.commerce.schemas import TransactionCreate, TransactionType
 from src.commerce.service import create_transaction
 from src.users.models import User
-from src.users.schemas import UserCreate, UserModify
+from src.users.schemas import UserCompactResponse, UserCreate, UserModify
+from src.utils.pagination import CountMode, paginate, schema_columns
+from src.utils.search import search_filter, search_rank
 
 UserSortingOptions = Enum(
     "UserSortingOptions",
@@ -27,6 +29,18 @@ UserSortingOptions = Enum(
     },
 )
 
+USER_SEARCH_COLUMNS = [
+    User.first_name,
+    User.last_name,
+    User.username,
+    User.telegram_username,
+    cast(User.telegram_chat_id, String),
+]
+
+
+def get_user_search_rank(db: Session, q: str):
+    return search_rank(db, USER_SEARCH_COLUMNS, q)
+
 
 def create_user(db: Session, user: UserCreate):
     db_user = User(
@@ -106,11 +120,14 @@ def get_users(
     enable: int = -1,
     is_debt: bool = False,
     return_with_count: bool = True,
+    cursor: Optional[list] = None,
+    count_mode: CountMode = CountMode.exact,
+    compact: bool = False,
 ) -> Tuple[List[User], int]:
     query = db.query(User)
 
-    if sort:
-        query = query.order_by(*(opt.value for opt in sort))
+    if compact:
+        query = query.options(load_only(*schema_columns(User, UserCompactResponse)))
 
     if enable >= 0:
         query = query.filter(User.enable == (True if enable > 0 else False))
@@ -119,28 +136,22 @@ def get_users(
         query = query.filter(User.balance < 0)
 
     if q:
-        query = query.join(Account, User.id == Account.user_id, isouter=True)
-        query = query.filter(
-            or_(
-                User.first_name.ilike(f"%{q}%"),
-                User.last_name.ilike(f"%{q}%"),
-                User.username.ilike(f"%{q}%"),
-                User.telegram_username.ilike(f"%{q}%"),
-                cast(User.telegram_chat_id, String).ilike(f"%{q}%"),
-            )
-        )
-
-    count = query.count()
-
-    if offset:
-        query = query.offset(offset)
-    if limit:
-        query = query.limit(limit)
+        query = query.filter(search_filter(USER_SEARCH_COLUMNS, q))
+
+    users, count = paginate(
+        query,
+        User,
+        sort=sort,
+        offset=offset,
+        limit=limit,
+        cursor=cursor,
+        count_mode=count_mode if return_with_count else CountMode.none,
+    )
 
     if return_with_count:
-        return query.all(), count
+        return users, count
     else:
-        return query.all()
+        return users
 
 
 def remove_user(db: Session, db_user: User):
@@ -161,5 +172,28 @@ def get_user_referral_users(db: Session, user_id: int) -> List[User]:
     return db.query(User).filter(User.referral_user_id == user_id).all()
 
 
+def get_users_by_ids(db: Session, user_ids: List[int]) -> List[User]:
+    if not user_ids:
+        return []
+
+    return db.query(User).filter(User.id.in_(user_ids)).all()
+
+
+def get_users_created_between(
+    db: Session,
+    start_date: Optional[datetime.datetime] = None,
+    end_date: Optional[datetime.datetime] = None,
+) -> List[User]:
+    query = db.query(User)
+
+    if start_date:
+        query = query.filter(User.created_at >= start_date)
+
+    if end_date:
+        query = query.filter(User.created_at <= end_date)
+
+    return query.order_by(User.created_at.asc()).all()
+
+
 def get_user_by_telegram_chat_id(db: Session, telegram_chat_id: int):
     return db.query(User).filter(User.telegram_chat_id == telegram_chat_id).first()
@@ -0,0 +1,20 @@
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+_SQLITE_TRUNC_FORMATS = {
+    "hour": "%Y-%m-%d %H:00:00.000000",
+    "day": "%Y-%m-%d 00:00:00.000000",
+    "month": "%Y-%m-01 00:00:00.000000",
+    "year": "%Y-01-01 00:00:00.000000",
+}
+
+
+def date_trunc(db: Session, trunc: str, column):
+    """column truncated to the hour, day, month or year, on postgres and sqlite."""
+    trunc = getattr(trunc, "value", trunc)
+
+    if db.bind.dialect.name == "sqlite":
+        # Same text layout sqlalchemy stores datetimes in, so buckets compare
+        return func.strftime(_SQLITE_TRUNC_FORMATS[trunc], column)
+
+    return func.date_trunc(trunc, column)
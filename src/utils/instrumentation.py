@@ -0,0 +1,169 @@
+import functools
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, List, Optional
+
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.util import get_callable_name
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from src.config import QUERY_COUNT_WARNING, SLOW_QUERY_THRESHOLD_MS
+
+logger = logging.getLogger("uvicorn.default")
+
+
+class QueryStats:
+    """Queries of one HTTP request, job run or bot update."""
+
+    def __init__(self, origin: str, scope: Optional[dict] = None):
+        self._origin = origin
+        self._scope = scope
+        self.queries = 0
+        self.slow_queries = 0
+        self.seconds = 0.0
+
+    @property
+    def origin(self) -> str:
+        # Requests are known by their route template once routing is done
+        route = self._scope.get("route") if self._scope else None
+        if route is not None:
+            return f"{self._scope['method']} {route.path}"
+
+        return self._origin
+
+
+class QueryMetrics:
+    """Thread safe query counters per origin."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origins: Dict[str, dict] = {}
+
+    def observe(self, stats: QueryStats, duration: float):
+        with self._lock:
+            origin = self._origins.setdefault(
+                stats.origin,
+                {
+                    "count": 0,
+                    "queries": 0,
+                    "max_queries": 0,
+                    "slow_queries": 0,
+                    "db_time": 0.0,
+                    "total_time": 0.0,
+                },
+            )
+            origin["count"] += 1
+            origin["queries"] += stats.queries
+            origin["max_queries"] = max(origin["max_queries"], stats.queries)
+            origin["slow_queries"] += stats.slow_queries
+            origin["db_time"] += stats.seconds
+            origin["total_time"] += duration
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "origin": origin,
+                    "count": stats["count"],
+                    "queries": stats["queries"],
+                    "avg_queries": round(stats["queries"] / stats["count"], 2),
+                    "max_queries": stats["max_queries"],
+                    "slow_queries": stats["slow_queries"],
+                    "db_time": round(stats["db_time"], 6),
+                    "avg_db_time": round(stats["db_time"] / stats["count"], 6),
+                    "total_time": round(stats["total_time"], 6),
+                }
+                for origin, stats in sorted(
+                    self._origins.items(), key=lambda item: -item[1]["db_time"]
+                )
+            ]
+
+    def reset(self):
+        with self._lock:
+            self._origins.clear()
+
+
+query_metrics = QueryMetrics()
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context._query_started_at = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started_at = getattr(context, "_query_started_at", None)
+    if started_at is None:
+        return
+
+    duration = time.perf_counter() - started_at
+    slow = duration * 1000 >= SLOW_QUERY_THRESHOLD_MS
+
+    stats = _current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.seconds += duration
+        stats.slow_queries += 1 if slow else 0
+
+    if slow:
+        logger.warning(
+            f"Slow query {duration * 1000:.0f} ms in {stats.origin if stats else '-'}: "
+            + " ".join(statement.split())[:1000]
+        )
+
+
+def install(engine: Engine):
+    """Count and time every statement executed on engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def instrument(origin: str, scope: Optional[dict] = None):
+    """
+    Attribute the queries of the block to origin, including the ones run in
+    threads the block hands its context to, like the FastAPI threadpool.
+    """
+    stats = QueryStats(origin, scope=scope)
+    token = _current.set(stats)
+    start = time.perf_counter()
+
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+        query_metrics.observe(stats, time.perf_counter() - start)
+
+        if stats.queries >= QUERY_COUNT_WARNING:
+            logger.warning(
+                f"{stats.origin} ran {stats.queries} queries "
+                f"in {stats.seconds * 1000:.0f} ms"
+            )
+
+
+def instrumented(origin: str):
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with instrument(origin):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class InstrumentedScheduler(BackgroundScheduler):
+    """BackgroundScheduler that instruments every run of its jobs."""
+
+    def add_job(self, func, *args, **kwargs):
+        if callable(func):
+            kwargs.setdefault("name", get_callable_name(func))
+            func = instrumented(f"job {kwargs['name']}")(func)
+
+        return super().add_job(func, *args, **kwargs)
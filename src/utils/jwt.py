@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta
 from typing import Union
 
@@ -5,7 +6,8 @@ import sqlalchemy
 
 # from src import app
 # from src import app
-from src.config import JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+from src.config import ADMIN_TOKEN_CACHE_SIZE, JWT_ACCESS_TOKEN_EXPIRE_MINUTES
+from src.utils.cache import LRUCache
 from jose import JWTError, jwt
 
 global JWT_SECRET_KEY
@@ -15,6 +17,8 @@ JWT_SECRET_KEY = "5c1aa9ebd8c25390fa309bcf3a187d4cd05d623484a88e60c30a48ede77705
 
 # @app.on_event("startup")
 
+admin_token_cache = LRUCache(maxsize=ADMIN_TOKEN_CACHE_SIZE)
+
 
 def create_admin_token(username: str, is_sudo=False) -> str:
     data = {"sub": username, "access": "sudo" if is_sudo else "admin"}
@@ -26,6 +30,11 @@ def create_admin_token(username: str, is_sudo=False) -> str:
 
 
 def get_admin_payload(token: str) -> Union[dict, None]:
+    if ADMIN_TOKEN_CACHE_SIZE > 0:
+        payload = admin_token_cache.get(token)
+        if payload is not None:
+            return payload
+
     try:
         payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
         username: str = payload.get("sub")
@@ -33,10 +42,21 @@ def get_admin_payload(token: str) -> Union[dict, None]:
         if not username or access not in ("admin", "sudo"):
             return
 
-        return {"username": username, "is_sudo": access == "sudo"}
+        admin = {"username": username, "is_sudo": access == "sudo"}
     except JWTError:
         return
 
+    # Only valid tokens are cached, each until it expires
+    if ADMIN_TOKEN_CACHE_SIZE > 0:
+        expires_in = None
+        if payload.get("exp") is not None:
+            expires_in = payload["exp"] - time.time()
+
+        if expires_in is None or expires_in > 0:
+            admin_token_cache.set(token, admin, ttl=expires_in)
+
+    return admin
+
 
 def create_subscription_token(username: str) -> str:
     data = {
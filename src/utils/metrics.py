@@ -0,0 +1,228 @@
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds, from fast API calls to slow panel calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# Seconds, for jobs that run from a second to tens of minutes
+JOB_BUCKETS = (1, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: List["Metric"] = []
+
+    def register(self, metric: "Metric"):
+        with self._lock:
+            self._metrics.append(metric)
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+class Metric:
+    """
+    Base of the metrics, values are kept per label values and updated under a
+    lock so they can be shared by API worker threads, jobs and bot handlers.
+    """
+
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        registry: Optional[MetricsRegistry] = REGISTRY,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+        self._lock = threading.Lock()
+        self._values: Dict[tuple, object] = {}
+
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} takes the labels {self.labelnames}")
+
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple, *extra: Tuple[str, str]):
+        return tuple(zip(self.labelnames, key)) + extra
+
+    def samples(self) -> Iterable[Tuple[str, tuple, float]]:
+        with self._lock:
+            values = list(self._values.items())
+
+        for key, value in sorted(values):
+            yield self.name, self._labels(key), value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, value: float, **labels):
+        """Mirror a total counted elsewhere, like the hits of a cache."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # Count per bucket, the last one is +Inf, then sum and count
+                counts = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+
+            counts[index] += 1
+            counts[-2] += value
+            counts[-1] += 1
+
+    def samples(self) -> Iterable[Tuple[str, tuple, float]]:
+        with self._lock:
+            values = [(key, list(counts)) for key, counts in self._values.items()]
+
+        for key, counts in sorted(values):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket",
+                    self._labels(key, ("le", _format_value(bound))),
+                    cumulative,
+                )
+
+            yield f"{self.name}_sum", self._labels(key), counts[-2]
+            yield f"{self.name}_count", self._labels(key), counts[-1]
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "elora_http_request_duration_seconds",
+    "Latency of API requests per route",
+    ("method", "route", "status"),
+)
+
+XUI_REQUEST_DURATION = Histogram(
+    "elora_xui_request_duration_seconds",
+    "Latency of x-ui panel calls per host",
+    ("host", "operation"),
+)
+XUI_REQUEST_ERRORS = Counter(
+    "elora_xui_request_errors_total",
+    "Failed x-ui panel calls per host, refused, timed out or not answered with 200",
+    ("host", "operation"),
+)
+
+JOB_RUN_DURATION = Histogram(
+    "elora_job_run_duration_seconds",
+    "Duration of scheduled job runs",
+    ("job", "status"),
+    buckets=JOB_BUCKETS,
+)
+JOB_ITEMS_PROCESSED = Counter(
+    "elora_job_items_processed_total",
+    "Items handled by scheduled jobs",
+    ("job",),
+)
+
+NOTIFICATION_QUEUE_DEPTH = Gauge(
+    "elora_notification_queue_depth",
+    "Approved notifications waiting to be sent",
+)
+NOTIFICATIONS_SENT = Counter(
+    "elora_notifications_sent_total",
+    "Notifications processed by the send job",
+    ("status",),
+)
+
+TELEGRAM_API_REQUESTS = Counter(
+    "elora_telegram_api_requests_total",
+    "Telegram Bot API calls per method",
+    ("method",),
+)
+TELEGRAM_API_ERRORS = Counter(
+    "elora_telegram_api_errors_total",
+    "Failed Telegram Bot API calls per method and status code",
+    ("method", "code"),
+)
+BOT_HANDLER_DURATION = Histogram(
+    "elora_bot_handler_duration_seconds",
+    "Latency of Telegram bot handlers",
+    ("handler", "status"),
+)
+
+DB_POOL_CONNECTIONS = Gauge(
+    "elora_db_pool_connections",
+    "Database connections of the pool by state",
+    ("state",),
+)
+
+CACHE_REQUESTS = Counter(
+    "elora_cache_requests_total",
+    "Lookups of in process caches",
+    ("cache", "result"),
+)
@@ -0,0 +1,229 @@
+import base64
+import datetime
+import decimal
+import json
+import logging
+from enum import Enum
+from typing import Any, List, Optional, Tuple, Type
+
+from fastapi import HTTPException
+from pydantic import BaseModel
+from sqlalchemy import and_, inspect, or_
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+logger = logging.getLogger("uvicorn.default")
+
+
+class CountMode(str, Enum):
+    exact = "exact"
+    estimate = "estimate"
+    none = "none"
+
+
+def _sort_keys(model, sort: Optional[List[Enum]] = None) -> List[Tuple[Any, bool]]:
+    """
+    (expression, descending) pairs of the sort options, the primary key is
+    appended as the last key so rows always have a stable position.
+    """
+    keys = []
+
+    for opt in sort or []:
+        clause = opt.value if isinstance(opt, Enum) else opt
+        keys.append((clause.element, clause.modifier is operators.desc_op))
+
+    primary_key = inspect(model).primary_key[0]
+    keys.append((primary_key, keys[0][1] if keys else False))
+
+    return keys
+
+
+def _order_by(keys: List[Tuple[Any, bool]]):
+    # Nulls always sort last so the order is the same on every database
+    return [
+        (expression.desc() if descending else expression.asc()).nulls_last()
+        for expression, descending in keys
+    ]
+
+
+def _after(keys: List[Tuple[Any, bool]], values: list):
+    """Rows positioned after the row holding values, in the order of keys."""
+    clauses = []
+
+    for index, (expression, descending) in enumerate(keys):
+        value = values[index]
+
+        # Nothing sorts after a null but other nulls, the next keys decide
+        if value is None:
+            continue
+
+        after = or_(
+            expression < value if descending else expression > value,
+            expression.is_(None),
+        )
+
+        equal = [
+            previous.is_(None) if previous_value is None else previous == previous_value
+            for (previous, _), previous_value in zip(keys[:index], values[:index])
+        ]
+
+        clauses.append(and_(*equal, after))
+
+    return or_(*clauses)
+
+
+def _encode_value(value):
+    if isinstance(value, datetime.datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, decimal.Decimal):
+        return {"dec": str(value)}
+    if isinstance(value, Enum):
+        return value.name
+
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.datetime.fromisoformat(value["dt"])
+        if "dec" in value:
+            return decimal.Decimal(value["dec"])
+
+        raise ValueError("Unknown cursor value")
+
+    return value
+
+
+def encode_cursor(values: list) -> str:
+    data = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+
+    return base64.urlsafe_b64encode(data.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> list:
+    data = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+    values = json.loads(data)
+
+    if not isinstance(values, list):
+        raise ValueError("Cursor is not a list")
+
+    return [_decode_value(value) for value in values]
+
+
+def get_cursor(cursor: str = None) -> Optional[list]:
+    """Dependency decoding the cursor query parameter of list endpoints."""
+    if not cursor:
+        return None
+
+    try:
+        return decode_cursor(cursor)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+class _Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement, its parameters bound as usual."""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(_Explain, "postgresql")
+def _compile_explain(element: _Explain, compiler, **kwargs):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kwargs)
+
+
+def _estimate_count(query: Query) -> Optional[int]:
+    """Row estimate of the postgres planner, None where it is not available."""
+    session = query.session
+
+    if session.get_bind().dialect.name != "postgresql":
+        return None
+
+    try:
+        # A failed EXPLAIN would abort the transaction the exact count runs in
+        with session.begin_nested():
+            plan = session.execute(_Explain(query.statement)).scalar()
+
+        return int(plan[0]["Plan"]["Plan Rows"])
+    except (SQLAlchemyError, LookupError, TypeError, ValueError) as error:
+        logger.warning(f"Could not estimate the row count: {error}")
+        return None
+
+
+def count_query(query: Query, count_mode: CountMode = CountMode.exact) -> Optional[int]:
+    if count_mode == CountMode.none:
+        return None
+
+    if count_mode == CountMode.estimate:
+        estimate = _estimate_count(query)
+        if estimate is not None:
+            return estimate
+
+    return query.count()
+
+
+def paginate(
+    query: Query,
+    model,
+    sort: Optional[List[Enum]] = None,
+    offset: Optional[int] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[list] = None,
+    count_mode: CountMode = CountMode.exact,
+) -> Tuple[list, Optional[int]]:
+    """
+    Sort and slice query, by offset or by the keyset cursor of the previous
+    page when one is given. Returns the rows and the total in count_mode.
+    """
+    keys = _sort_keys(model, sort)
+
+    count = count_query(query, count_mode)
+
+    query = query.order_by(*_order_by(keys))
+
+    if cursor is not None:
+        if len(cursor) != len(keys):
+            raise ValueError("Cursor does not match the sort options")
+
+        query = query.filter(_after(keys, cursor))
+    elif offset:
+        query = query.offset(offset)
+
+    if limit:
+        query = query.limit(limit)
+
+    return query.all(), count
+
+
+def get_next_cursor(
+    db: Session, items: list, sort: Optional[List[Enum]] = None, limit: int = None
+) -> Optional[str]:
+    """Cursor of the page after items, None when items is the last page."""
+    if not limit or len(items) < limit:
+        return None
+
+    last = items[-1]
+    keys = _sort_keys(type(last), sort)
+    primary_key = keys[-1][0]
+
+    values = (
+        db.query(*(expression for expression, _ in keys))
+        .filter(primary_key == getattr(last, primary_key.key))
+        .one()
+    )
+
+    return encode_cursor(list(values))
+
+
+def schema_columns(model, schema: Type[BaseModel]) -> list:
+    """Mapped columns of model that are fields of schema, for load_only()."""
+    columns = inspect(model).columns
+
+    return [getattr(model, name) for name in schema.__fields__ if name in columns]
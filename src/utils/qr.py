@@ -0,0 +1,47 @@
+import io
+from typing import Optional
+
+import qrcode
+import qrcode.image.svg
+
+from src.config import QRCODE_CACHE_SIZE
+from src.utils.cache import LRUCache
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+_images = LRUCache(maxsize=QRCODE_CACHE_SIZE)
+_telegram_file_ids = LRUCache(maxsize=QRCODE_CACHE_SIZE)
+
+
+def render_qrcode(data: str, image_format: str = "png") -> bytes:
+    """Render data as a QR code image in memory, cached by (data, format)."""
+    if image_format not in MEDIA_TYPES:
+        raise ValueError(f"Unsupported QR code format {image_format}")
+
+    key = (data, image_format)
+    image = _images.get(key)
+
+    if image is None:
+        buffer = io.BytesIO()
+
+        if image_format == "svg":
+            qrcode.make(data, image_factory=qrcode.image.svg.SvgPathImage).save(buffer)
+        else:
+            qrcode.make(data).save(buffer, format="PNG")
+
+        image = buffer.getvalue()
+        _images.set(key, image)
+
+    return image
+
+
+def get_telegram_file_id(data: str) -> Optional[str]:
+    return _telegram_file_ids.get(data)
+
+
+def set_telegram_file_id(data: str, file_id: str):
+    _telegram_file_ids.set(data, file_id)
+
+
+def forget_telegram_file_id(data: str):
+    _telegram_file_ids.pop(data)
@@ -0,0 +1,63 @@
+from typing import List
+
+from sqlalchemy import and_, case, func, literal, or_, true
+from sqlalchemy.orm import Session
+
+LIKE_ESCAPE = "\\"
+
+
+def _escape_like(value: str) -> str:
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
+
+
+def search_terms(q: str) -> List[str]:
+    """Whitespace separated terms of q, telegram style @ prefixes removed."""
+    return [term.lstrip("@") for term in q.split() if term.lstrip("@")]
+
+
+def search_filter(columns: list, q: str):
+    """
+    Rows where every term of q is part of one of columns.
+
+    The ILIKE '%term%' predicates are served by the pg_trgm GIN indexes on
+    postgres, other databases scan.
+    """
+    clauses = []
+
+    for term in search_terms(q):
+        pattern = f"%{_escape_like(term)}%"
+        clauses.append(
+            or_(*(column.ilike(pattern, escape=LIKE_ESCAPE) for column in columns))
+        )
+
+    return and_(true(), *clauses)
+
+
+def search_rank(db: Session, columns: list, q: str):
+    """
+    Relevance of a row for q, higher is better. Exact matches of a term rank
+    above prefix matches and those above matches inside the value. On postgres
+    the trigram similarity to the whole query breaks ties.
+    """
+    rank = literal(0)
+
+    for term in search_terms(q):
+        escaped = _escape_like(term)
+
+        for column in columns:
+            rank += case(
+                (func.lower(column) == term.lower(), 3),
+                (column.ilike(f"{escaped}%", escape=LIKE_ESCAPE), 2),
+                (column.ilike(f"%{escaped}%", escape=LIKE_ESCAPE), 1),
+                else_=0,
+            )
+
+    if db.get_bind().dialect.name == "postgresql":
+        for column in columns:
+            rank += func.coalesce(func.similarity(column, q), 0)
+
+    return rank
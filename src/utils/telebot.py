@@ -1,10 +1,25 @@
+import functools
 import json
-from typing import List
+import logging
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List
 
 from pydantic import BaseModel
 
+from src.config import TELEGRAM_FILE_CHUNK_SIZE, TELEGRAM_FILE_SPOOL_SIZE
 from src.utils.exc import InvalidJSONFormatError
-from telebot import types
+from src.utils.instrumentation import instrument
+from src.utils.metrics import (
+    BOT_HANDLER_DURATION,
+    TELEGRAM_API_ERRORS,
+    TELEGRAM_API_REQUESTS,
+)
+from telebot import ExceptionHandler, TeleBot, apihelper, types
+
+logger = logging.getLogger("uvicorn.default")
 
 
 class Keyboard(BaseModel):
@@ -68,3 +83,138 @@ class KeyboardFactory:
             markup.row(*buttons[i : i + 2])
 
         return markup
+
+
+class HandlerMetrics:
+    """Thread safe latency and error counters of bot handlers."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._handlers: Dict[str, dict] = {}
+
+    def observe(self, handler: str, duration: float, error: bool = False):
+        with self._lock:
+            stats = self._handlers.setdefault(
+                handler, {"count": 0, "errors": 0, "total_time": 0.0, "max_time": 0.0}
+            )
+            stats["count"] += 1
+            stats["errors"] += 1 if error else 0
+            stats["total_time"] += duration
+            stats["max_time"] = max(stats["max_time"], duration)
+
+    def snapshot(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "handler": handler,
+                    "count": stats["count"],
+                    "errors": stats["errors"],
+                    "total_time": round(stats["total_time"], 6),
+                    "avg_time": round(stats["total_time"] / stats["count"], 6),
+                    "max_time": round(stats["max_time"], 6),
+                }
+                for handler, stats in sorted(self._handlers.items())
+            ]
+
+
+def metered_request_sender(method: str, url: str, **kwargs):
+    """
+    Sends Bot API requests like telebot does and counts them with their
+    errors per API method, set as apihelper.CUSTOM_REQUEST_SENDER.
+    """
+    api_method = url.rsplit("/", 1)[-1]
+    TELEGRAM_API_REQUESTS.inc(method=api_method)
+
+    try:
+        response = apihelper._get_req_session().request(method, url, **kwargs)
+    except Exception:
+        TELEGRAM_API_ERRORS.inc(method=api_method, code="connection")
+        raise
+
+    if response.status_code != 200:
+        TELEGRAM_API_ERRORS.inc(method=api_method, code=str(response.status_code))
+
+    return response
+
+
+@contextmanager
+def transferable_file(source: TeleBot, target: TeleBot, file_id: str):
+    """
+    A file received by source that target can send. Bots sharing a token
+    share file ids, so the id is reused as is. Otherwise the file is streamed
+    in chunks to a temporary file, kept in memory up to TELEGRAM_FILE_SPOOL_SIZE.
+    """
+    if source.token == target.token:
+        yield file_id
+        return
+
+    file_path = source.get_file(file_id).file_path
+    if apihelper.FILE_URL is None:
+        url = f"https://api.telegram.org/file/bot{source.token}/{file_path}"
+    else:
+        url = apihelper.FILE_URL.format(source.token, file_path)
+
+    with tempfile.SpooledTemporaryFile(max_size=TELEGRAM_FILE_SPOOL_SIZE) as file:
+        with apihelper._get_req_session().get(
+            url,
+            stream=True,
+            proxies=apihelper.proxy,
+            timeout=(apihelper.CONNECT_TIMEOUT, apihelper.READ_TIMEOUT),
+        ) as response:
+            if response.status_code != 200:
+                raise apihelper.ApiHTTPException("Download file", response)
+
+            for chunk in response.iter_content(chunk_size=TELEGRAM_FILE_CHUNK_SIZE):
+                file.write(chunk)
+
+        file.seek(0)
+        yield file
+
+
+class LoggingExceptionHandler(ExceptionHandler):
+    """Log handler errors instead of letting them restart the polling loop."""
+
+    def handle(self, exception):
+        logger.error(f"Error in telegram handler: {exception}")
+        return True
+
+
+class MeteredTeleBot(TeleBot):
+    """
+    TeleBot that measures the latency and queries of every registered handler.
+
+    Handlers run on the bot worker pool, so num_threads bounds how many updates
+    are processed concurrently.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault("exception_handler", LoggingExceptionHandler())
+        super().__init__(*args, **kwargs)
+        self.handler_metrics = HandlerMetrics()
+
+    def _build_handler_dict(self, handler, pass_bot=False, **filters):
+        return super()._build_handler_dict(
+            self._metered(handler), pass_bot=pass_bot, **filters
+        )
+
+    def _metered(self, handler):
+        name = f"{handler.__module__}.{handler.__qualname__}"
+
+        @functools.wraps(handler)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            error = False
+            try:
+                with instrument(f"bot {name}"):
+                    return handler(*args, **kwargs)
+            except Exception:
+                error = True
+                raise
+            finally:
+                duration = time.perf_counter() - start
+                self.handler_metrics.observe(name, duration, error=error)
+                BOT_HANDLER_DURATION.observe(
+                    duration, handler=name, status="error" if error else "ok"
+                )
+
+        return wrapper